@@ -20,4 +20,7 @@ def glInitEgl10VERSION():
     return extensions.hasGLExtension( _EXTENSION_NAME )
 
 
-### END AUTOGENERATED SECTION
\ No newline at end of file
+### END AUTOGENERATED SECTION
+from OpenGL import contextdata
+# keep contextdata's cached current context in step with context switches
+eglMakeCurrent = contextdata.trackCurrent( eglMakeCurrent )
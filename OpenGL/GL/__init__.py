@@ -9,23 +9,56 @@ from OpenGL.GL.exceptional import *
 
 from OpenGL.GL.glget import *
 
-from OpenGL.GL.VERSION.GL_1_2 import *
-from OpenGL.GL.VERSION.GL_1_3 import *
-from OpenGL.GL.VERSION.GL_1_4 import *
-from OpenGL.GL.VERSION.GL_1_5 import *
-from OpenGL.GL.VERSION.GL_2_0 import *
-from OpenGL.GL.VERSION.GL_2_1 import *
-from OpenGL.GL.VERSION.GL_3_0 import *
-from OpenGL.GL.VERSION.GL_3_1 import *
-from OpenGL.GL.VERSION.GL_3_2 import *
-from OpenGL.GL.VERSION.GL_3_3 import *
-from OpenGL.GL.VERSION.GL_4_0 import *
-from OpenGL.GL.VERSION.GL_4_1 import *
-from OpenGL.GL.VERSION.GL_4_2 import *
-from OpenGL.GL.VERSION.GL_4_3 import *
-from OpenGL.GL.VERSION.GL_4_4 import *
-from OpenGL.GL.VERSION.GL_4_5 import *
-from OpenGL.GL.VERSION.GL_4_6 import *
+from OpenGL import _configflags
+from OpenGL.GL import _lazy
+_lazyIndex = _lazy.load() if _configflags.LAZY_GL else None
+if _lazyIndex is None:
+    from OpenGL.GL.VERSION.GL_1_2 import *
+    from OpenGL.GL.VERSION.GL_1_3 import *
+    from OpenGL.GL.VERSION.GL_1_4 import *
+    from OpenGL.GL.VERSION.GL_1_5 import *
+    from OpenGL.GL.VERSION.GL_2_0 import *
+    from OpenGL.GL.VERSION.GL_2_1 import *
+    from OpenGL.GL.VERSION.GL_3_0 import *
+    from OpenGL.GL.VERSION.GL_3_1 import *
+    from OpenGL.GL.VERSION.GL_3_2 import *
+    from OpenGL.GL.VERSION.GL_3_3 import *
+    from OpenGL.GL.VERSION.GL_4_0 import *
+    from OpenGL.GL.VERSION.GL_4_1 import *
+    from OpenGL.GL.VERSION.GL_4_2 import *
+    from OpenGL.GL.VERSION.GL_4_3 import *
+    from OpenGL.GL.VERSION.GL_4_4 import *
+    from OpenGL.GL.VERSION.GL_4_5 import *
+    from OpenGL.GL.VERSION.GL_4_6 import *
+else:
+    _lazyOwners, _shadowed = _lazyIndex
+    for _name in _shadowed:
+        globals().pop( _name, None )
+
+    def _loadLazy( module ):
+        """Import a lazy module, binding the names it provides which are still unbound"""
+        import importlib
+        namespace = globals()
+        source = importlib.import_module( 'OpenGL.GL.'+module )
+        for name, owner in _lazyOwners.items():
+            if owner == module and name not in namespace:
+                namespace[name] = getattr( source, name )
+    def __getattr__( name ):
+        """Resolve names of the GL 1.2+ modules on first access (PEP 562)"""
+        module = _lazyOwners.get( name )
+        if module is not None:
+            _loadLazy( module )
+            return globals()[name]
+        if name == '__all__':
+            # "from OpenGL.GL import *" exports the lazy names too
+            namespace = globals()
+            namespace['__all__'] = sorted(
+                set( key for key in namespace if not key.startswith( '_' )) | set( _lazyOwners )
+            )
+            return namespace['__all__']
+        raise AttributeError( "module %r has no attribute %r"%( __name__, name ))
+    def __dir__( ):
+        return sorted( set( globals() ) | set( _lazyOwners ) )
 
 from OpenGL.error import *
 GLerror = GLError
@@ -45,5 +78,19 @@ glGetFloat = glGetFloatv
 glGetInteger = glGetIntegerv 
 glGetPolygonStippleub = glGetPolygonStipple
 
-from OpenGL.GL import vboimplementation as _core_implementation
-from OpenGL.GL.ARB import vboimplementation as _arb_implementation
+if _lazyIndex is None:
+    from OpenGL.GL import vboimplementation as _core_implementation
+    from OpenGL.GL.ARB import vboimplementation as _arb_implementation
+else:
+    # the VBO implementations import GL_1_5, GL_3_0, GL_3_1 and the ARB modules
+    from OpenGL.arrays.vbo import Implementation as _vboImplementation
+    _vboImplementation.registerModule( 'OpenGL.GL.vboimplementation' )
+    _vboImplementation.registerModule( 'OpenGL.GL.ARB.vboimplementation' )
+
+if _configflags.BATCH_IMMEDIATE:
+    try:
+        from OpenGL.GL.immediate import *
+    except ImportError as err:
+        _error._log.warning( """BATCH_IMMEDIATE requested, but the recorder is unavailable: %s""", err )
+if _configflags.STATE_CACHE:
+    from OpenGL.GL.statecache import *
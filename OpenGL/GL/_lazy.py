@@ -0,0 +1,107 @@
+"""Lazy loading of the OpenGL.GL VERSION modules past GL 1.1
+
+OpenGL.GL imports VERSION.GL_1_1, pointers, images, exceptional and glget
+eagerly; VERSION.GL_1_2 ... GL_4_6 are only imported when one of their
+names is first looked up on the package, through its module-level
+__getattr__ (PEP 562).  The module providing each name is recorded in
+OpenGL.GL._lazyindex, regenerate it after changing the VERSION modules:
+
+    python -c "from OpenGL.GL import _lazy; _lazy.writeIndex()"
+
+Names the lazy modules export which are already in the eager namespace
+are left there when they are the same object (or an equal Constant of
+the same name), otherwise they are SHADOWED: removed from the eager
+namespace so that they resolve to the lazy module's object, as the
+eager star-imports would have.
+"""
+import importlib, os
+
+EAGER = ('VERSION.GL_1_1', 'pointers', 'images', 'exceptional', 'glget')
+LAZY = (
+    'VERSION.GL_1_2', 'VERSION.GL_1_3', 'VERSION.GL_1_4', 'VERSION.GL_1_5',
+    'VERSION.GL_2_0', 'VERSION.GL_2_1',
+    'VERSION.GL_3_0', 'VERSION.GL_3_1', 'VERSION.GL_3_2', 'VERSION.GL_3_3',
+    'VERSION.GL_4_0', 'VERSION.GL_4_1', 'VERSION.GL_4_2', 'VERSION.GL_4_3',
+    'VERSION.GL_4_4', 'VERSION.GL_4_5', 'VERSION.GL_4_6',
+)
+# star-imported after the VERSION modules, so these always win
+LATER = ('OpenGL.error',)
+
+def _module( name ):
+    return importlib.import_module( name if name.startswith( 'OpenGL.' ) else 'OpenGL.GL.'+name )
+
+def _exported( module ):
+    """Names "from module import *" would bind"""
+    names = getattr( module, '__all__', None )
+    if names is None:
+        names = [name for name in vars( module ) if not name.startswith( '_' )]
+    return dict( (name, getattr( module, name )) for name in names )
+
+def _equivalent( eager, lazy ):
+    from OpenGL.constant import Constant
+    if eager is lazy:
+        return True
+    return (
+        isinstance( eager, Constant ) and isinstance( lazy, Constant ) and
+        eager == lazy and eager.name == lazy.name
+    )
+
+def buildIndex( ):
+    """Import everything and return ({module: [names it provides]}, [shadowed names])"""
+    eager = {}
+    for name in EAGER:
+        eager.update( _exported( _module( name )))
+    later = set()
+    for name in LATER:
+        later.update( _exported( _module( name )))
+    final, owner = {}, {}
+    for name in LAZY:
+        for key, value in _exported( _module( name )).items():
+            final[key], owner[key] = value, name
+    provides = dict( (name, []) for name in LAZY )
+    shadowed = []
+    for key in sorted( final ):
+        if key in later:
+            continue
+        if key in eager:
+            if _equivalent( eager[key], final[key] ):
+                continue
+            shadowed.append( key )
+        provides[owner[key]].append( key )
+    return provides, shadowed
+
+def writeIndex( filename=None ):
+    """Regenerate the _lazyindex module"""
+    provides, shadowed = buildIndex()
+    if filename is None:
+        filename = os.path.join( os.path.dirname( __file__ ), '_lazyindex.py' )
+    lines = [
+        '"""Names provided by the lazily-loaded OpenGL.GL modules, generated by OpenGL.GL._lazy"""',
+        'MODULES = %r'%( LAZY, ),
+        'SHADOWED = %r'%( tuple( shadowed ), ),
+        'NAMES = (',
+    ]
+    for name in LAZY:
+        lines.append( '    # %s'%( name, ))
+        lines.append( '    %r,'%( ' '.join( provides[name] ), ))
+    lines.append( ')' )
+    with open( filename, 'w' ) as handle:
+        handle.write( '\n'.join( lines ) + '\n' )
+    return filename
+
+def load( ):
+    """Return (owners, shadowed) from the index, or None if it is missing or stale
+
+    owners -- name: lazy module name providing it
+    """
+    try:
+        from OpenGL.GL import _lazyindex
+    except ImportError:
+        return None
+    if tuple( _lazyindex.MODULES ) != LAZY:
+        return None
+    owners = {}
+    for module, names in zip( LAZY, _lazyindex.NAMES ):
+        for name in names.split():
+            owners[name] = module
+    return owners, _lazyindex.SHADOWED
@@ -0,0 +1,356 @@
+"""Immediate-mode recorder batching glBegin/glEnd into vertex arrays
+
+Every glVertex*/glColor*/glNormal* call in immediate mode is a separate
+ctypes call (plus an error check).  The functions here are drop-in
+replacements for glBegin/glEnd and the scalar vertex, colour, normal and
+texture-coordinate entry points which, between glBegin and glEnd, only
+append to Python lists; glEnd copies the attributes into preallocated
+NumPy arrays and issues a single glDrawArrays.
+
+Usage:
+
+    from OpenGL.GL import immediate
+    immediate.install( globals() )   # or set PYOPENGL_BATCH_IMMEDIATE=1
+
+    with immediate.batched():
+        for quad in quads:
+            glBegin( GL_QUADS ) ... glEnd()
+
+batched() additionally merges consecutive glBegin/glEnd pairs of the same
+independent primitive type (points, lines, triangles, quads) into one
+draw, with glColor/glNormal/glTexCoord calls between them recorded as
+per-vertex attributes.  Inside a batched() block the caller promises
+that no other GL call (state change, matrix operation, glCallList...)
+is made between the merged glBegin/glEnd pairs.
+
+Limitations:
+
+    * requires numpy
+    * the recorder is not thread-safe, use it from the rendering thread
+    * no GL_ARRAY_BUFFER may be bound while a batch is drawn
+    * only the intercepted calls may be made between glBegin and glEnd
+      (glMaterial, glEdgeFlag, glArrayElement etc. would be executed
+      immediately, out of order)
+    * attributes specified before the first per-vertex colour/normal of
+      a batch are read back with glGetFloatv, which reports executed,
+      not display-list-compiled, state
+"""
+import ctypes
+import numpy
+from OpenGL.GL import exceptional
+from OpenGL.GL.VERSION import GL_1_1 as full
+from OpenGL.raw.GL.VERSION import GL_1_1 as raw
+from OpenGL.raw.GL.VERSION.GL_1_0 import (
+    GL_CURRENT_COLOR, GL_CURRENT_NORMAL, GL_CURRENT_TEXTURE_COORDS,
+    GL_POINTS, GL_LINES, GL_TRIANGLES, GL_QUADS, GL_FLOAT,
+)
+from OpenGL.raw.GL.VERSION.GL_1_1 import (
+    GL_CLIENT_VERTEX_ARRAY_BIT, GL_VERTEX_ARRAY, GL_COLOR_ARRAY,
+    GL_NORMAL_ARRAY, GL_TEXTURE_COORD_ARRAY,
+)
+
+__all__ = (
+    'glBegin', 'glEnd',
+    'glVertex2f', 'glVertex3f', 'glVertex2d', 'glVertex3d', 'glVertex2i', 'glVertex3i',
+    'glVertex2fv', 'glVertex3fv', 'glVertex3dv',
+    'glColor3f', 'glColor4f', 'glColor3d', 'glColor4d', 'glColor3ub', 'glColor4ub',
+    'glColor3fv', 'glColor4fv',
+    'glNormal3f', 'glNormal3d', 'glNormal3fv',
+    'glTexCoord2f', 'glTexCoord2d', 'glTexCoord2fv',
+)
+
+# vertices per primitive for modes whose batches can be concatenated
+MERGEABLE = {
+    int(GL_POINTS): 1,
+    int(GL_LINES): 2,
+    int(GL_TRIANGLES): 3,
+    int(GL_QUADS): 4,
+}
+
+class ImmediateRecorder( object ):
+    """Accumulates one (possibly merged) primitive batch
+
+    Attributes:
+        mode -- primitive mode while inside glBegin/glEnd, else None
+        batchMode -- primitive mode of the pending batch
+        count -- vertices in the pending batch
+        vertices -- flat x,y,z list
+        colors, normals, texcoords -- flat per-vertex lists, or None
+            while the batch uses the GL current value
+        color, normal, texcoord -- current values for the tracked lists
+        merging -- depth of batched() blocks
+        replayBelow -- batches with fewer vertices are replayed as
+            plain glBegin/glEnd, for which the fixed cost of setting
+            up client arrays is higher than the per-call savings
+        draws, vertexTotal -- statistics since reset()
+    """
+    replayBelow = 16
+    def __init__( self ):
+        self.mode = None
+        self.batchMode = None
+        self.merging = 0
+        self._buffers = {}
+        self.draws = self.vertexTotal = 0
+        self._clear()
+    def _clear( self ):
+        self.count = 0
+        self.vertices = []
+        self.colors = self.normals = self.texcoords = None
+    def reset( self ):
+        """Reset statistics"""
+        self.draws = self.vertexTotal = 0
+    def _current( self, pname, size ):
+        value = (raw.GLfloat * 4)()
+        raw.glGetFloatv( pname, value )
+        return tuple( value[:size] )
+    def trackColor( self, value ):
+        """Set the per-vertex colour, back-filling vertices already recorded"""
+        if self.colors is None:
+            self.colors = list( self._current( GL_CURRENT_COLOR, 4 ) * self.count ) if self.count else []
+        self.color = value
+    def trackNormal( self, value ):
+        if self.normals is None:
+            self.normals = list( self._current( GL_CURRENT_NORMAL, 3 ) * self.count ) if self.count else []
+        self.normal = value
+    def trackTexCoord( self, value ):
+        if self.texcoords is None:
+            self.texcoords = list( self._current( GL_CURRENT_TEXTURE_COORDS, 2 ) * self.count ) if self.count else []
+        self.texcoord = value
+    def vertex( self, x, y, z ):
+        self.vertices += (x, y, z)
+        self.count += 1
+        if self.colors is not None:
+            self.colors += self.color
+        if self.normals is not None:
+            self.normals += self.normal
+        if self.texcoords is not None:
+            self.texcoords += self.texcoord
+    def begin( self, mode ):
+        if self.count and (mode != self.batchMode or int(mode) not in MERGEABLE):
+            self.flush()
+        self.mode = self.batchMode = mode
+    def end( self ):
+        self.mode = None
+        size = MERGEABLE.get( int(self.batchMode) )
+        if not (self.merging and size):
+            self.flush()
+        elif self.count % size:
+            # incomplete trailing primitive, which GL would discard
+            self.truncate( self.count - self.count % size )
+    def truncate( self, count ):
+        self.count = count
+        del self.vertices[count*3:]
+        for values, size in ((self.colors,4),(self.normals,3),(self.texcoords,2)):
+            if values is not None:
+                del values[count*size:]
+    def _array( self, key, values ):
+        """Copy values into the preallocated float32 buffer for key"""
+        buffer = self._buffers.get( key )
+        if buffer is None or len(buffer) < len(values):
+            size = 1024
+            while size < len(values):
+                size *= 2
+            buffer = self._buffers[key] = numpy.empty( size, dtype=numpy.float32 )
+        buffer[:len(values)] = values
+        return ctypes.c_void_p( buffer.ctypes.data )
+    def _replay( self ):
+        """Issue the pending batch as ordinary immediate-mode calls"""
+        vertices, colors, normals, texcoords = self.vertices, self.colors, self.normals, self.texcoords
+        color = normal = texcoord = None
+        exceptional.glBegin( self.batchMode )
+        try:
+            for i in range( self.count ):
+                if colors is not None and colors[i*4:i*4+4] != color:
+                    color = colors[i*4:i*4+4]
+                    raw.glColor4f( *color )
+                if normals is not None and normals[i*3:i*3+3] != normal:
+                    normal = normals[i*3:i*3+3]
+                    raw.glNormal3f( *normal )
+                if texcoords is not None and texcoords[i*2:i*2+2] != texcoord:
+                    texcoord = texcoords[i*2:i*2+2]
+                    raw.glTexCoord2f( *texcoord )
+                raw.glVertex3f( *vertices[i*3:i*3+3] )
+        finally:
+            exceptional.glEnd()
+    def flush( self ):
+        """Draw the pending batch with one glDrawArrays (or replay it if small)"""
+        count = self.count
+        if not count:
+            self._clear()
+            return
+        colors, normals, texcoords = self.colors, self.normals, self.texcoords
+        if count < self.replayBelow:
+            try:
+                self._replay()
+            finally:
+                self._clear()
+            return
+        raw.glPushClientAttrib( GL_CLIENT_VERTEX_ARRAY_BIT )
+        try:
+            raw.glEnableClientState( GL_VERTEX_ARRAY )
+            raw.glVertexPointer( 3, GL_FLOAT, 0, self._array( 'vertices', self.vertices ) )
+            if colors is not None:
+                raw.glEnableClientState( GL_COLOR_ARRAY )
+                raw.glColorPointer( 4, GL_FLOAT, 0, self._array( 'colors', colors ) )
+            if normals is not None:
+                raw.glEnableClientState( GL_NORMAL_ARRAY )
+                raw.glNormalPointer( GL_FLOAT, 0, self._array( 'normals', normals ) )
+            if texcoords is not None:
+                raw.glEnableClientState( GL_TEXTURE_COORD_ARRAY )
+                raw.glTexCoordPointer( 2, GL_FLOAT, 0, self._array( 'texcoords', texcoords ) )
+            raw.glDrawArrays( self.batchMode, 0, count )
+        finally:
+            raw.glPopClientAttrib()
+            self._clear()
+        self.draws += 1
+        self.vertexTotal += count
+        # current values are undefined after drawing with the arrays,
+        # immediate mode would have left the last specified ones
+        if colors is not None:
+            full.glColor4f( *self.color )
+        if normals is not None:
+            full.glNormal3f( *self.normal )
+        if texcoords is not None:
+            full.glTexCoord2f( *self.texcoord )
+
+recorder = ImmediateRecorder()
+
+class batched( object ):
+    """Context manager merging consecutive glBegin/glEnd batches, see module docs"""
+    def __enter__( self ):
+        recorder.merging += 1
+        return recorder
+    def __exit__( self, *args ):
+        recorder.merging -= 1
+        if not recorder.merging:
+            recorder.flush()
+        return False
+
+def flush():
+    """Draw any pending merged batch"""
+    recorder.flush()
+
+def glBegin( mode ):
+    """Start recording a primitive batch"""
+    recorder.begin( mode )
+def glEnd( ):
+    """Finish the primitive, drawing it unless it can merge with the next"""
+    if recorder.mode is None:
+        return exceptional.glEnd()
+    recorder.end()
+
+# the common entry points inline ImmediateRecorder.vertex/track* for speed
+def glVertex3f( x, y, z ):
+    r = recorder
+    if r.mode is None:
+        return full.glVertex3f( x, y, z )
+    r.vertices += (x, y, z)
+    r.count += 1
+    if r.colors is not None:
+        r.colors += r.color
+    if r.normals is not None:
+        r.normals += r.normal
+    if r.texcoords is not None:
+        r.texcoords += r.texcoord
+def glVertex2f( x, y ):
+    r = recorder
+    if r.mode is None:
+        return full.glVertex2f( x, y )
+    r.vertices += (x, y, 0.0)
+    r.count += 1
+    if r.colors is not None:
+        r.colors += r.color
+    if r.normals is not None:
+        r.normals += r.normal
+    if r.texcoords is not None:
+        r.texcoords += r.texcoord
+def glColor3f( red, green, blue ):
+    r = recorder
+    if r.colors is not None:
+        r.color = (red, green, blue, 1.0)
+    elif r.mode is None and not r.count:
+        return full.glColor3f( red, green, blue )
+    else:
+        r.trackColor( (red, green, blue, 1.0) )
+def glColor4f( red, green, blue, alpha ):
+    r = recorder
+    if r.colors is not None:
+        r.color = (red, green, blue, alpha)
+    elif r.mode is None and not r.count:
+        return full.glColor4f( red, green, blue, alpha )
+    else:
+        r.trackColor( (red, green, blue, alpha) )
+def glNormal3f( nx, ny, nz ):
+    r = recorder
+    if r.normals is not None:
+        r.normal = (nx, ny, nz)
+    elif r.mode is None and not r.count:
+        return full.glNormal3f( nx, ny, nz )
+    else:
+        r.trackNormal( (nx, ny, nz) )
+def glTexCoord2f( s, t ):
+    r = recorder
+    if r.mode is None and not r.count:
+        return full.glTexCoord2f( s, t )
+    r.trackTexCoord( (s, t) )
+
+def _vertexFunction( name, convert ):
+    base = getattr( full, name )
+    def glVertex( *args ):
+        r = recorder
+        if r.mode is None:
+            return base( *args )
+        r.vertex( *convert( *args ) )
+    glVertex.__name__ = name
+    return glVertex
+def _attributeFunction( name, track, convert ):
+    base = getattr( full, name )
+    def glAttribute( *args ):
+        r = recorder
+        if r.mode is None and not r.count:
+            return base( *args )
+        getattr( r, track )( convert( *args ) )
+    glAttribute.__name__ = name
+    return glAttribute
+
+def _xyz( x, y, z=0.0 ):
+    return (x, y, z)
+def _unsigned( red, green, blue, alpha=255 ):
+    return (red/255.0, green/255.0, blue/255.0, alpha/255.0)
+def _rgba( red, green, blue, alpha=1.0 ):
+    return (red, green, blue, alpha)
+
+glVertex3d = _vertexFunction( 'glVertex3d', _xyz )
+glVertex2d = _vertexFunction( 'glVertex2d', _xyz )
+glVertex3i = _vertexFunction( 'glVertex3i', _xyz )
+glVertex2i = _vertexFunction( 'glVertex2i', _xyz )
+glVertex3fv = _vertexFunction( 'glVertex3fv', lambda v: _xyz( *v[:3] ) )
+glVertex3dv = _vertexFunction( 'glVertex3dv', lambda v: _xyz( *v[:3] ) )
+glVertex2fv = _vertexFunction( 'glVertex2fv', lambda v: _xyz( *v[:2] ) )
+glColor3d = _attributeFunction( 'glColor3d', 'trackColor', _rgba )
+glColor4d = _attributeFunction( 'glColor4d', 'trackColor', _rgba )
+glColor3ub = _attributeFunction( 'glColor3ub', 'trackColor', _unsigned )
+glColor4ub = _attributeFunction( 'glColor4ub', 'trackColor', _unsigned )
+glColor3fv = _attributeFunction( 'glColor3fv', 'trackColor', lambda v: _rgba( *v[:3] ) )
+glColor4fv = _attributeFunction( 'glColor4fv', 'trackColor', lambda v: _rgba( *v[:4] ) )
+glNormal3d = _attributeFunction( 'glNormal3d', 'trackNormal', lambda *v: tuple(v) )
+glNormal3fv = _attributeFunction( 'glNormal3fv', 'trackNormal', lambda v: tuple( v[:3] ) )
+glTexCoord2d = _attributeFunction( 'glTexCoord2d', 'trackTexCoord', lambda *v: tuple(v) )
+glTexCoord2fv = _attributeFunction( 'glTexCoord2fv', 'trackTexCoord', lambda v: tuple( v[:2] ) )
+
+def install( *namespaces ):
+    """Replace the immediate-mode entry points in OpenGL.GL and the given namespaces
+
+    namespaces -- module objects or dictionaries (e.g. globals()) which
+        imported the functions by name before installation
+    """
+    import OpenGL.GL
+    replacements = dict( (name, globals()[name]) for name in __all__ )
+    targets = [OpenGL.GL.__dict__] + [
+        getattr( namespace, '__dict__', namespace ) for namespace in namespaces
+    ]
+    for target in targets:
+        for name, function in replacements.items():
+            if name in target:
+                target[name] = function
+    return recorder
@@ -0,0 +1,247 @@
+"""NumPy-backed emulation of the fixed-function matrix stacks
+
+MatrixStack provides glMatrixMode/glPushMatrix/glPopMatrix/glLoadIdentity/
+glTranslatef/glRotatef/glScalef/glMultMatrixf (plus glOrtho, glFrustum,
+gluPerspective and gluLookAt) as methods computing on the CPU, so a scene
+graph costs no GL calls until the result is needed:
+
+    stack = MatrixStack()
+    stack.gluPerspective( 45.0, aspect, 0.1, 100.0 )   # in GL_PROJECTION
+    stack.glMatrixMode( GL_MODELVIEW )
+    stack.glPushMatrix()
+    stack.glTranslatef( x, y, z )
+    stack.glRotatef( angle, 0, 1, 0 )
+    stack.publish( modelViewLocation )       # glUniformMatrix4fv if changed
+    ...
+    stack.glPopMatrix()
+
+For core profiles the matrices are published as uniforms, for the
+compatibility profile load() hands them to glLoadMatrixf.  compose()
+builds the matrices for N objects (translation, rotation, scale on top of
+the current matrix) in one vectorised call, for instance attributes or
+per-object uniform uploads.
+
+Matrices are kept in the usual mathematical (column-vector) convention;
+matrix() and compose() return them in OpenGL's column-major order.
+"""
+import math
+import numpy
+from OpenGL import GL, error
+from OpenGL.GL import (
+    GL_MODELVIEW, GL_PROJECTION, GL_TEXTURE, GL_STACK_OVERFLOW, GL_STACK_UNDERFLOW,
+    GL_INVALID_ENUM, GL_FALSE, GL_CURRENT_PROGRAM,
+)
+
+__all__ = ('MatrixStack', 'translation', 'rotation', 'scaling', 'compose')
+
+def translation( x, y, z ):
+    """4x4 translation matrix (as glTranslate)"""
+    result = numpy.identity( 4, dtype=numpy.float64 )
+    result[:3,3] = (x, y, z)
+    return result
+
+def rotation( angle, x, y, z ):
+    """4x4 rotation matrix for angle degrees about (x,y,z) (as glRotate)"""
+    length = math.sqrt( x*x + y*y + z*z )
+    if not length:
+        return numpy.identity( 4 )
+    x, y, z = x/length, y/length, z/length
+    radians = math.radians( angle )
+    c, s = math.cos( radians ), math.sin( radians )
+    t = 1.0 - c
+    return numpy.array( (
+        (x*x*t + c, x*y*t - z*s, x*z*t + y*s, 0.0),
+        (y*x*t + z*s, y*y*t + c, y*z*t - x*s, 0.0),
+        (x*z*t - y*s, y*z*t + x*s, z*z*t + c, 0.0),
+        (0.0, 0.0, 0.0, 1.0),
+    ) )
+
+def scaling( x, y, z ):
+    """4x4 scale matrix (as glScale)"""
+    return numpy.diag( (x, y, z, 1.0) )
+
+def _rotations( radians, axes ):
+    """(N,3,3) rotation matrices for N angles about N unit axes"""
+    c = numpy.cos( radians )[:,None,None]
+    s = numpy.sin( radians )[:,None,None]
+    x, y, z = axes[:,0], axes[:,1], axes[:,2]
+    cross = numpy.zeros( (len(axes),3,3) )
+    cross[:,0,1], cross[:,0,2] = -z, y
+    cross[:,1,0], cross[:,1,2] = z, -x
+    cross[:,2,0], cross[:,2,1] = -y, x
+    outer = axes[:,:,None] * axes[:,None,:]
+    return c * numpy.identity( 3 ) + s * cross + (1.0 - c) * outer
+
+def compose( base=None, translations=None, angles=None, axes=None, scales=None ):
+    """Build base . T[i] . R[i] . S[i] for N objects, as (N,16) column-major float32
+
+    base -- 4x4 matrix applied first (identity if None)
+    translations -- (N,3) translations
+    angles -- (N,) rotations in degrees
+    axes -- (N,3) or (3,) rotation axes (default the Y axis)
+    scales -- (N,3), (N,) or scalar scale factors
+
+    This is the result of glPushMatrix(); glTranslatef(); glRotatef();
+    glScalef(); glGetFloatv(GL_MODELVIEW_MATRIX); glPopMatrix() for each
+    object, without any GL calls.
+    """
+    count = None
+    for value in (translations, angles, scales):
+        value = None if value is None else numpy.asarray( value )
+        if value is not None and value.ndim:
+            count = len( value )
+            break
+    if count is None:
+        raise ValueError( """compose() needs at least one per-object array to determine the object count""" )
+    local = numpy.zeros( (count,4,4) )
+    local[:,3,3] = 1.0
+    if angles is not None:
+        if axes is None:
+            axes = (0.0, 1.0, 0.0)
+        axes = numpy.broadcast_to( numpy.asarray( axes, dtype=numpy.float64 ), (count,3) )
+        axes = axes / numpy.sqrt( (axes*axes).sum( axis=1 ) )[:,None]
+        local[:,:3,:3] = _rotations( numpy.radians( numpy.broadcast_to( angles, (count,) ) ), axes )
+    else:
+        local[:,0,0] = local[:,1,1] = local[:,2,2] = 1.0
+    if scales is not None:
+        scales = numpy.asarray( scales, dtype=numpy.float64 )
+        if scales.ndim < 2:
+            scales = scales.reshape( -1, 1 )
+        local[:,:3,:3] *= numpy.broadcast_to( scales, (count,3) )[:,None,:]
+    if translations is not None:
+        local[:,:3,3] = translations
+    if base is not None:
+        local = numpy.matmul( base, local )
+    return numpy.ascontiguousarray( local.transpose( 0, 2, 1 ), dtype=numpy.float32 ).reshape( count, 16 )
+
+class MatrixStack( object ):
+    """CPU-side GL_MODELVIEW/GL_PROJECTION/GL_TEXTURE matrix stacks
+
+    Attributes:
+        mode -- the current matrix mode
+        stacks -- mode: list of 4x4 float64 matrices, last is the top
+        maxDepth -- depth at which glPushMatrix reports GL_STACK_OVERFLOW
+        serial -- incremented on every change, for publish()
+    """
+    def __init__( self, maxDepth=32 ):
+        self.stacks = dict(
+            (mode, [numpy.identity( 4 )])
+            for mode in (GL_MODELVIEW, GL_PROJECTION, GL_TEXTURE)
+        )
+        self.mode = GL_MODELVIEW
+        self.maxDepth = maxDepth
+        self.serial = 0
+        self._published = {}
+    @property
+    def top( self ):
+        """Current matrix of the current mode (do not modify in place)"""
+        return self.stacks[self.mode][-1]
+    def _set( self, matrix ):
+        self.stacks[self.mode][-1] = matrix
+        self.serial += 1
+    def glMatrixMode( self, mode ):
+        if mode not in self.stacks:
+            raise error.GLError( err=GL_INVALID_ENUM, baseOperation=self.glMatrixMode, description='invalid matrix mode %r'%( mode, ) )
+        self.mode = mode
+    def glPushMatrix( self ):
+        stack = self.stacks[self.mode]
+        if len(stack) >= self.maxDepth:
+            raise error.GLError( err=GL_STACK_OVERFLOW, baseOperation=self.glPushMatrix, description='stack overflow' )
+        stack.append( stack[-1] )
+    def glPopMatrix( self ):
+        stack = self.stacks[self.mode]
+        if len(stack) < 2:
+            raise error.GLError( err=GL_STACK_UNDERFLOW, baseOperation=self.glPopMatrix, description='stack underflow' )
+        stack.pop()
+        self.serial += 1
+    def glLoadIdentity( self ):
+        self._set( numpy.identity( 4 ) )
+    def glLoadMatrixf( self, m ):
+        """Load a column-major 16-element matrix (as glLoadMatrix)"""
+        self._set( numpy.array( m, dtype=numpy.float64 ).reshape( 4, 4 ).T )
+    glLoadMatrixd = glLoadMatrixf
+    def glMultMatrixf( self, m ):
+        """Multiply by a column-major 16-element matrix (as glMultMatrix)"""
+        self._set( self.top.dot( numpy.array( m, dtype=numpy.float64 ).reshape( 4, 4 ).T ) )
+    glMultMatrixd = glMultMatrixf
+    def glTranslatef( self, x, y, z ):
+        top = self.top
+        result = top.copy()
+        result[:,3] = top.dot( numpy.array( (x, y, z, 1.0) ) )
+        self._set( result )
+    glTranslated = glTranslatef
+    def glRotatef( self, angle, x, y, z ):
+        self._set( self.top.dot( rotation( angle, x, y, z ) ) )
+    glRotated = glRotatef
+    def glScalef( self, x, y, z ):
+        self._set( self.top * (x, y, z, 1.0) )
+    glScaled = glScalef
+    def glOrtho( self, left, right, bottom, top, near, far ):
+        m = numpy.identity( 4 )
+        m[0,0] = 2.0/(right-left)
+        m[1,1] = 2.0/(top-bottom)
+        m[2,2] = -2.0/(far-near)
+        m[:3,3] = (-(right+left)/(right-left), -(top+bottom)/(top-bottom), -(far+near)/(far-near))
+        self._set( self.top.dot( m ) )
+    def glFrustum( self, left, right, bottom, top, near, far ):
+        m = numpy.zeros( (4,4) )
+        m[0,0] = 2.0*near/(right-left)
+        m[1,1] = 2.0*near/(top-bottom)
+        m[0,2] = (right+left)/(right-left)
+        m[1,2] = (top+bottom)/(top-bottom)
+        m[2,2] = -(far+near)/(far-near)
+        m[2,3] = -2.0*far*near/(far-near)
+        m[3,2] = -1.0
+        self._set( self.top.dot( m ) )
+    def gluPerspective( self, fovy, aspect, near, far ):
+        top = near * numpy.tan( numpy.radians( fovy ) / 2.0 )
+        self.glFrustum( -top*aspect, top*aspect, -top, top, near, far )
+    def gluOrtho2D( self, left, right, bottom, top ):
+        self.glOrtho( left, right, bottom, top, -1.0, 1.0 )
+    def gluLookAt( self, eyeX, eyeY, eyeZ, centerX, centerY, centerZ, upX, upY, upZ ):
+        eye = numpy.array( (eyeX, eyeY, eyeZ), dtype=numpy.float64 )
+        forward = numpy.array( (centerX, centerY, centerZ) ) - eye
+        forward /= numpy.linalg.norm( forward )
+        side = numpy.cross( forward, (upX, upY, upZ) )
+        side /= numpy.linalg.norm( side )
+        up = numpy.cross( side, forward )
+        m = numpy.identity( 4 )
+        m[0,:3], m[1,:3], m[2,:3] = side, up, -forward
+        m[:3,3] = -m[:3,:3].dot( eye )
+        self._set( self.top.dot( m ) )
+
+    def matrix( self, mode=None ):
+        """Top of the given (or current) stack as column-major float32[16]"""
+        top = self.stacks[self.mode if mode is None else mode][-1]
+        return top.astype( numpy.float32 ).ravel( 'F' )
+    def modelViewProjection( self ):
+        """projection . modelview as column-major float32[16]"""
+        combined = self.stacks[GL_PROJECTION][-1].dot( self.stacks[GL_MODELVIEW][-1] )
+        return combined.astype( numpy.float32 ).ravel( 'F' )
+    def compose( self, translations=None, angles=None, axes=None, scales=None ):
+        """Per-object matrices on top of the current matrix, see module-level compose()"""
+        return compose( self.top, translations, angles, axes, scales )
+
+    def publish( self, location, mode=None, combined=False, force=False, program=None ):
+        """Upload to a mat4 uniform with glUniformMatrix4fv, unless unchanged since the last publish
+
+        combined -- upload projection . modelview instead of a single stack
+        program -- the program currently in use, queried with
+            glGetIntegerv( GL_CURRENT_PROGRAM ) if not given
+        Returns True if an upload happened.
+        """
+        mode = self.mode if mode is None else mode
+        if program is None:
+            program = int( GL.glGetIntegerv( GL_CURRENT_PROGRAM ) )
+        key = (program, location, None if combined else mode)
+        if not force and self._published.get( key ) == self.serial:
+            return False
+        value = self.modelViewProjection() if combined else self.matrix( mode )
+        GL.glUniformMatrix4fv( location, 1, GL_FALSE, value )
+        self._published[key] = self.serial
+        return True
+    def load( self, mode=None ):
+        """Compatibility profile: glLoadMatrixf the given (or current) stack's top into GL"""
+        mode = self.mode if mode is None else mode
+        GL.glMatrixMode( mode )
+        GL.glLoadMatrixf( self.matrix( mode ) )
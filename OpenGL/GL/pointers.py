@@ -275,7 +275,7 @@ def glRenderMode( newMode ):
             )
     # Okay, now that the easy cases are out of the way...
     #  Do we have a pre-stored pointer about which the user already knows?
-    context = platform.GetCurrentContext()
+    context = contextdata.getCurrentContext()
     if context == 0:
         raise error.Error(
             """Returning from glRenderMode without a valid context!"""
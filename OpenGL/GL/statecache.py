@@ -0,0 +1,253 @@
+"""Shadow-state cache dropping redundant GL state changes
+
+Renderers tend to set the same colour, matrix mode, capability or binding
+over and over; each redundant call still costs a wrapper, a ctypes
+transition and an error check.  The functions here are drop-in
+replacements for the common state setters which remember the last value
+passed to GL and return immediately when asked to set it again:
+
+    glMatrixMode, glColor3f/4f/3ub/4ub/3fv/4fv, glEnable, glDisable,
+    glBindBuffer, glActiveTexture, glBindTexture, glUseProgram
+
+Usage:
+
+    from OpenGL.GL import statecache
+    statecache.install( globals() )   # or set PYOPENGL_STATE_CACHE=1
+    ...
+    print( statecache.cache.skipped, statecache.cache.issued )
+
+The calls below are wrapped as well, to forget whatever state they may
+change behind the cache's back: glPopAttrib, glPopClientAttrib,
+glCallList(s), glDrawArrays/glDrawElements (current colour), glMaterial*
+(colour tracking), glDelete{Textures,Buffers}, glBindVertexArray.
+glNewList suspends the cache until glEndList, as compiled calls do not
+change the state.
+
+Code which changes the cached state any other way (raw calls, ARB/EXT
+entry points, glPushAttrib/glPopAttrib issued through the raw modules,
+other libraries) must call invalidate() afterwards; so must code making a
+different context current, the cache shadows a single context.  Install
+this after OpenGL.GL.immediate when using both, so the cache forwards to
+the recording functions.
+"""
+import collections
+
+__all__ = (
+    'glMatrixMode',
+    'glColor3f', 'glColor4f', 'glColor3ub', 'glColor4ub', 'glColor3fv', 'glColor4fv',
+    'glEnable', 'glDisable',
+    'glBindBuffer', 'glActiveTexture', 'glBindTexture', 'glUseProgram',
+    'glPopAttrib', 'glPopClientAttrib', 'glCallList', 'glCallLists',
+    'glNewList', 'glEndList', 'glDrawArrays', 'glDrawElements',
+    'glMaterialf', 'glMaterialfv', 'glDeleteTextures', 'glDeleteBuffers',
+    'glBindVertexArray',
+)
+
+# cache keys, the first element is the kind accepted by invalidate()
+_MATRIX_MODE = ('matrixMode',)
+_COLOR = ('color',)
+_PROGRAM = ('program',)
+_ACTIVE_TEXTURE = ('texture',)
+
+class _Compiling( dict ):
+    """Value store while a display list is compiled: remembers nothing"""
+    def __setitem__( self, key, value ):
+        pass
+
+class StateCache( object ):
+    """Shadow copy of the state set through this module
+
+    Attributes:
+        values -- key: last value passed to GL, keys are tuples whose
+            first element is the kind (matrixMode, color, enable,
+            buffer, texture, program)
+        issued -- Counter of calls passed on to GL, per function name
+        skipped -- Counter of calls dropped as redundant, per function name
+    """
+    KINDS = ('matrixMode', 'color', 'enable', 'buffer', 'texture', 'program')
+    def __init__( self ):
+        self.values = {}
+        self.issued = collections.Counter()
+        self.skipped = collections.Counter()
+    def invalidate( self, *kinds ):
+        """Forget the shadowed state (all, or of the given kinds)
+
+        Call after changing cached state without going through this
+        module, or after making another context current.
+        """
+        if not kinds:
+            self.values.clear()
+            return
+        for kind in kinds:
+            if kind not in self.KINDS:
+                raise ValueError( """Unknown state kind %r, expected one of %s"""%( kind, ', '.join( self.KINDS )) )
+        for key in [key for key in self.values if key[0] in kinds]:
+            del self.values[key]
+    def reset( self ):
+        """Reset the issued/skipped counters"""
+        self.issued.clear()
+        self.skipped.clear()
+    def summary( self ):
+        """Return (issued, skipped) totals"""
+        return sum( self.issued.values() ), sum( self.skipped.values() )
+
+cache = StateCache()
+
+def invalidate( *kinds ):
+    """Forget the shadowed state, see StateCache.invalidate"""
+    cache.invalidate( *kinds )
+
+# the common setters are written out for speed
+def glMatrixMode( mode ):
+    c = cache
+    if c.values.get( _MATRIX_MODE ) == mode:
+        c.skipped['glMatrixMode'] += 1
+        return
+    _glMatrixMode( mode )
+    c.values[_MATRIX_MODE] = mode
+    c.issued['glMatrixMode'] += 1
+def glColor3f( red, green, blue ):
+    c = cache
+    value = (red, green, blue, 1.0)
+    if c.values.get( _COLOR ) == value:
+        c.skipped['glColor3f'] += 1
+        return
+    _glColor3f( red, green, blue )
+    c.values[_COLOR] = value
+    c.issued['glColor3f'] += 1
+def glColor4f( red, green, blue, alpha ):
+    c = cache
+    value = (red, green, blue, alpha)
+    if c.values.get( _COLOR ) == value:
+        c.skipped['glColor4f'] += 1
+        return
+    _glColor4f( red, green, blue, alpha )
+    c.values[_COLOR] = value
+    c.issued['glColor4f'] += 1
+def glEnable( cap ):
+    c = cache
+    key = ('enable', cap)
+    if c.values.get( key ) is True:
+        c.skipped['glEnable'] += 1
+        return
+    _glEnable( cap )
+    c.values[key] = True
+    c.issued['glEnable'] += 1
+def glDisable( cap ):
+    c = cache
+    key = ('enable', cap)
+    if c.values.get( key ) is False:
+        c.skipped['glDisable'] += 1
+        return
+    _glDisable( cap )
+    c.values[key] = False
+    c.issued['glDisable'] += 1
+def glBindTexture( target, texture ):
+    c = cache
+    key = ('texture', c.values.get( _ACTIVE_TEXTURE ), target)
+    if c.values.get( key ) == texture:
+        c.skipped['glBindTexture'] += 1
+        return
+    _glBindTexture( target, texture )
+    c.values[key] = texture
+    c.issued['glBindTexture'] += 1
+
+_unset = object()
+def _setter( name, key, convert ):
+    """Cached setter, key( *args ) names the state and convert( *args ) its value"""
+    def glSetter( *args ):
+        c = cache
+        k, value = key( *args ), convert( *args )
+        if c.values.get( k, _unset ) == value:
+            c.skipped[name] += 1
+            return
+        _next[name]( *args )
+        c.values[k] = value
+        c.issued[name] += 1
+    glSetter.__name__ = name
+    return glSetter
+def _invalidating( name, *kinds ):
+    """Pass-through which forgets the given kinds of state (all if none) after the call"""
+    def glInvalidating( *args, **named ):
+        try:
+            return _next[name]( *args, **named )
+        finally:
+            cache.invalidate( *kinds )
+    glInvalidating.__name__ = name
+    return glInvalidating
+
+def _ub( red, green, blue, alpha=255 ):
+    return (red/255.0, green/255.0, blue/255.0, alpha/255.0)
+def _rgba( v ):
+    v = tuple( v )
+    return v if len(v) == 4 else v[:3] + (1.0,)
+
+glColor3ub = _setter( 'glColor3ub', lambda *args: _COLOR, _ub )
+glColor4ub = _setter( 'glColor4ub', lambda *args: _COLOR, _ub )
+glColor3fv = _setter( 'glColor3fv', lambda v: _COLOR, _rgba )
+glColor4fv = _setter( 'glColor4fv', lambda v: _COLOR, _rgba )
+glBindBuffer = _setter( 'glBindBuffer', lambda target, buffer: ('buffer', target), lambda target, buffer: buffer )
+glActiveTexture = _setter( 'glActiveTexture', lambda texture: _ACTIVE_TEXTURE, lambda texture: texture )
+glUseProgram = _setter( 'glUseProgram', lambda program: _PROGRAM, lambda program: program )
+
+# GL_ALL_ATTRIB_BITS covers everything but buffer and program bindings
+glPopAttrib = _invalidating( 'glPopAttrib', 'matrixMode', 'color', 'enable', 'texture' )
+# GL_CLIENT_VERTEX_ARRAY_BIT includes the GL_ARRAY_BUFFER binding
+glPopClientAttrib = _invalidating( 'glPopClientAttrib', 'buffer' )
+glCallList = _invalidating( 'glCallList' )
+glCallLists = _invalidating( 'glCallLists' )
+# the current colour is undefined after drawing with a colour array
+glDrawArrays = _invalidating( 'glDrawArrays', 'color' )
+glDrawElements = _invalidating( 'glDrawElements', 'color' )
+# with GL_COLOR_MATERIAL a repeated glColor re-applies the colour to the material
+glMaterialf = _invalidating( 'glMaterialf', 'color' )
+glMaterialfv = _invalidating( 'glMaterialfv', 'color' )
+# deleting a bound object reverts the binding to 0
+glDeleteTextures = _invalidating( 'glDeleteTextures', 'texture' )
+glDeleteBuffers = _invalidating( 'glDeleteBuffers', 'buffer' )
+# the GL_ELEMENT_ARRAY_BUFFER binding is part of the vertex array object
+glBindVertexArray = _invalidating( 'glBindVertexArray', 'buffer' )
+
+def glNewList( list, mode ):
+    """Start a display list; compiled calls are passed through uncached"""
+    _next['glNewList']( list, mode )
+    cache.values = _Compiling()
+def glEndList( ):
+    """Finish a display list, forgetting all state (GL_COMPILE_AND_EXECUTE changed it)"""
+    try:
+        _next['glEndList']()
+    finally:
+        cache.values = {}
+
+_next = {}
+def _bind( module ):
+    """Forward to the functions currently in module (e.g. recording ones)"""
+    functions = globals()
+    for name in __all__:
+        # getattr resolves (and binds) OpenGL.GL's lazily loaded names
+        current = getattr( module, name, None )
+        if current is not None and current is not functions[name]:
+            _next[name] = current
+            functions['_'+name] = current
+
+def install( *namespaces ):
+    """Replace the state setters in OpenGL.GL and the given namespaces
+
+    namespaces -- module objects or dictionaries (e.g. globals()) which
+        imported the functions by name before installation
+    """
+    from OpenGL import GL
+    _bind( GL )
+    replacements = dict( (name, globals()[name]) for name in __all__ )
+    targets = [GL.__dict__] + [
+        getattr( namespace, '__dict__', namespace ) for namespace in namespaces
+    ]
+    for target in targets:
+        for name, function in replacements.items():
+            if name in target:
+                target[name] = function
+    return cache
+
+from OpenGL import GL as _GL
+_bind( _GL )
+del _GL
@@ -22,7 +22,7 @@ platform module *not* in the module here!
 """
 from OpenGL.platform import CurrentContextIsValid, GLUT_GUARD_CALLBACKS, PLATFORM
 GLUT = PLATFORM.GLUT
-from OpenGL import contextdata, error, platform, logs
+from OpenGL import contextdata, error, platform, logs, _configflags
 from OpenGL.raw import GLUT as _simple
 from OpenGL._bytes import bytes, unicode,as_8_bit
 import ctypes, os, sys, traceback
@@ -92,6 +92,18 @@ else:
 ##_base_glutEntryFunc = GLUT.glutEntryFunc
 ##_base_glutReshapeFunc = GLUT.glutReshapeFunc
 _base_glutDestroyWindow = getattr(GLUT, 'glutDestroyWindow', None)
+# windows created through glutCreateWindow/glutCreateSubWindow (each has its
+# own context), while there is more than one
+# GLUT switches contexts behind our back before dispatching callbacks
+_windows = set()
+
+def _refreshingContext( function ):
+    """Refresh the cached current context before callbacks when GLUT may have switched windows"""
+    def refreshingCall( *args ):
+        if len( _windows ) > 1:
+            contextdata.refreshCurrentContext()
+        return function( *args )
+    return refreshingCall
 
 class GLUTCallback( object ):
     """Class implementing GLUT Callback registration functions"""
@@ -138,6 +150,8 @@ class GLUTCallback( object ):
             finalFunction = safeCall
         else:
             finalFunction = function
+        if hasattr( finalFunction,'__call__' ):
+            finalFunction = _refreshingContext( finalFunction )
         if hasattr( finalFunction,'__call__' ):
             cCallback = self.callbackType( finalFunction )
         else:
@@ -348,5 +362,51 @@ def glutDestroyWindow( window ):
         _log.info( """Cleaning up context data for window %s: %s""", window, result )
     except Exception as err:
         _log.error( """Error attempting to clean up context data for GLUT window %s: %s""", window, result )
-    return _base_glutDestroyWindow( window )
+    _windows.discard( window )
+    try:
+        return _base_glutDestroyWindow( window )
+    finally:
+        # GLUT picks no current window after destroying one
+        contextdata.setCurrentContext( None )
 glutDestroyWindow.wrappedOperation = _simple.glutDestroyWindow
+
+def glutSwapBuffers( ):
+    """Swap buffers, then run deferred GL error checks for the finished frame"""
+    result = _simple.glutSwapBuffers()
+    error.frameBoundary()
+    return result
+glutSwapBuffers.wrappedOperation = _simple.glutSwapBuffers
+
+_base_glutCreateWindow = glutCreateWindow if __glutInitWithExit else _simple.glutCreateWindow
+def glutCreateWindow( title ):
+    """Create window with given title, caching its context as the current one
+
+    With the DEBUG_OUTPUT flag also installs a KHR_debug channel on it.
+    """
+    window = _base_glutCreateWindow( title )
+    _windows.add( window )
+    contextdata.refreshCurrentContext()
+    if _configflags.DEBUG_OUTPUT:
+        error.installDebugCallback()
+    return window
+glutCreateWindow.wrappedOperation = _simple.glutCreateWindow
+
+def glutCreateSubWindow( window, x, y, width, height ):
+    """Create a subwindow of window, caching its context as the current one
+
+    With the DEBUG_OUTPUT flag also installs a KHR_debug channel on it.
+    """
+    subWindow = _simple.glutCreateSubWindow( window, x, y, width, height )
+    _windows.add( subWindow )
+    contextdata.refreshCurrentContext()
+    if _configflags.DEBUG_OUTPUT:
+        error.installDebugCallback()
+    return subWindow
+glutCreateSubWindow.wrappedOperation = _simple.glutCreateSubWindow
+
+def glutSetWindow( window ):
+    """Make window current, updating the cached current context"""
+    result = _simple.glutSetWindow( window )
+    contextdata.refreshCurrentContext()
+    return result
+glutSetWindow.wrappedOperation = _simple.glutSetWindow
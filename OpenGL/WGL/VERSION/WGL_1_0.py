@@ -23,3 +23,7 @@ def glInitWgl10VERSION():
 ### END AUTOGENERATED SECTION
 
 wglGetCurrentDC.restyle = ctypes.HDC
+
+from OpenGL import contextdata
+# keep contextdata's cached current context in step with context switches
+wglMakeCurrent = contextdata.trackCurrent( wglMakeCurrent )
@@ -35,6 +35,41 @@ import occurs the flags should no longer be changed.
 
         Default: True
 
+    ERROR_CHECKING_MODE -- when ERROR_CHECKING is on, when to call
+        glGetError, as 'mode' or 'mode:count' (set via the
+        PYOPENGL_ERROR_CHECKING_MODE environment variable), one of
+        immediate, interval[:N], boundary, frame or sampled[:N], see
+        OpenGL.error.setCheckingMode
+
+        Default: immediate
+
+    DEBUG_OUTPUT -- if True, GLUT windows (and other contexts which
+        call OpenGL.error.installDebugCallback) get a synchronous
+        KHR_debug message callback which raises GLErrors and logs
+        driver messages, replacing glGetError after every call.
+
+        Default: False
+
+    BATCH_IMMEDIATE -- if True, OpenGL.GL exports the recording
+        glBegin/glEnd/glVertex*/glColor*/glNormal*/glTexCoord* from
+        OpenGL.GL.immediate, which draw each glBegin/glEnd pair with
+        a single glDrawArrays (requires numpy).
+
+        Default: False
+
+    LAZY_GL -- if True, OpenGL.GL imports its GL 1.2 to 4.6 VERSION
+        modules on first access to one of their names (module
+        __getattr__) rather than at import time, see OpenGL.GL._lazy
+
+        Default: True
+
+    STATE_CACHE -- if True, OpenGL.GL exports the state setters from
+        OpenGL.GL.statecache (glMatrixMode, glColor*, glEnable/glDisable,
+        glBindBuffer/Texture, glUseProgram...), which drop calls setting
+        the value already set; see that module for the invalidation rules.
+
+        Default: False
+
     ERROR_LOGGING -- If True, then wrap array-handler
         functions with  error-logging operations so that all exceptions
         will be reported to log objects in OpenGL.logs, note that
@@ -164,6 +199,39 @@ import occurs the flags should no longer be changed.
         operations.
 
         Default: True
+
+    WRAPPER_CODEGEN -- if True and OpenGL_accelerate is not in use,
+        finalised Wrapper objects get a generated, straight-line
+        __call__ specialised to their converters (see OpenGL.wrappergen)
+        instead of the generic nested-closure implementation.
+
+        Default: True
+
+    WRAPPER_CODEGEN_CACHE -- directory in which to store the compiled
+        code objects for WRAPPER_CODEGEN between runs (set via the
+        PYOPENGL_WRAPPER_CODEGEN_CACHE environment variable).
+
+        Default: None (no on-disk cache)
+
+    RAW_REGISTRY -- file built by OpenGL.raw._registry.build from
+        which the generated OpenGL.raw modules are served, instead of
+        importing them one .py/.pyc at a time, if it exists; modules
+        whose sources have changed are imported normally.  Build it with
+        python -m OpenGL.raw.buildregistry [filename] (set via the
+        PYOPENGL_RAW_REGISTRY environment variable, 0 to disable).
+
+        Default: None (the registry under $XDG_CACHE_HOME/PyOpenGL that
+        python -m OpenGL.raw.buildregistry builds, when present)
+
+    LIBRARY_CACHE -- JSON file in which the Linux library loader
+        remembers which file each of GL, GLU, GLUT, EGL... resolved to
+        (or, for a few minutes, that it is missing), so later runs
+        dlopen that path directly instead of trying libX.so,
+        libX.so.9 ... libX.so.0
+        (set via the PYOPENGL_LIBRARY_CACHE environment variable, 0
+        disables it).  See python -m OpenGL.platform.libraries
+
+        Default: None ($XDG_CACHE_HOME/PyOpenGL/libraries.json)
     
     MODULE_ANNOTATIONS -- if True, attempt to annotate alternates() and 
         constants to track in which module they are defined (only useful 
@@ -194,6 +262,11 @@ def environ_key(name, default):
 
 
 ERROR_CHECKING = environ_key("ERROR_CHECKING", True)
+ERROR_CHECKING_MODE = os.environ.get("PYOPENGL_ERROR_CHECKING_MODE") or "immediate"
+DEBUG_OUTPUT = environ_key("DEBUG_OUTPUT", False)
+BATCH_IMMEDIATE = environ_key("BATCH_IMMEDIATE", False)
+STATE_CACHE = environ_key("STATE_CACHE", False)
+LAZY_GL = environ_key("LAZY_GL", True)
 ERROR_LOGGING = environ_key("ERROR_LOGGING", False)
 ERROR_ON_COPY = environ_key("ERROR_ON_COPY", False)
 ARRAY_SIZE_CHECKING = environ_key("ARRAY_SIZE_CHECKING", True)
@@ -203,6 +276,10 @@ FORWARD_COMPATIBLE_ONLY = False
 SIZE_1_ARRAY_UNPACK = True
 USE_ACCELERATE = environ_key("USE_ACCELERATE", True)
 CONTEXT_CHECKING = environ_key("CONTEXT_CHECKING", False)
+WRAPPER_CODEGEN = environ_key("WRAPPER_CODEGEN", True)
+WRAPPER_CODEGEN_CACHE = os.environ.get("PYOPENGL_WRAPPER_CODEGEN_CACHE") or None
+RAW_REGISTRY = os.environ.get("PYOPENGL_RAW_REGISTRY") or None
+LIBRARY_CACHE = os.environ.get("PYOPENGL_LIBRARY_CACHE") or None
 
 FULL_LOGGING = environ_key("FULL_LOGGING", False)
 ALLOW_NUMPY_SCALARS = environ_key("ALLOW_NUMPY_SCALARS", False)
@@ -1,6 +1,11 @@
 """Holds the import-time constants for various configuration flags"""
 from OpenGL import (
     ERROR_CHECKING,
+    ERROR_CHECKING_MODE,
+    DEBUG_OUTPUT,
+    BATCH_IMMEDIATE,
+    STATE_CACHE,
+    LAZY_GL,
     ERROR_LOGGING,
     ERROR_ON_COPY,
     ARRAY_SIZE_CHECKING,
@@ -10,6 +15,10 @@ from OpenGL import (
     SIZE_1_ARRAY_UNPACK,
     USE_ACCELERATE,
     CONTEXT_CHECKING,
+    WRAPPER_CODEGEN,
+    WRAPPER_CODEGEN_CACHE,
+    RAW_REGISTRY,
+    LIBRARY_CACHE,
 
     FULL_LOGGING,
     ALLOW_NUMPY_SCALARS,
@@ -35,7 +35,7 @@ from OpenGL.arrays.formathandler import FormatHandler
 from OpenGL.raw.GL import _types 
 from OpenGL import error
 from OpenGL._bytes import bytes,unicode,as_8_bit
-import ctypes,logging
+import ctypes,importlib,logging
 _log = logging.getLogger( 'OpenGL.arrays.vbo' )
 from OpenGL._bytes import long, integer_types
 
@@ -50,10 +50,28 @@ class Implementation( object ):
     @classmethod
     def register( cls ):
         cls.IMPLEMENTATION_CLASSES.append( cls )
+    @classmethod
+    def registerModule( cls, name ):
+        """Register the implementation(s) module name registers, importing it on first use"""
+        cls.IMPLEMENTATION_CLASSES.append( name )
+    @classmethod
+    def _importModules( cls ):
+        """Replace registered module names with the classes their import registers"""
+        classes = cls.IMPLEMENTATION_CLASSES
+        for index, possible in enumerate( classes ):
+            if isinstance( possible, str ):
+                del classes[index]
+                before = len( classes )
+                importlib.import_module( possible )
+                registered = classes[before:]
+                del classes[before:]
+                classes[index:index] = registered
+                return cls._importModules()
     
     @classmethod 
     def get_implementation( cls, *args ):
         if cls.CHOSEN is None:
+            cls._importModules()
             for possible in cls.IMPLEMENTATION_CLASSES:
                 implementation = possible()
                 if possible:
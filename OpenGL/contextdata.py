@@ -10,6 +10,13 @@ call the cleanup function.  That means some per-GUI
 library code in OpenGL (or the library), but it gives 
 us very natural operations within OpenGL.
 
+The current context is cached per thread once a known context switch
+has been seen: GLUT window creation/selection and the EGL, GLX, WGL and
+OSMesa make-current functions call refreshCurrentContext().  Until then
+(and after setCurrentContext( None )) every lookup asks the platform.
+Code switching contexts through a foreign toolkit after such a switch
+should call refreshCurrentContext() (or setCurrentContext) itself.
+
 Note: you can entirely disable use of this module by 
 setting:
 
@@ -19,7 +26,7 @@ setting:
 before importing OpenGL functionality.
 """
 from OpenGL import platform
-import weakref
+import threading, weakref
 storedPointers = {
     # map from contextID: { constant: value }
 }
@@ -27,6 +34,33 @@ storedWeakPointers = {
     # map from contextID: WeakValueDictionary({ constant: value })
 }
 STORAGES = [ storedPointers, storedWeakPointers ]
+_current = threading.local()
+
+def getCurrentContext( ):
+    """Get the current context ID, from the per-thread cache if set, else the platform"""
+    context = getattr( _current, 'context', None )
+    if context is None:
+        return platform.GetCurrentContext()
+    return context
+def setCurrentContext( context ):
+    """Record context as this thread's current context (None: stop caching)"""
+    _current.context = context
+def refreshCurrentContext( ):
+    """Query the platform's current context and cache it for this thread"""
+    context = platform.GetCurrentContext()
+    _current.context = context
+    return context
+def trackCurrent( function ):
+    """Wrap a make-current function so the cached current context follows it"""
+    def makeCurrent( *args, **named ):
+        try:
+            return function( *args, **named )
+        finally:
+            refreshCurrentContext()
+    makeCurrent.__name__ = getattr( function, '__name__', 'makeCurrent' )
+    makeCurrent.__doc__ = getattr( function, '__doc__', None )
+    makeCurrent.wrappedOperation = function
+    return makeCurrent
 
 def getContext( context = None ):
     """Get the context (if passed, just return)
@@ -34,7 +68,7 @@ def getContext( context = None ):
     context -- the context ID, if None, the current context
     """
     if context is None:
-        context = platform.GetCurrentContext()
+        context = getCurrentContext()
         if context == 0:
             from OpenGL import error
             raise error.Error(
@@ -121,7 +155,7 @@ def cleanupContext( context=None ):
     Context object with the (now invalid) context ID as parameter.
     """
     if context is None:
-        context = platform.GetCurrentContext()
+        context = getCurrentContext()
     for storage in STORAGES:
         try:
             del storedPointers[ context ]
@@ -6,14 +6,24 @@ such as TypeError or ValueError when appropriate.
 ErrorChecker is an _ErrorChecker instance that allows you
 to register a new error-checking function for use 
 throughout the system.
+
+setCheckingMode() trades immediate glGetError calls after every
+operation for deferred checks (every N calls, at glEnd/frame
+boundaries, or only in sampled frames); deferred failures carry
+the window of recent calls in GLError.recentCalls.
+
+installDebugCallback() replaces glGetError polling with a KHR_debug
+message callback (DebugChannel).
 """
-import logging
+import collections, logging, sys, time
 _log = logging.getLogger( 'OpenGL.error' )
 from OpenGL import platform, _configflags
 from ctypes import ArgumentError
 __all__ = (
     "Error",'GLError','GLUError','GLUTError',
     'GLerror','GLUerror','GLUTerror','ArgumentError',
+    'setCheckingMode','frameBoundary','CHECKING_MODES',
+    'DebugChannel','installDebugCallback','removeDebugCallback',
 )
 
 class Error( Exception ):
@@ -57,6 +67,9 @@ class GLError( Error ):
         cArguments -- ctypes-level arguments to the operation,
             often raw integers for pointers and the like
         description -- OpenGL description of the error (textual)
+        recentCalls -- for deferred checking modes, the
+            (baseOperation, cArguments) window of calls since the
+            last check, any of which may have raised the error
     """
     def __init__( 
         self, 
@@ -67,16 +80,17 @@ class GLError( Error ):
         pyArgs=None, 
         cArgs=None,
         description=None,
+        recentCalls=None,
     ):
         """Initialise the GLError, storing metadata for later display"""
         (
             self.err, self.result, self.cArguments, 
             self.baseOperation, self.pyArgs, self.cArgs,
-            self.description
+            self.description, self.recentCalls,
         ) = (
             err, result, cArguments,
             baseOperation, pyArgs, cArgs,
-            description
+            description, recentCalls,
         )
     DISPLAY_ORDER = (
         'err', 
@@ -86,6 +100,7 @@ class GLError( Error ):
         'cArgs',
         'cArguments',
         'result', 
+        'recentCalls',
     )
     def __str__( self ):
         """Create a fully formatted representation of the error"""
@@ -151,6 +166,17 @@ class GLError( Error ):
             return '%s = %s'%( property, value.__name__ )
         else:
             return '%s = %r'%( property, value )
+    def format_recentCalls( self, property, value ):
+        """Format the deferred-check call window, oldest first"""
+        if not value:
+            return None
+        return '%s = [\n\t\t%s\n\t]'%( property, ",\n\t\t".join([
+            '%s%s'%(
+                getattr( operation, '__name__', operation ),
+                self.shortRepr( tuple(arguments or ()), False ),
+            )
+            for (operation, arguments) in value
+        ]))
 
 class GLUError( Error ):
     """GLU error implementation class"""
@@ -160,12 +186,68 @@ class GLUTError( Error ):
 class EGLError( GLError ):
     """EGL error implementation class"""
 
+CHECKING_MODES = ('immediate','interval','boundary','frame','sampled')
+_checkers = []
+
+def _parseMode( spec ):
+    """Split a 'mode' or 'mode:N' specification"""
+    mode, _, count = (spec or 'immediate').partition( ':' )
+    if mode not in CHECKING_MODES or not (count.isdigit() or not count):
+        _log.warning( """Unknown error checking mode %r, using immediate checking""", spec )
+        return 'immediate', None
+    return mode, (int(count) if count else None)
+
+def setCheckingMode( mode='immediate', count=None, history=None ):
+    """Choose when registered error checkers call glGetError
+
+    mode --
+        'immediate' -- after every call (the default)
+        'interval' -- after every count'th call (default 64)
+        'boundary' -- at each glEnd and frameBoundary()
+        'frame' -- only at frameBoundary()
+        'sampled' -- after every call, but only in every count'th
+            frame (default 60), other frames are not checked
+    history -- number of recent calls reported with a deferred error
+        (default 32)
+
+    In deferred modes errors are sticky in the GL, so an error is
+    reported at the next check, with the calls since the previous
+    check attached as GLError.recentCalls.
+
+    Applies to all currently-registered checkers and is the default
+    for ones created later.  The initial mode comes from the
+    PYOPENGL_ERROR_CHECKING_MODE environment variable ('mode' or
+    'mode:count').
+    """
+    global _defaultMode
+    if mode not in CHECKING_MODES:
+        raise ValueError( """Unknown error checking mode %r, expected one of %s"""%( mode, CHECKING_MODES ))
+    _defaultMode = (mode, count, history)
+    for checker in _checkers:
+        checker.setMode( mode, count, history )
+    if mode != 'immediate' and _ACCELERATED_CHECKER:
+        _log.warning( """Deferred error checking is not supported by the OpenGL_accelerate error checker""" )
+
+def frameBoundary():
+    """Notify error checkers that a frame has finished (called by glutSwapBuffers)"""
+    for checker in _checkers:
+        if getattr( checker, '_history', None ) is not None:
+            checker.frameBoundary()
+        channel = checker.currentChannel() if hasattr( checker, 'currentChannel' ) else None
+        if channel is not None:
+            channel.flush()
+
+_defaultMode = _parseMode( _configflags.ERROR_CHECKING_MODE ) + (None,)
+# OpenGL_accelerate's checker is in use, it only does immediate checking
+_ACCELERATED_CHECKER = False
+
 if _configflags.ERROR_CHECKING:
     from OpenGL import acceleratesupport
     _ErrorChecker = None
     if acceleratesupport.ACCELERATE_AVAILABLE:
         try:
             from OpenGL_accelerate.errorchecker import _ErrorChecker
+            _ACCELERATED_CHECKER = True
         except ImportError as err:
             _log.warning( """OpenGL_accelerate seems to be installed, but unable to import error checking entry point!""" )
     if _ErrorChecker is None:
@@ -176,8 +258,16 @@ if _configflags.ERROR_CHECKING:
                 _registeredChecker -- the checking function enabled when 
                     not doing onBegin/onEnd processing
                 _currentChecker -- currently active checking function
+                _history -- ring buffer of recent calls in deferred 
+                    modes, None for immediate checking
+                _countdown -- calls until the next deferred check
+                _interval -- value _countdown resets to after a check
+                _channelLookup -- contextdata.getValue once a DebugChannel
+                    replaces glGetError polling, see useDebugChannels
             """
             _getErrors = None
+            _history = None
+            _channelLookup = None
             def __init__( self, platform, baseOperation=None, noErrorResult=0, errorClass=GLError ):
                 """Initialize from a platform module/reference"""
                 self._isValid = platform.CurrentContextIsValid
@@ -191,7 +281,86 @@ if _configflags.ERROR_CHECKING:
                         self._registeredChecker = self._getErrors
                 else:
                     self._registeredChecker = self.nullGetError
-                self._currentChecker = self._registeredChecker
+                self._currentChecker = self._pollingChecker = self._registeredChecker
+                _checkers.append( self )
+                self.setMode( *_defaultMode )
+            def setMode( self, mode='immediate', count=None, history=None ):
+                """Configure deferred checking for this checker, see setCheckingMode"""
+                self._mode = mode
+                self._frame = 0
+                if mode == 'immediate':
+                    self._history = None
+                    return
+                self._history = collections.deque( maxlen=history or 32 )
+                if mode == 'interval':
+                    self._every = self._interval = max( 1, count or 64 )
+                elif mode == 'sampled':
+                    # the first frame is sampled
+                    self._every = max( 1, count or 60 )
+                    self._interval = 1
+                else:
+                    self._every = self._interval = sys.maxsize
+                self._countdown = self._interval
+            def flush( self ):
+                """Check now (outside glBegin/glEnd) and report the recent call window"""
+                err = self._currentChecker()
+                history = list( self._history ) if err != self._noErrorResult else None
+                self._history.clear()
+                self._countdown = self._interval
+                if history is not None:
+                    last = history[-1] if history else (None,None)
+                    raise self._errorClass(
+                        err,
+                        None,
+                        cArguments = last[1],
+                        baseOperation = last[0],
+                        description = self._describe(),
+                        recentCalls = history,
+                    )
+            def frameBoundary( self ):
+                """End of frame: check in boundary/frame/sampled modes, pick next sampled frame"""
+                if self._mode == 'interval':
+                    return
+                if self._mode == 'sampled':
+                    sampled = self._interval == 1
+                    self._frame += 1
+                    self._interval = 1 if self._frame % self._every == 0 else sys.maxsize
+                    if not sampled:
+                        self._countdown = self._interval
+                        return
+                self.flush()
+            def useDebugChannels( self ):
+                """Check the current context's DebugChannel, where one is installed, instead of calling glGetError
+
+                Contexts without a channel (see installDebugCallback) keep
+                polling glGetError; the channel is looked up per check.
+                """
+                from OpenGL import contextdata
+                self._channelLookup = contextdata.getValue
+                inBegin = self._currentChecker == self.nullGetError
+                self._registeredChecker = self.channelGetError
+                if not inBegin:
+                    self._currentChecker = self._registeredChecker
+            def currentChannel( self ):
+                """The current context's DebugChannel, None if there is none (or no context)"""
+                if self._channelLookup is None:
+                    return None
+                try:
+                    return self._channelLookup( DebugChannel )
+                except Error:
+                    return None
+            def channelGetError( self ):
+                """Error checker: the current context's channel queue, or glGetError without one"""
+                channel = self.currentChannel()
+                if channel is None or not channel.raiseErrors:
+                    return self._pollingChecker()
+                return channel.pendingError()
+            def _describe( self ):
+                """Driver message for the error being raised, if a debug channel reported it"""
+                channel = self.currentChannel()
+                if channel is not None:
+                    return channel.takeDescription()
+                return None
             def __bool__( self ):
                 """We are "true" if we actually do anything"""
                 if self._registeredChecker is self.nullGetError:
@@ -225,6 +394,29 @@ if _configflags.ERROR_CHECKING:
                     sequence.  If you are calling glBegin/glEnd in C you 
                     should call onBegin and onEnd appropriately.
                 """
+                if self._history is not None:
+                    self._history.append( (baseOperation, cArguments) )
+                    self._countdown -= 1
+                    if self._countdown > 0:
+                        return result
+                    if self._currentChecker == self.nullGetError:
+                        # inside glBegin/glEnd, onEnd makes glEnd do the check
+                        return result
+                    self._countdown = self._interval
+                    err = self._currentChecker()
+                    if err != self._noErrorResult:
+                        history = list( self._history )
+                        self._history.clear()
+                        raise self._errorClass(
+                            err,
+                            result,
+                            cArguments = cArguments,
+                            baseOperation = baseOperation,
+                            description = self._describe(),
+                            recentCalls = history,
+                        )
+                    self._history.clear()
+                    return result
                 err = self._currentChecker()
                 if err != self._noErrorResult:
                     raise self._errorClass(
@@ -232,6 +424,7 @@ if _configflags.ERROR_CHECKING:
                         result,
                         cArguments = cArguments,
                         baseOperation = baseOperation,
+                        description = self._describe(),
                     )
                 return result
             def onBegin( self ):
@@ -240,8 +433,162 @@ if _configflags.ERROR_CHECKING:
             def onEnd( self ):
                 """Called by glEnd to record the fact that glGetError will work"""
                 self._currentChecker = self._registeredChecker
+                if self._history is not None and (self._mode == 'boundary' or self._countdown <= 0):
+                    # glEnd's own errcheck does the check (a deferred one
+                    # falling due inside glBegin/glEnd waited for it)
+                    self._countdown = 1
 else:
     _ErrorChecker = None
+
+_debugLog = logging.getLogger( 'OpenGL.error.debug' )
+
+class DebugChannel( object ):
+    """KHR_debug message callback feeding GLErrors and log records
+
+    Driver messages of type GL_DEBUG_TYPE_ERROR are queued (up to
+    maxErrors) and raised as GLError by the next error check, with the
+    driver's message as the description; glGetError is then only called
+    to clear the error flag when a message arrived.  Other messages go
+    to the 'OpenGL.error.debug' logger at a level chosen by severity.
+
+    Identical messages (same source, type, id and severity) are
+    rate-limited: at most burst are logged per window seconds, the rest
+    are counted and summarised when the window rolls over or at the
+    next flush().  flush() (called from frameBoundary()) also mutes,
+    via glDebugMessageControl, any message that was suppressed more
+    than muteAfter times in one window.
+
+    The ctypes callback runs on whichever thread the driver uses (for
+    asynchronous output), so it never calls back into GL.
+    """
+    def __init__( self, raiseErrors=True, burst=5, window=1.0, muteAfter=1000, maxErrors=64 ):
+        from OpenGL.raw.GL.KHR import debug as _debug
+        from OpenGL.raw.GL import _types
+        from OpenGL.raw.GL.VERSION.GL_1_0 import GL_DONT_CARE
+        self._debug = _debug
+        self._dontCare = GL_DONT_CARE
+        self.raiseErrors = raiseErrors
+        self.burst = burst
+        self.window = window
+        self.muteAfter = muteAfter
+        self.counts = {}
+        self._windows = {}
+        self._errors = collections.deque( maxlen=maxErrors )
+        self._description = None
+        self._getErrors = None
+        self._levels = {
+            _debug.GL_DEBUG_SEVERITY_HIGH: logging.ERROR,
+            _debug.GL_DEBUG_SEVERITY_MEDIUM: logging.WARNING,
+            _debug.GL_DEBUG_SEVERITY_LOW: logging.INFO,
+            _debug.GL_DEBUG_SEVERITY_NOTIFICATION: logging.DEBUG,
+        }
+        self._errorType = _debug.GL_DEBUG_TYPE_ERROR
+        self.callback = _types.GLDEBUGPROC( self.onMessage )
+    def onMessage( self, source, type, id, severity, length, message, userParam ):
+        """GLDEBUGPROC implementation, aggregates and rate-limits messages"""
+        key = (source, type, id, severity)
+        self.counts[key] = self.counts.get( key, 0 ) + 1
+        if type == self._errorType and self.raiseErrors:
+            self._errors.append( message )
+            return
+        now = time.monotonic()
+        window = self._windows.get( key )
+        if window is None or now - window[0] >= self.window:
+            if window is not None and window[2]:
+                self._summarise( key, window )
+            window = self._windows[key] = [now, 0, 0]
+        window[1] += 1
+        if window[1] > self.burst:
+            window[2] += 1
+            return
+        level = self._levels.get( severity, logging.INFO )
+        if _debugLog.isEnabledFor( level ):
+            _debugLog.log(
+                level, """GL debug 0x%x/0x%x id=%s: %s""",
+                source, type, id, message.decode( 'utf-8', 'replace' ) if message else '',
+            )
+    def _summarise( self, key, window ):
+        level = self._levels.get( key[3], logging.INFO )
+        _debugLog.log(
+            level, """GL debug 0x%x/0x%x id=%s: %s further identical messages suppressed""",
+            key[0], key[1], key[2], window[2],
+        )
+    def pendingError( self ):
+        """Error checker: GL_NO_ERROR unless the driver reported an error"""
+        if not self._errors:
+            return 0
+        message = self._errors.popleft()
+        self._errors.clear()
+        self._description = message.decode( 'utf-8', 'replace' ) if message else None
+        # clear the (sticky) error flag, which also gives us the real code
+        err = self._getErrors() if self._getErrors else 0
+        return err or self._debug.GL_DEBUG_TYPE_ERROR
+    def takeDescription( self ):
+        """Return and forget the message text of the error being raised"""
+        description, self._description = self._description, None
+        return description
+    def flush( self ):
+        """Summarise suppressed messages and mute message storms"""
+        for key, window in list( self._windows.items() ):
+            if window[2]:
+                self._summarise( key, window )
+                if window[2] > self.muteAfter:
+                    source, type, id, severity = key
+                    ids = (self._debug.GLuint * 1)( id )
+                    # the spec requires GL_DONT_CARE severity when passing ids
+                    self._debug.glDebugMessageControl( source, type, self._dontCare, 1, ids, False )
+                    _debugLog.warning( """Muted GL debug message 0x%x/0x%x id=%s""", source, type, id )
+                window[1] = window[2] = 0
+
+def installDebugCallback( synchronous=True, raiseErrors=True, **named ):
+    """Install a DebugChannel on the current context
+
+    synchronous -- enable GL_DEBUG_OUTPUT_SYNCHRONOUS so messages are
+        delivered during the offending call (required for errors to be
+        attributed to the right operation)
+    raiseErrors -- raise GLError for GL_DEBUG_TYPE_ERROR messages, if
+        False they are logged like any other message
+    named -- passed to DebugChannel
+
+    While installed (and raiseErrors is set), the GL error checker stops
+    calling glGetError after every operation and checks the channel's
+    queue instead.  Returns the channel, or None if the context does not
+    support KHR_debug (or GL 4.3).  Called automatically for GLUT windows
+    when PYOPENGL_DEBUG_OUTPUT is set.
+    """
+    from OpenGL import contextdata
+    from OpenGL.raw.GL.KHR import debug as _debug
+    from OpenGL.raw.GL.VERSION import GL_1_0
+    from OpenGL.raw.GL import _errors
+    if not bool( _debug.glDebugMessageCallback ):
+        _log.info( """KHR_debug is not available, keeping glGetError checking""" )
+        return None
+    checker = getattr( _errors, '_error_checker', None )
+    channel = DebugChannel( raiseErrors=raiseErrors, **named )
+    # the unchecked entry point, GL_1_0.glGetError would recurse into the checker
+    channel._getErrors = platform.PLATFORM.GL.glGetError
+    contextdata.setValue( DebugChannel, channel )
+    GL_1_0.glEnable( _debug.GL_DEBUG_OUTPUT )
+    if synchronous:
+        GL_1_0.glEnable( _debug.GL_DEBUG_OUTPUT_SYNCHRONOUS )
+    _debug.glDebugMessageCallback( channel.callback, None )
+    if raiseErrors and checker is not None and hasattr( checker, 'useDebugChannels' ):
+        # the checker is shared by all contexts, it finds this context's channel per check
+        checker.useDebugChannels()
+    return channel
+
+def removeDebugCallback():
+    """Remove the current context's DebugChannel and restore glGetError checking"""
+    from OpenGL import contextdata
+    from OpenGL.raw.GL.KHR import debug as _debug
+    channel = contextdata.getValue( DebugChannel )
+    if channel is None:
+        return None
+    # the checker goes back to glGetError for this context once the channel is gone
+    _debug.glDebugMessageCallback( _debug.GLDEBUGPROC(), None )
+    contextdata.delValue( DebugChannel )
+    return channel
+
 # Compatibility with PyOpenGL 2.x series
 GLUerror = GLUError
 GLerror = GLError 
@@ -1,2 +1,6 @@
 from OpenGL.raw.osmesa._types import *
 from OpenGL.raw.osmesa.mesa import *
+
+from OpenGL import contextdata
+# keep contextdata's cached current context in step with context switches
+OSMesaMakeCurrent = contextdata.trackCurrent( OSMesaMakeCurrent )
@@ -260,9 +260,9 @@ class BasePlatform( object ):
 #            return True
         if not name:
             return True
-        context = self.GetCurrentContext()
+        from OpenGL import contextdata
+        context = contextdata.getCurrentContext()
         if context:
-            from OpenGL import contextdata
             set = contextdata.getValue( 'extensions', context=context )
             if set is None:
                 set = {}
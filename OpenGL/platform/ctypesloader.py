@@ -3,7 +3,7 @@
 We keep rewriting functions as the main entry points change,
 so let's just localise the changes here...
 """
-import ctypes, logging, os, sys
+import ctypes, json, logging, os, sys, time
 _log = logging.getLogger( 'OpenGL.platform.ctypesloader' )
 #_log.setLevel( logging.DEBUG )
 ctypes_version = [
@@ -11,9 +11,19 @@ ctypes_version = [
 ]
 from ctypes import util
 import OpenGL
+from OpenGL._configflags import LIBRARY_CACHE
 
 DLL_DIRECTORY = os.path.join( os.path.dirname( OpenGL.__file__ ), 'DLLS' )
 
+# (name, path or None, source, dlopen attempts, seconds) per posix library
+# resolution in this process, for python -m OpenGL.platform.libraries
+resolutions = []
+
+# seconds a cached failure to find a library is trusted: installing one rarely
+# changes ld.so.cache or LD_LIBRARY_PATH in a way the stamp notices (e.g. a
+# library placed in a directory already cached), so retry the search soon
+FAILURE_LIFETIME = 300
+
 def loadLibrary( dllType, name, mode = ctypes.RTLD_GLOBAL ):
     """Load a given library by name with the given mode
     
@@ -36,6 +46,85 @@ def loadLibrary( dllType, name, mode = ctypes.RTLD_GLOBAL ):
         return _loadLibraryWindows(dllType, name, mode)
 
 
+def cacheFile( setting=LIBRARY_CACHE ):
+    """Filename of the persistent library resolution cache, None if disabled"""
+    if setting is None:
+        base = os.environ.get( 'XDG_CACHE_HOME' ) or os.path.join( os.path.expanduser( '~' ), '.cache' )
+        return os.path.join( base, 'PyOpenGL', 'libraries.json' )
+    if setting.lower() in ('0', 'false'):
+        return None
+    return setting
+
+_cache = None
+def _entries( ):
+    """The resolution cache, key: {'path': path or None, 'mtime'/'time': ..., 'stamp': ...}"""
+    global _cache
+    if _cache is None:
+        _cache = {}
+        filename = cacheFile()
+        if filename and os.path.isfile( filename ):
+            try:
+                with open( filename ) as handle:
+                    _cache = json.load( handle )
+            except (OSError, ValueError) as err:
+                _log.info( 'Ignoring unreadable library cache %s: %s', filename, err )
+    return _cache
+
+def _saveEntries( ):
+    filename = cacheFile()
+    if not filename:
+        return
+    try:
+        os.makedirs( os.path.dirname( os.path.abspath( filename ) ), exist_ok=True )
+        temporary = '%s.%d'%( filename, os.getpid() )
+        with open( temporary, 'w' ) as handle:
+            json.dump( _cache, handle, indent=1, sort_keys=True )
+        os.replace( temporary, filename )
+    except OSError as err:
+        _log.debug( 'Unable to write library cache %s: %s', filename, err )
+
+def _cacheKey( name ):
+    """Key for a library: platform, word size, PYOPENGL_PLATFORM and LD_LIBRARY_PATH"""
+    return '%s-%dbit|%s|%s|%s'%(
+        sys.platform, ctypes.sizeof( ctypes.c_void_p )*8,
+        os.environ.get( 'PYOPENGL_PLATFORM', '' ),
+        os.environ.get( 'LD_LIBRARY_PATH', '' ),
+        name,
+    )
+
+def _mtime( path ):
+    try:
+        return os.stat( path ).st_mtime
+    except OSError:
+        return None
+
+def _searchStamp( ):
+    """Modification times of what decides a dlopen search: ld.so.cache and LD_LIBRARY_PATH"""
+    paths = ['/etc/ld.so.cache'] + [
+        path for path in os.environ.get( 'LD_LIBRARY_PATH', '' ).split( os.pathsep ) if path
+    ]
+    return [_mtime( path ) for path in paths]
+
+class _LinkMap( ctypes.Structure ):
+    """Leading fields of glibc's struct link_map"""
+    _fields_ = [('l_addr', ctypes.c_void_p), ('l_name', ctypes.c_char_p)]
+_RTLD_DI_LINKMAP = 2
+
+def _loadedPath( library ):
+    """Absolute filename the dynamic loader opened for library, or None"""
+    try:
+        dlinfo = ctypes.CDLL( None ).dlinfo
+    except (AttributeError, OSError):
+        return None
+    linkMap = ctypes.POINTER( _LinkMap )()
+    if dlinfo( ctypes.c_void_p( library._handle ), _RTLD_DI_LINKMAP, ctypes.byref( linkMap ) ) != 0:
+        return None
+    path = linkMap.contents.l_name
+    if not path:
+        return None
+    path = os.fsdecode( path )
+    return path if os.path.isabs( path ) else None
+
 def _loadLibraryPosix(dllType, name, mode):
     """Load a given library for posix systems
 
@@ -46,8 +135,33 @@ def _loadLibraryPosix(dllType, name, mode):
     ship only libGLU.so.1 by default. Files ending with .so are normally used when compiling and are
     provided by dev packages.
 
+    The file found is remembered in cacheFile() and reused while that file's mtime,
+    /etc/ld.so.cache and the LD_LIBRARY_PATH directories are unchanged; the fact that none was
+    found is also only reused for FAILURE_LIFETIME seconds.
+
     returns the ctypes C-module object
     """
+    start = time.perf_counter()
+    key = _cacheKey( name )
+    stamp = _searchStamp()
+    entry = _entries().get( key )
+    if entry is not None and entry.get( 'stamp' ) == stamp:
+        path = entry.get( 'path' )
+        if path is None:
+            if 0 <= time.time() - entry.get( 'time', 0 ) < FAILURE_LIFETIME:
+                resolutions.append( (name, None, 'cached failure', 0, time.perf_counter()-start) )
+                _log.info( 'Failed to load library ( %r ): cached failure in %s', name, cacheFile() )
+                return None
+        elif _mtime( path ) == entry.get( 'mtime' ):
+            try:
+                result = dllType(path, mode)
+            except Exception as err:
+                _log.debug( 'Cached library %s failed to load, searching: %s', path, err )
+            else:
+                resolutions.append( (name, path, 'cache', 1, time.perf_counter()-start) )
+                _log.debug( 'Loaded %s => %s %s (cached)', name, path, result )
+                return result
+
     prefix = 'lib'
     suffix = '.so'
     base_name = prefix + name + suffix
@@ -59,14 +173,23 @@ def _loadLibraryPosix(dllType, name, mode):
     ])))
     err = None
 
-    for filename in filenames_to_try:
+    for attempts, filename in enumerate(filenames_to_try, 1):
         try:
             result = dllType(filename, mode)
-            _log.debug( 'Loaded %s => %s %s', base_name, filename, result)
-            return result
         except Exception as current_err:
             err = current_err
-    
+            continue
+        _log.debug( 'Loaded %s => %s %s', base_name, filename, result)
+        path = _loadedPath( result )
+        resolutions.append( (name, path or filename, 'search', attempts, time.perf_counter()-start) )
+        if path is not None:
+            _entries()[key] = {'path': path, 'mtime': _mtime( path ), 'stamp': stamp}
+            _saveEntries()
+        return result
+
+    resolutions.append( (name, None, 'failed', len(filenames_to_try), time.perf_counter()-start) )
+    _entries()[key] = {'path': None, 'stamp': stamp, 'time': time.time()}
+    _saveEntries()
     _log.info('''Failed to load library ( %r ): %s''', filename, err or 'No filenames available to guess?')
 
 def _loadLibraryWindows(dllType, name, mode):
@@ -0,0 +1,49 @@
+"""Report which libraries the platform loaded, from where and how fast
+
+    python -m OpenGL.platform.libraries [--clear]
+
+Loads every library the current platform (PYOPENGL_PLATFORM) provides and
+prints, per resolution, where it came from (the persistent cache, a
+search through libX.so, libX.so.9 ... libX.so.0, or a failure), the
+number of dlopen attempts, the time taken and the file loaded.  --clear
+removes the cache file first, so the libraries are searched for afresh
+(those the platform already loaded while being imported are listed as
+they were found).
+"""
+import os, sys
+
+LIBRARIES = ('GL', 'GLU', 'GLUT', 'GLE', 'GLES1', 'GLES2', 'EGL', 'GLX', 'OSMesa')
+
+def report( out=sys.stdout ):
+    """Load the platform's libraries and write the resolution table to out"""
+    from OpenGL import platform
+    from OpenGL.platform import ctypesloader
+    plugin = platform.PLATFORM
+    for name in LIBRARIES:
+        if hasattr( type( plugin ), name ):
+            try:
+                getattr( plugin, name )
+            except (ImportError, OSError, AttributeError) as err:
+                out.write( '%s: %s\n'%( name, err ))
+    out.write( 'platform: %s (PYOPENGL_PLATFORM=%s)\n'%(
+        type( plugin ).__name__, os.environ.get( 'PYOPENGL_PLATFORM', '' ),
+    ))
+    out.write( 'cache: %s\n'%( ctypesloader.cacheFile() or 'disabled', ))
+    out.write( '%-10s %-15s %8s %9s  %s\n'%( 'library', 'source', 'attempts', 'ms', 'path' ))
+    for name, path, source, attempts, seconds in ctypesloader.resolutions:
+        out.write( '%-10s %-15s %8d %9.3f  %s\n'%( name, source, attempts, seconds*1000, path or '-' ))
+
+def main( argv=None ):
+    argv = sys.argv[1:] if argv is None else argv
+    if '--clear' in argv:
+        from OpenGL.platform import ctypesloader
+        filename = ctypesloader.cacheFile()
+        if filename and os.path.exists( filename ):
+            os.remove( filename )
+            print( 'removed %s'%( filename, ))
+        ctypesloader._cache = {}
+    report()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit( main() )
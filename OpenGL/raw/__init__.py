@@ -3,4 +3,7 @@
 This sub-package is autogenerated using a customised version
 of the ctypes codegenerator package (see src/openglgenerator.py and
 src/generateraw.py).
-"""
\ No newline at end of file
+"""
+from OpenGL._configflags import RAW_REGISTRY as _RAW_REGISTRY
+from OpenGL.raw import _registry
+_registry.install( _RAW_REGISTRY )
@@ -0,0 +1,246 @@
+"""Compact registry of the generated raw binding modules
+
+The OpenGL.raw.* extension and VERSION modules written by the xml_generate
+script are pure declarations: a header, Constant definitions and @_f
+@_p.types stub functions.  build() parses them (without importing them)
+into a single file holding, per module, the extension name, a reference
+to one of a handful of shared headers, the constant names and values and
+each function's name, signature and argument names.
+
+OpenGL.raw calls install(), which puts a finder first on sys.meta_path
+serving those modules from the memory-mapped file: one open and one
+small index unmarshal per process, then a stat and a slice unmarshal per
+module imported, instead of the directory scans, opens and code-object
+unmarshals of the import system.  The modules produced are equivalent to
+the generated ones (the same Constants and platform.createFunction
+results).
+
+The registry is used when registryFile() exists: a file under
+$XDG_CACHE_HOME/PyOpenGL named for this version and installation by
+default, PYOPENGL_RAW_REGISTRY names another one, 0 disables it.
+Importing OpenGL never writes it, build it (for an installation, or as
+a packaging step) with
+
+    python -m OpenGL.raw.buildregistry [filename]
+
+A registry built by another PyOpenGL version or for another installation
+directory is ignored.  Each module's source mtime and size are recorded:
+a module whose .py file no longer matches is imported normally, a module
+whose .py file is absent is served from the registry, so the files are
+optional for an installation shipping a registry, and modules missing
+from the registry (added since, or not in the generated layout) are
+imported normally.  The registry file itself is only read.
+"""
+import hashlib, importlib.util, logging, marshal, mmap, os, re, struct, sys
+from OpenGL.version import __version__
+
+_log = logging.getLogger( 'OpenGL.raw._registry' )
+
+MAGIC = b'PyOpenGL raw registry 3\n'
+_LENGTH = struct.Struct( '<I' )
+ROOT = os.path.dirname( os.path.abspath( __file__ ) )
+
+_GENERATED = "'''Autogenerated by xml_generate script"
+_CONSTANT = re.compile( r"^(\w+)=_C\('(\w+)',(0[xX][0-9a-fA-F]+|-?[0-9]+)\)$" )
+_TYPES = re.compile( r"^@_p\.types\((.*)\)$" )
+_DEF = re.compile( r"^def (\w+)\(([\w,]*)\):pass$" )
+_EXTENSION = re.compile( r"^_EXTENSION_NAME = ('\w+')$", re.M )
+
+def registryFile( setting=None ):
+    """Filename of the registry to use, None if disabled"""
+    if setting is None:
+        base = os.environ.get( 'XDG_CACHE_HOME' ) or os.path.join( os.path.expanduser( '~' ), '.cache' )
+        installation = hashlib.sha1( ROOT.encode( 'utf-8', 'surrogateescape' ) ).hexdigest()[:12]
+        return os.path.join( base, 'PyOpenGL', 'raw-%s-%s.registry'%( __version__, installation ) )
+    if setting.lower() in ('0', 'false'):
+        return None
+    return setting
+
+def parse( source ):
+    """Parse a generated raw module's source
+
+    Returns (header, extension, constants, functions) or None if the
+    source is not exactly in the generated layout; the extension name in
+    the header is replaced by _EXTENSION_NAME so headers can be shared.
+    """
+    if not source.startswith( _GENERATED ):
+        return None
+    extension = _EXTENSION.search( source )
+    if extension is None:
+        return None
+    lines = source.split( '\n' )
+    start = 0
+    while start < len( lines ) and lines[start] != '@_f' and not _CONSTANT.match( lines[start] ):
+        start += 1
+    header = '\n'.join( lines[:start] ).replace( extension.group( 1 ), '_EXTENSION_NAME' )
+    constants, functions = [], []
+    types = None
+    for line in lines[start:]:
+        if not line or line.startswith( '#' ) or line == '@_f':
+            continue
+        match = _CONSTANT.match( line )
+        if match and match.group( 1 ) == match.group( 2 ):
+            constants.append( (match.group( 1 ), int( match.group( 3 ), 0 )) )
+            continue
+        match = _TYPES.match( line )
+        if match and types is None:
+            types = match.group( 1 )
+            continue
+        match = _DEF.match( line )
+        if match and types is not None:
+            argNames = tuple( name for name in match.group( 2 ).split( ',' ) if name )
+            functions.append( (match.group( 1 ), types, argNames) )
+            types = None
+            continue
+        return None
+    if types is not None:
+        return None
+    return header, extension.group( 1 )[1:-1], tuple( constants ), tuple( functions )
+
+def _stamp( path ):
+    """(mtime_ns, size) of path, None if it does not exist"""
+    try:
+        info = os.stat( path )
+    except OSError:
+        return None
+    return (info.st_mtime_ns, info.st_size)
+
+def _sourceFile( fullname, root=ROOT ):
+    return os.path.join( root, *fullname.split( '.' )[2:] ) + '.py'
+
+def build( filename, root=ROOT ):
+    """Write the registry of all generated modules under root (OpenGL/raw) to filename
+
+    The file is written under a temporary name and renamed into place.
+    Returns the number of modules registered.
+    """
+    headers, records, stamps = [], {}, {}
+    for directory, subdirectories, files in os.walk( root ):
+        subdirectories[:] = sorted( name for name in subdirectories if name != '__pycache__' )
+        relative = os.path.relpath( directory, root )
+        package = 'OpenGL.raw' if relative == '.' else 'OpenGL.raw.'+relative.replace( os.sep, '.' )
+        for name in sorted( files ):
+            path = os.path.join( directory, name )
+            if not name.endswith( '.py' ) or name == '__init__.py':
+                continue
+            stamp = _stamp( path )
+            with open( path, encoding='utf-8' ) as handle:
+                parsed = parse( handle.read() )
+            if parsed is None:
+                continue
+            header, extension, constants, functions = parsed
+            if header not in headers:
+                headers.append( header )
+            fullname = package+'.'+name[:-3]
+            records[fullname] = marshal.dumps(
+                (headers.index( header ), extension, constants, functions)
+            )
+            stamps[fullname] = stamp
+    index, offset = {}, 0
+    for module in sorted( records ):
+        index[module] = (offset, len( records[module] )) + stamps[module]
+        offset += len( records[module] )
+    table = marshal.dumps( (__version__, root, tuple( headers ), index) )
+    directory = os.path.dirname( os.path.abspath( filename ) )
+    os.makedirs( directory, exist_ok=True )
+    temporary = '%s.%d'%( filename, os.getpid() )
+    try:
+        with open( temporary, 'wb' ) as handle:
+            handle.write( MAGIC )
+            handle.write( _LENGTH.pack( len( table ) ) )
+            handle.write( table )
+            for module in sorted( records ):
+                handle.write( records[module] )
+        os.replace( temporary, filename )
+    except OSError:
+        if os.path.exists( temporary ):
+            os.remove( temporary )
+        raise
+    return len( records )
+
+class _Declaration( object ):
+    """Stands in for the @_p.types decorated stub passed to _f"""
+    def __init__( self, name, module, resultType, argTypes, argNames ):
+        self.__name__ = name
+        self.__module__ = module
+        self.resultType = resultType
+        self.argTypes = argTypes
+        self.argNames = argNames
+
+class Registry( object ):
+    """Finder/loader serving the registered modules from the mapped file"""
+    def __init__( self, filename ):
+        with open( filename, 'rb' ) as handle:
+            self.data = mmap.mmap( handle.fileno(), 0, access=mmap.ACCESS_READ )
+        if self.data[:len( MAGIC )] != MAGIC:
+            raise ValueError( """%r is not a raw registry"""%( filename, ) )
+        start = len( MAGIC ) + _LENGTH.size
+        length, = _LENGTH.unpack( self.data[len( MAGIC ):start] )
+        self.version, self.root, headers, self.index = marshal.loads( self.data[start:start+length] )
+        self.base = start + length
+        self.filename = filename
+        self.headers = [compile( header, '<raw header %d>'%( i, ), 'exec' ) for i, header in enumerate( headers )]
+        self.types = {}
+    def current( self, root=ROOT ):
+        """Whether the registry was built by this PyOpenGL version from root"""
+        return self.version == __version__ and self.root == root
+    def record( self, fullname ):
+        """(header, extension, constants, functions) for the module"""
+        offset, length = self.index[fullname][:2]
+        offset += self.base
+        return marshal.loads( self.data[offset:offset+length] )
+    def find_spec( self, fullname, path=None, target=None ):
+        entry = self.index.get( fullname )
+        if entry is None:
+            return None
+        stamp = _stamp( _sourceFile( fullname, self.root ) )
+        if stamp is not None and stamp != entry[2:]:
+            _log.info( 'Raw module %s changed since %s was built, importing it normally', fullname, self.filename )
+            return None
+        return importlib.util.spec_from_loader( fullname, self, origin=self.filename )
+    def create_module( self, spec ):
+        return None
+    def exec_module( self, module ):
+        header, extension, constants, functions = self.record( module.__name__ )
+        namespace = module.__dict__
+        namespace['_EXTENSION_NAME'] = extension
+        exec( self.headers[header], namespace )
+        Constant = namespace['_C']
+        for name, value in constants:
+            namespace[name] = Constant( name, value )
+        _f, types, moduleName = namespace['_f'], self.types, module.__name__
+        for name, signature, argNames in functions:
+            code = types.get( signature )
+            if code is None:
+                code = types[signature] = compile( '(%s,)'%( signature.rstrip( ',' ), ), '<raw types>', 'eval' )
+            resultType, *argTypes = eval( code, namespace )
+            namespace[name] = _f( _Declaration( name, moduleName, resultType, tuple( argTypes ), argNames ) )
+
+def install( setting=None ):
+    """Serve the registered raw modules from registryFile( setting ), if it exists
+
+    setting -- the RAW_REGISTRY configuration value, see registryFile
+
+    Returns the Registry, or None if disabled, missing, unreadable or built
+    by another version or installation (the raw modules are then imported
+    normally).
+    """
+    for finder in sys.meta_path:
+        if isinstance( finder, Registry ):
+            return finder
+    filename = registryFile( setting )
+    if filename is None or not os.path.isfile( filename ):
+        return None
+    try:
+        registry = Registry( filename )
+    except (OSError, ValueError, EOFError, TypeError) as err:
+        _log.info( 'Raw registry %r unusable, importing raw modules normally: %s', filename, err )
+        return None
+    if not registry.current():
+        _log.info(
+            'Raw registry %r was built by PyOpenGL %s from %s, importing raw modules normally',
+            filename, registry.version, registry.root,
+        )
+        return None
+    sys.meta_path.insert( 0, registry )
+    return registry
@@ -0,0 +1,20 @@
+"""Build the registry OpenGL.raw serves its generated modules from
+
+    python -m OpenGL.raw.buildregistry [filename]
+
+Writes the OpenGL.raw._registry file for this installation to filename,
+by default the registryFile() that is used when PYOPENGL_RAW_REGISTRY is
+not set.
+"""
+import sys
+
+def main( argv=None ):
+    from OpenGL.raw import _registry
+    argv = sys.argv[1:] if argv is None else argv
+    filename = argv[0] if argv else _registry.registryFile()
+    count = _registry.build( filename )
+    print( 'Built raw registry %s (%s modules)'%( filename, count ))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit( main() )
@@ -2,7 +2,7 @@
 import ctypes, logging
 from OpenGL import platform, error
 assert platform
-from OpenGL._configflags import STORE_POINTERS, ERROR_ON_COPY, SIZE_1_ARRAY_UNPACK
+from OpenGL._configflags import STORE_POINTERS, ERROR_ON_COPY, SIZE_1_ARRAY_UNPACK, WRAPPER_CODEGEN
 from OpenGL import converters
 from OpenGL.converters import DefaultCConverter
 from OpenGL.converters import returnCArgument,returnPyArgument
@@ -420,6 +420,17 @@ class Wrapper( LateBind ):
         wrappedOperation = self.wrappedOperation
         storeValues = getattr( self, 'storeValues', None )
         returnValues = getattr( self, 'returnValues', None )
+        if WRAPPER_CODEGEN and not cWrapper:
+            try:
+                from OpenGL import wrappergen
+                return wrappergen.specialise(
+                    self, pyConverters, cConverters, cResolvers, storeValues, returnValues,
+                )
+            except Exception as err:
+                _log.warning(
+                    """Unable to generate specialised call for %s, using generic wrapper: %s""",
+                    wrappedOperation.__name__, err,
+                )
         if pyConverters:
             if cWrapper:
                 calculate_pyArgs = PyArgCalculator(
@@ -0,0 +1,240 @@
+"""Pure-Python specialiser for wrapper.Wrapper call paths
+
+Without OpenGL_accelerate, Wrapper.finaliseCall falls back to nested
+closures which drive generators over the converter lists on every call.
+specialise() instead emits straight-line source for the particular shape
+of a wrapper (which converters exist, which are plain copies, constants,
+index lookups or callables) with every converter bound as a local, and
+compiles it once.
+
+The generated source only depends on that shape, never on the converter
+objects themselves, so wrappers with the same shape share one code object.
+If PYOPENGL_WRAPPER_CODEGEN_CACHE names a directory, the compiled code
+objects are marshalled there and reused by later runs of the same Python.
+"""
+import ctypes, hashlib, logging, marshal, os, sys, threading, atexit
+from OpenGL import error, converters
+from OpenGL._null import NULL
+from OpenGL._configflags import WRAPPER_CODEGEN_CACHE
+_log = logging.getLogger( 'OpenGL.wrappergen' )
+
+_factories = {}
+_codes = None
+_dirty = False
+_lock = threading.Lock()
+
+def cacheFile( directory=WRAPPER_CODEGEN_CACHE ):
+    """Path of the on-disk code cache for this interpreter (or None)"""
+    if not directory:
+        return None
+    return os.path.join(
+        directory, 'wrappergen-%s.marshal'%( sys.implementation.cache_tag or 'python', ),
+    )
+
+def _loadCodes():
+    global _codes
+    _codes = {}
+    filename = cacheFile()
+    if filename and os.path.exists( filename ):
+        try:
+            with open( filename, 'rb' ) as fh:
+                _codes = marshal.load( fh )
+        except Exception as err:
+            _log.info( "Ignoring unreadable wrapper cache %s: %s", filename, err )
+            _codes = {}
+    if filename:
+        atexit.register( saveCache )
+
+def saveCache():
+    """Write newly compiled code objects to the cache directory, if configured"""
+    global _dirty
+    filename = cacheFile()
+    if not (filename and _dirty):
+        return
+    try:
+        os.makedirs( os.path.dirname( filename ), exist_ok=True )
+        tmp = '%s.%s.tmp'%( filename, os.getpid() )
+        with open( tmp, 'wb' ) as fh:
+            marshal.dump( _codes, fh )
+        os.replace( tmp, filename )
+        _dirty = False
+    except OSError as err:
+        _log.info( "Unable to write wrapper cache %s: %s", filename, err )
+
+def _factory( source ):
+    """Compile (or fetch) the factory function for the given source"""
+    global _dirty
+    factory = _factories.get( source )
+    if factory is not None:
+        return factory
+    with _lock:
+        if _codes is None:
+            _loadCodes()
+        key = hashlib.sha1( source.encode( 'utf-8' ) ).hexdigest()
+        code = _codes.get( key )
+        if code is None:
+            code = compile( source, '<wrappergen %s>'%( key[:12], ), 'exec' )
+            _codes[key] = code
+            _dirty = True
+        namespace = {}
+        exec( code, namespace )
+        factory = _factories[source] = namespace['factory']
+    return factory
+
+def _pyIndex( converter, count ):
+    """Static pyArgs index a c-converter copies from, or None"""
+    if isinstance( converter, converters.DefaultCConverter ):
+        index = converter.index
+    elif isinstance( converter, converters.getPyArgsName ):
+        index = getattr( converter, 'index', None )
+    else:
+        return None
+    if isinstance( index, int ) and 0 <= index < count:
+        return index
+    return None
+
+def specialise( wrapper, pyConverters, cConverters, cResolvers, storeValues, returnValues ):
+    """Produce a straight-line __call__ replacement for the finalised wrapper
+
+    Semantics (argument checks, NULL for missing optional arguments,
+    annotated exceptions, the pyArgs/cArgs passed to storeValues and
+    returnValues) follow the closures in Wrapper.finaliseCall.
+    """
+    params = ['wrappedOperation','self','NULL','ArgumentError','GLError','arityError']
+    values = [wrapper.wrappedOperation, wrapper, NULL, ctypes.ArgumentError, error.GLError, None]
+    body = []
+    def bind( name, value ):
+        params.append( name )
+        values.append( value )
+
+    # Python-level arguments
+    if pyConverters:
+        required = len([p for p in pyConverters if not getattr( p, 'optional', False )])
+        if required:
+            values[5] = _arityError( wrapper, required )
+            body.append( 'if len(args) < %d: arityError(args)'%( required, ) )
+        pyNames = []
+        for i,converter in enumerate( pyConverters ):
+            name = 'p%d'%( i, )
+            pyNames.append( name )
+            if converter is None:
+                body.append( '%s = args[%d]'%( name, i ) )
+                continue
+            bind( 'py%d'%( i, ), converter )
+            if isinstance( converter, converters.CallFuncPyConverter ):
+                bind( 'pyf%d'%( i, ), converter.function )
+                call = 'pyf%d(args[%d])'%( i, i )
+            else:
+                call = 'py%d(args[%d], self, args)'%( i, i )
+            body.extend([
+                'try:',
+                '    %s = %s'%( name, call ),
+                'except IndexError:',
+                '    %s = NULL'%( name, ),
+                'except Exception as err:',
+                '    if hasattr(err, "args"):',
+                '        err.args += (py%d,)'%( i, ),
+                '    raise',
+            ])
+        body.append( 'pyArgs = (%s)'%( ''.join( n+', ' for n in pyNames ), ) )
+    else:
+        pyNames = None
+        body.append( 'pyArgs = args' )
+
+    # C-level arguments
+    if cConverters:
+        cNames = []
+        context = 'pyArgs, %d, self,' if pyConverters else 'pyArgs, %d,'
+        for i,converter in enumerate( cConverters ):
+            name = 'a%d'%( i, )
+            cNames.append( name )
+            index = _pyIndex( converter, len(pyNames) ) if pyNames is not None else None
+            if index is not None:
+                body.append( '%s = %s'%( name, pyNames[index] ) )
+            elif not hasattr( converter, '__call__' ):
+                bind( 'c%d'%( i, ), converter )
+                body.append( '%s = c%d'%( name, i ) )
+            else:
+                bind( 'c%d'%( i, ), converter )
+                body.extend([
+                    'try:',
+                    '    %s = c%d(pyArgs, %d, self)'%( name, i, i ),
+                    'except Exception as err:',
+                    '    if hasattr(err, "args"):',
+                    '        err.args += ("""Failure in cConverter %%r"""%%(c%d), %s)'%( i, context%( i, ) ),
+                    '    raise',
+                ])
+        if pyConverters:
+            body.append( 'cArgs = (%s)'%( ''.join( n+', ' for n in cNames ), ) )
+        else:
+            body.append( 'cArgs = [%s]'%( ', '.join( cNames ), ) )
+    else:
+        cNames = pyNames
+        body.append( 'cArgs = pyArgs' )
+
+    # ctypes-level arguments
+    if cResolvers:
+        argNames = []
+        for i,converter in enumerate( cResolvers ):
+            source = cNames[i] if cNames is not None else 'cArgs[%d]'%( i, )
+            if converter is None:
+                argNames.append( source )
+                continue
+            name = 'r%d'%( i, )
+            bind( 'cr%d'%( i, ), converter )
+            body.extend([
+                'try:',
+                '    %s = cr%d(%s)'%( name, i, source ),
+                'except Exception as err:',
+                '    err.args += (cr%d,)'%( i, ),
+                '    raise',
+            ])
+            argNames.append( name )
+        callArgs = ', '.join( argNames )
+        cArguments = '(%s)'%( ''.join( n+', ' for n in argNames ), )
+    elif cNames is not None:
+        callArgs = ', '.join( cNames )
+        cArguments = 'cArgs'
+    else:
+        callArgs = '*cArgs'
+        cArguments = 'cArgs'
+
+    body.extend([
+        'try:',
+        '    result = wrappedOperation(%s)'%( callArgs, ),
+        'except ArgumentError as err:',
+        '    err.args = err.args + (%s,)'%( cArguments, ),
+        '    raise err',
+        'except GLError as err:',
+        '    err.cArgs = cArgs',
+        '    err.pyArgs = pyArgs',
+        '    raise err',
+    ])
+    if storeValues:
+        bind( 'storeValues', storeValues )
+        body.append( 'storeValues(result, self, pyArgs, cArgs)' )
+    if returnValues:
+        bind( 'returnValues', returnValues )
+        body.append( 'return returnValues(result, self, pyArgs, cArgs)' )
+    else:
+        body.append( 'return result' )
+
+    source = '\n'.join(
+        ['def factory(%s):'%( ', '.join( params ), ), '    def wrapperCall(*args):']
+        + ['        '+line for line in body]
+        + ['    return wrapperCall', '']
+    )
+    return _factory( source )( *values )
+
+def _arityError( wrapper, required ):
+    def arityError( args ):
+        raise ValueError(
+            """%s requires %r arguments (%s), received %s: %r"""%(
+                wrapper.wrappedOperation.__name__,
+                required,
+                ", ".join( wrapper.pyConverterNames ),
+                len(args),
+                args
+            )
+        )
+    return arityError
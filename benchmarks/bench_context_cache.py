@@ -0,0 +1,51 @@
+import os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import headless
+
+from OpenGL import contextdata, platform
+
+# Per-context storage lookups with the current context cached per thread
+# (after the make-current call of an OpenGL.EGL/GLX/osmesa/GLUT wrapper)
+# vs asking the platform on every lookup (setCurrentContext(None)).
+# tests/test_contextdata.py checks that the cache follows context switches.
+
+calls = 50000
+repeats = 15
+
+def best_of(*fns):
+    # Interleave the variants so drift on a busy machine hits them all alike
+    best = [float("inf")] * len(fns)
+    for _ in range(repeats):
+        for i, fn in enumerate(fns):
+            t0 = time.perf_counter()
+            fn()
+            best[i] = min(best[i], time.perf_counter() - t0)
+    return [b / calls * 1e9 for b in best]
+
+def uncached(fn):
+    def run():
+        context = contextdata.getCurrentContext()
+        contextdata.setCurrentContext(None)
+        try:
+            fn()
+        finally:
+            contextdata.setCurrentContext(context)
+    return run
+
+def main():
+    context = headless.OffscreenContext()
+    try:
+        contextdata.setValue('bench', 1)
+        for name, fn in (
+            ('getValue', lambda: [contextdata.getValue('bench') for _ in range(calls)]),
+            ('setValue', lambda: [contextdata.setValue('bench', 1) for _ in range(calls)]),
+            ('checkExtension', lambda: [platform.PLATFORM.checkExtension('GL_ARB_vertex_buffer_object') for _ in range(calls)]),
+        ):
+            t_uncached, t_cached = best_of(uncached(fn), fn)
+            print(f"{name:>15}: platform query {t_uncached:6.0f} ns  cached {t_cached:6.0f} ns")
+    finally:
+        context.destroy()
+
+if __name__ == "__main__":
+    main()
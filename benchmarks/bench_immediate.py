@@ -0,0 +1,79 @@
+import os, sys, time, types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import headless
+
+from OpenGL import GL
+from OpenGL.GL import immediate
+
+# Immediate-mode drawing through OpenGL.GL vs the OpenGL.GL.immediate recorder:
+# the headless glutSolidCube shim (one glBegin/glEnd of 24 vertices per cube) and
+# a grid of individually coloured quads (one glBegin/glEnd each, merged with
+# immediate.batched()). tests/test_immediate.py checks that the frames match
+# pixel for pixel.
+
+cubes = 400
+grid = 40
+repeats = 7
+
+recorded = types.SimpleNamespace(**{name: getattr(immediate, name) for name in immediate.__all__})
+
+def draw_cubes(gl):
+    for i in range(cubes):
+        GL.glPushMatrix()
+        GL.glTranslatef((i % 20) * 0.1 - 1.0, (i // 20) * 0.1 - 1.0, 0.0)
+        h = 0.03
+        gl.glColor3f(i / cubes, 0.5, 1.0 - i / cubes)
+        gl.glBegin(GL.GL_QUADS)
+        for normal, corners in headless._cube_faces:
+            gl.glNormal3f(*normal)
+            for x, y, z in corners:
+                gl.glVertex3f(x * h, y * h, z * h)
+        gl.glEnd()
+        GL.glPopMatrix()
+
+def draw_grid(gl):
+    step = 2.0 / grid
+    for i in range(grid):
+        for j in range(grid):
+            x, y = -1.0 + i * step, -1.0 + j * step
+            gl.glColor3f(i / grid, j / grid, 0.5)
+            gl.glBegin(GL.GL_QUADS)
+            gl.glVertex2f(x, y)
+            gl.glVertex2f(x + step, y)
+            gl.glVertex2f(x + step, y + step)
+            gl.glVertex2f(x, y + step)
+            gl.glEnd()
+
+def draw_grid_merged(gl):
+    with immediate.batched():
+        draw_grid(gl)
+
+def timed(draw, gl):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        draw(gl)
+        GL.glFinish()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+def main():
+    context = headless.OffscreenContext()
+    try:
+        GL.glEnable(GL.GL_DEPTH_TEST)
+        for label, draw, batched_draw in (
+            (f"{cubes} cubes", draw_cubes, draw_cubes),
+            (f"{grid * grid} quads", draw_grid, draw_grid_merged),
+        ):
+            immediate.recorder.reset()
+            t_immediate = timed(draw, GL)
+            t_recorded = timed(batched_draw, recorded)
+            draws = immediate.recorder.draws // repeats
+            print(f"{label:>12}: immediate {t_immediate:7.2f} ms  recorded {t_recorded:7.2f} ms "
+                  f"({t_immediate / t_recorded:4.1f}x, {draws} glDrawArrays/frame)")
+    finally:
+        context.destroy()
+
+if __name__ == "__main__":
+    main()
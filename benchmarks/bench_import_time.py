@@ -0,0 +1,62 @@
+import os, sys, shutil, tempfile, subprocess
+
+# Start-up cost of OpenGL.GL with the eager VERSION imports
+# (PYOPENGL_LAZY_GL=0) vs the lazy namespace: wall time and resident set of a
+# fresh interpreter importing the names project.py uses, cold (bytecode
+# compiled from source into an empty pycache) and warm (cached bytecode),
+# plus the time a later "from OpenGL.GL import *" adds on top.
+
+repeats = 5
+
+child = r'''
+import sys, time
+def rss():
+    return int(open('/proc/self/statm').read().split()[1]) * 4096
+t0 = time.perf_counter()
+from OpenGL.GL import (
+    glBegin, glCallList, glClear, glColor3f, glColorPointer, glDeleteLists, glDisableClientState,
+    glDrawArrays, glEnableClientState, glEnd, glEndList, glGenLists, glLoadIdentity, glMatrixMode,
+    glNewList, glPointSize, glPopMatrix, glPushMatrix, glRasterPos2f, glRotatef, glScalef,
+    glTranslatef, glVertex3f, glVertexPointer, glViewport,
+    GL_COLOR_ARRAY, GL_COLOR_BUFFER_BIT, GL_COMPILE, GL_COMPILE_AND_EXECUTE, GL_DEPTH_BUFFER_BIT, GL_FLOAT,
+    GL_LINES, GL_POINTS, GL_QUADS, GL_MODELVIEW, GL_PROJECTION, GL_DEPTH_TEST, GL_VERTEX_ARRAY
+)
+t1 = time.perf_counter()
+resident = rss()
+modules = len([name for name in sys.modules if name.startswith('OpenGL.')])
+exec('from OpenGL.GL import *', {})
+t2 = time.perf_counter()
+print((t1 - t0) * 1000, resident / 2.0 ** 20, (t2 - t1) * 1000, modules)
+'''
+
+def run(lazy, pycache):
+    env = dict(os.environ, PYOPENGL_LAZY_GL = '1' if lazy else '0')
+    env['PYTHONPATH'] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, '-X', 'pycache_prefix=' + pycache, '-c', child],
+                         env = env, capture_output = True, text = True, check = True).stdout.split()
+    return float(out[0]), float(out[1]), float(out[2]), int(out[3])
+
+def main():
+    results = {}
+    caches = {lazy: tempfile.mkdtemp(prefix = 'pycache-') for lazy in (False, True)}
+    try:
+        for lazy in (False, True):
+            results[lazy, 'cold'] = run(lazy, caches[lazy])
+        warm = {lazy: [] for lazy in (False, True)}
+        for _ in range(repeats):
+            # interleave so drift on a busy machine hits both alike
+            for lazy in (False, True):
+                warm[lazy].append(run(lazy, caches[lazy]))
+        for lazy in (False, True):
+            results[lazy, 'warm'] = min(warm[lazy])
+    finally:
+        for cache in caches.values():
+            shutil.rmtree(cache)
+    for start in ('cold', 'warm'):
+        for lazy in (False, True):
+            ms, rss, star, modules = results[lazy, start]
+            print(f"{start} {'lazy ' if lazy else 'eager'}: import {ms:7.1f} ms  RSS {rss:6.1f} MiB  "
+                  f"{modules:4d} OpenGL modules  later 'import *' {star:6.1f} ms")
+
+if __name__ == "__main__":
+    main()
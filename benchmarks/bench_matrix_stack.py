@@ -0,0 +1,102 @@
+import os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import headless
+
+import numpy
+
+from OpenGL import GL
+from OpenGL.GL import shaders
+from OpenGL.GL.matrixstack import MatrixStack
+
+# Fixed-function matrix calls vs OpenGL.GL.matrixstack: N objects each placed
+# with push/translate/rotate/scale/pop, either issued to GL, emulated per
+# object on the CPU, or composed for all objects in one vectorised call and
+# uploaded as a uniform per draw. tests/test_matrixstack.py checks the
+# results against glGetFloatv(GL_MODELVIEW_MATRIX)/GL_PROJECTION_MATRIX.
+
+objects = 512
+batch = 64
+repeats = 9
+
+rng = numpy.random.default_rng(7)
+translations = rng.uniform(-5.0, 5.0, (objects, 3))
+angles = rng.uniform(0.0, 360.0, objects)
+axes = rng.uniform(-1.0, 1.0, (objects, 3))
+scales = rng.uniform(0.2, 2.0, (objects, 3))
+
+vertex_shader = """
+#version 120
+uniform mat4 model_view;
+uniform mat4 models[%d];
+void main() { gl_Position = gl_ProjectionMatrix * model_view * models[int(gl_Color.a)] * gl_Vertex; }
+"""
+fragment_shader = """
+#version 120
+void main() { gl_FragColor = vec4(1.0); }
+"""
+
+def best_of(*fns):
+    # Interleave the variants so drift on a busy machine hits them all alike
+    best = [float("inf")] * len(fns)
+    for _ in range(repeats):
+        for i, fn in enumerate(fns):
+            t0 = time.perf_counter()
+            fn()
+            GL.glFinish()
+            best[i] = min(best[i], time.perf_counter() - t0)
+    return [b * 1000.0 for b in best]
+
+def main():
+    context = headless.OffscreenContext()
+    try:
+        stack = MatrixStack()
+        GL.glMatrixMode(GL.GL_MODELVIEW)
+        GL.glLoadIdentity()
+
+        program = shaders.compileProgram(
+            shaders.compileShader(vertex_shader % batch, GL.GL_VERTEX_SHADER),
+            shaders.compileShader(fragment_shader, GL.GL_FRAGMENT_SHADER),
+        )
+        location = GL.glGetUniformLocation(program, "model_view")
+        models = GL.glGetUniformLocation(program, "models")
+        rows = [tuple(map(float, row)) for row in numpy.column_stack((translations, angles, axes, scales))]
+
+        def fixed_function():
+            for tx, ty, tz, angle, ax, ay, az, sx, sy, sz in rows:
+                GL.glPushMatrix()
+                GL.glTranslatef(tx, ty, tz)
+                GL.glRotatef(angle, ax, ay, az)
+                GL.glScalef(sx, sy, sz)
+                GL.glPopMatrix()
+
+        def emulated():
+            for tx, ty, tz, angle, ax, ay, az, sx, sy, sz in rows:
+                stack.glPushMatrix()
+                stack.glTranslatef(tx, ty, tz)
+                stack.glRotatef(angle, ax, ay, az)
+                stack.glScalef(sx, sy, sz)
+                stack.publish(location, program = program)
+                stack.glPopMatrix()
+
+        def composed():
+            matrices = stack.compose(translations, angles, axes, scales)
+            for start in range(0, objects, batch):
+                GL.glUniformMatrix4fv(models, batch, GL.GL_FALSE, matrices[start:start + batch])
+
+        def compose_only():
+            stack.compose(translations, angles, axes, scales)
+
+        GL.glUseProgram(program)
+        t_fixed, t_emulated, t_composed, t_compose = best_of(fixed_function, emulated, composed, compose_only)
+        GL.glUseProgram(0)
+        print(f"{objects} objects, ms/frame: fixed-function calls {t_fixed:6.2f}  "
+              f"per-object stack + uniform {t_emulated:6.2f}  "
+              f"bulk compose + uniform arrays {t_composed:6.2f} (compose alone {t_compose:5.2f})")
+        print(f"GL matrix calls per frame: fixed-function {objects * 5}, per-object stack {objects}, "
+              f"bulk compose {objects // batch}")
+    finally:
+        context.destroy()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os, sys, shutil, tempfile, subprocess
+
+# Importing the generated OpenGL.raw modules one .py/.pyc at a time
+# (PYOPENGL_RAW_REGISTRY=0) vs serving them from an OpenGL.raw._registry file:
+# wall time, resident set, and the opens/directory listings the import system makes
+# (audit hook), for the names project.py uses from OpenGL.GL and for every
+# registered raw GL module, cold (empty pycache) and warm (cached bytecode).
+
+repeats = 5
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+child = r'''
+import sys, time
+counts = {'open': 0, 'os.listdir': 0, 'os.scandir': 0}
+def audit(event, args):
+    if event in counts:
+        counts[event] += 1
+sys.addaudithook(audit)
+def rss():
+    return int(open('/proc/self/statm').read().split()[1]) * 4096
+t0 = time.perf_counter()
+if sys.argv[1] == 'project':
+    from OpenGL.GL import (
+        glBegin, glCallList, glClear, glColor3f, glColorPointer, glDeleteLists, glDisableClientState,
+        glDrawArrays, glEnableClientState, glEnd, glEndList, glGenLists, glLoadIdentity, glMatrixMode,
+        glNewList, glPointSize, glPopMatrix, glPushMatrix, glRasterPos2f, glRotatef, glScalef,
+        glTranslatef, glVertex3f, glVertexPointer, glViewport,
+        GL_COLOR_ARRAY, GL_COLOR_BUFFER_BIT, GL_COMPILE, GL_COMPILE_AND_EXECUTE, GL_DEPTH_BUFFER_BIT, GL_FLOAT,
+        GL_LINES, GL_POINTS, GL_QUADS, GL_MODELVIEW, GL_PROJECTION, GL_DEPTH_TEST, GL_VERTEX_ARRAY
+    )
+else:
+    import importlib
+    for name in open(sys.argv[2]).read().split():
+        try:
+            importlib.import_module(name)
+        except AttributeError:
+            pass  # a few modules reference types missing from _types, either way
+t1 = time.perf_counter()
+print((t1 - t0) * 1000, rss() / 2.0 ** 20, counts['open'], counts['os.listdir'] + counts['os.scandir'])
+'''
+
+def run(registry, pycache, args):
+    env = dict(os.environ)
+    env['PYOPENGL_RAW_REGISTRY'] = registry or '0'
+    env['PYTHONPATH'] = root
+    out = subprocess.run([sys.executable, '-X', 'pycache_prefix=' + pycache, '-c', child] + args,
+                         env = env, capture_output = True, text = True, check = True).stdout.split()
+    return float(out[0]), float(out[1]), int(out[2]), int(out[3])
+
+def main():
+    sys.path.insert(0, root)
+    from OpenGL.raw import _registry
+    directory = tempfile.mkdtemp(prefix = 'registry-')
+    try:
+        registry = os.path.join(directory, 'raw.registry')
+        count = _registry.build(registry)
+        modules = sorted(name for name in _registry.Registry(registry).index if name.startswith('OpenGL.raw.GL.'))
+        listing = os.path.join(directory, 'modules.txt')
+        with open(listing, 'w') as handle:
+            handle.write('\n'.join(modules))
+        print(f"registry: {count} modules, {os.path.getsize(registry) / 2.0 ** 20:.2f} MiB")
+        for label, args in (('project names', ['project']), (f'{len(modules)} raw GL modules', ['all', listing])):
+            caches = {variant: tempfile.mkdtemp(dir = directory) for variant in (None, registry)}
+            results = {}
+            for variant in (None, registry):
+                results[variant, 'cold'] = run(variant, caches[variant], args)
+            warm = {variant: [] for variant in (None, registry)}
+            for _ in range(repeats):
+                # interleave so drift on a busy machine hits both alike
+                for variant in (None, registry):
+                    warm[variant].append(run(variant, caches[variant], args))
+            for variant in (None, registry):
+                results[variant, 'warm'] = min(warm[variant])
+            for start in ('cold', 'warm'):
+                for variant in (None, registry):
+                    ms, rss, opens, listings = results[variant, start]
+                    print(f"{label:>20} {start} {'registry' if variant else 'modules '}: {ms:7.1f} ms  "
+                          f"RSS {rss:6.1f} MiB  {opens:5d} opens  {listings:3d} directory listings")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os, sys, time, random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import project as P
+
+# Render-thread stall with serial vs threaded simulation at high enemy counts.
+# "Stall" is the time the render side waits before it has a scene to draw: in
+# serial mode that is the whole update_game tick, with the simulation thread it
+# is just fetching the front snapshot (plus any wait for the GIL).
+
+frames = 240
+frame_interval = 1.0 / 60.0
+
+def populate(game, n_enemies):
+    game.reset()
+    game.player.health = float("inf")
+    game.wave.resting = True
+    game.wave.time_to_next = float("inf")
+
+    for i in range(len(game.tower_slots)):
+        P.build_tower_at_slot(game, i)
+    for slot in game.tower_slots:
+        slot.tower.max_hp = slot.tower.hp = float("inf")
+
+    path = game.map.path_points
+    rng = random.Random(423)
+    for _ in range(n_enemies):
+        idx = rng.randrange(len(path) - 1)
+        (ax, az), (bx, bz) = path[idx], path[idx + 1]
+        t = rng.random()
+        e = P.Enemy(ax + (bx - ax) * t, az + (bz - az) * t, 1.2, float("inf"))
+        e.path_idx = idx
+        game.enemies.append(e)
+
+def render_cpu(scene):
+    # The CPU side of draw_game_world without issuing GL calls
+    frustum = P.G.camera.frustum(P.WIDTH / float(P.HEIGHT))
+    P.collect_visible(scene, frustum, P.G.camera.eye())
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def report(label, stalls, totals):
+    print(f"{label:>9}: stall p50 {percentile(stalls, 0.5) * 1000:7.3f} ms  p99 {percentile(stalls, 0.99) * 1000:7.3f} ms  "
+          f"max {max(stalls) * 1000:7.3f} ms | frame cpu p50 {percentile(totals, 0.5) * 1000:7.3f} ms")
+
+def run_serial(n_enemies):
+    populate(P.G, n_enemies)
+    stalls, totals = [], []
+    for _ in range(frames):
+        t0 = time.perf_counter()
+        P.update_game(P.G, P.sim_step)
+        scene = P.live_scene(P.G)
+        t1 = time.perf_counter()
+        render_cpu(scene)
+        t2 = time.perf_counter()
+        stalls.append(t1 - t0)
+        totals.append(t2 - t0)
+    report("serial", stalls, totals)
+
+def run_threaded(n_enemies):
+    populate(P.G, n_enemies)
+    P.G.sim_thread = sim = P.SimulationThread(P.G, P.sim_step)
+    sim.start()
+    stalls, totals = [], []
+    try:
+        next_frame = time.perf_counter()
+        for _ in range(frames):
+            t0 = time.perf_counter()
+            scene = P.current_scene()
+            t1 = time.perf_counter()
+            render_cpu(scene)
+            t2 = time.perf_counter()
+            stalls.append(t1 - t0)
+            totals.append(t2 - t0)
+            next_frame += frame_interval
+            time.sleep(max(0.0, next_frame - time.perf_counter()))
+    finally:
+        sim.stop()
+        P.G.sim_thread = None
+    report("threaded", stalls, totals)
+    ticks = list(sim.tick_times)
+    print(f"{'':>9}  sim tick p50 {percentile(ticks, 0.5) * 1000:7.3f} ms  max {max(ticks) * 1000:7.3f} ms")
+
+def main():
+    counts = [int(a) for a in sys.argv[1:]] or [250, 1000, 4000]
+    for n in counts:
+        print(f"{n} enemies, {len(P.MAPS['Default'].tower_slots)} towers")
+        run_serial(n)
+        run_threaded(n)
+
+if __name__ == "__main__":
+    main()
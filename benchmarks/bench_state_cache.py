@@ -0,0 +1,66 @@
+import os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import headless
+
+from OpenGL import GL
+from OpenGL.GL import statecache
+
+# Redundant state changes through OpenGL.GL vs OpenGL.GL.statecache: the
+# per-call cost of a dropped (redundant) and a passed-on setter, and the
+# issued/skipped counts for rendering project.py frames with the cache.
+
+calls = 20000
+repeats = 15
+frames = 30
+
+def best_of(*fns):
+    # Interleave the variants so drift on a busy machine hits them all alike
+    best = [float("inf")] * len(fns)
+    for _ in range(repeats):
+        for i, fn in enumerate(fns):
+            t0 = time.perf_counter()
+            fn()
+            best[i] = min(best[i], time.perf_counter() - t0)
+    return [b / calls * 1e6 for b in best]
+
+def bench_calls():
+    print(f"{'':>14} {'uncached':>9} {'redundant':>10} {'changing':>9}   us/call")
+    for name, redundant, changing in (
+        ('glColor3f', ((0.5, 0.5, 0.5),) * 2, ((0.5, 0.5, 0.5), (0.25, 0.5, 0.5))),
+        ('glMatrixMode', ((GL.GL_MODELVIEW,),) * 2, ((GL.GL_MODELVIEW,), (GL.GL_PROJECTION,))),
+        ('glEnable', ((GL.GL_DEPTH_TEST,),) * 2, None),
+        ('glBindTexture', ((GL.GL_TEXTURE_2D, 1),) * 2, ((GL.GL_TEXTURE_2D, 1), (GL.GL_TEXTURE_2D, 2))),
+    ):
+        base, cached = getattr(GL, name), getattr(statecache, name)
+        statecache.invalidate()
+        t_base, t_redundant, t_changing = best_of(
+            lambda: [base(*args) for _ in range(calls // 2) for args in redundant],
+            lambda: [cached(*args) for _ in range(calls // 2) for args in redundant],
+            (lambda: [cached(*args) for _ in range(calls // 2) for args in changing]) if changing else (lambda: None),
+        )
+        print(f"{name:>14} {t_base:9.3f} {t_redundant:10.3f} {t_changing if changing else float('nan'):9.3f}")
+    GL.glMatrixMode(GL.GL_MODELVIEW)
+    GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+
+def bench_frames(renderer):
+    game = headless.build_game('Default', 200)
+    statecache.install(headless.P)
+    statecache.invalidate()
+    statecache.cache.reset()
+    renderer.benchmark(game, frames)
+    issued, skipped = statecache.cache.summary()
+    print(f"project.py, {frames} frames: {issued // frames} setters issued, {skipped // frames} skipped per frame")
+    for name, count in statecache.cache.skipped.most_common():
+        print(f"{name:>14}: {count // frames} skipped, {statecache.cache.issued[name] // frames} issued per frame")
+
+def main():
+    renderer = headless.Renderer()
+    try:
+        bench_calls()
+        bench_frames(renderer)
+    finally:
+        renderer.context.destroy()
+
+if __name__ == "__main__":
+    main()
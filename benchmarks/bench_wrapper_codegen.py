@@ -0,0 +1,105 @@
+import os, sys, time, ctypes, shutil, tempfile, subprocess
+
+# Per-call overhead of PyOpenGL's pure-Python Wrapper (no OpenGL_accelerate)
+# with the generic nested closures vs the generated call paths from
+# OpenGL.wrappergen, measured against calling the raw ctypes function directly.
+# "cold"/"warm" time the codegen of all of OpenGL.GL's wrappers without and
+# with the on-disk code cache.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import headless
+
+import numpy
+
+from OpenGL import GL, wrapper, wrappergen
+
+calls = 20000
+repeats = 15
+
+def best_of(*fns):
+    # Interleave the variants so drift on a busy machine hits them all alike
+    best = [float("inf")] * len(fns)
+    for _ in range(repeats):
+        for i, fn in enumerate(fns):
+            t0 = time.perf_counter()
+            fn()
+            best[i] = min(best[i], time.perf_counter() - t0)
+    return [b / calls * 1e6 for b in best]
+
+def variant(w, codegen):
+    wrapper.WRAPPER_CODEGEN = codegen
+    try:
+        return w.finalise()
+    finally:
+        wrapper.WRAPPER_CODEGEN = True
+
+def cases():
+    texels = numpy.zeros((4, 4, 3), dtype = numpy.uint8)
+    verts = numpy.zeros((64, 3), dtype = numpy.float32)
+    out = (GL.GLint * 4)()
+    yield ('glGetIntegerv', GL.glGetIntegerv, (GL.GL_VIEWPORT,), (GL.GL_VIEWPORT, out))
+    yield ('glTexImage2D', GL.glTexImage2D,
+           (GL.GL_TEXTURE_2D, 0, GL.GL_RGB, 4, 4, 0, GL.GL_RGB, GL.GL_UNSIGNED_BYTE, texels),
+           (GL.GL_TEXTURE_2D, 0, GL.GL_RGB, 4, 4, 0, GL.GL_RGB, GL.GL_UNSIGNED_BYTE, (ctypes.c_ubyte * texels.size).from_buffer(texels)))
+    yield ('glVertexPointer', GL.glVertexPointer, (3, GL.GL_FLOAT, 0, verts), (3, GL.GL_FLOAT, 0, (ctypes.c_float * verts.size).from_buffer(verts)))
+
+def bench_calls():
+    tex = GL.glGenTextures(1)
+    GL.glBindTexture(GL.GL_TEXTURE_2D, tex)
+    print(f"{'':>16} {'raw':>8} {'closures':>9} {'generated':>10}   us/call, wrapper overhead reduction")
+    for name, w, args, raw_args in cases():
+        raw = w.wrappedOperation
+        generic = variant(w, False)
+        generated = variant(w, True)
+        t_raw, t_generic, t_generated = best_of(
+            lambda: [raw(*raw_args) for _ in range(calls)],
+            lambda: [generic(*args) for _ in range(calls)],
+            lambda: [generated(*args) for _ in range(calls)],
+        )
+        saved = (t_generic - t_generated) / max(1e-9, t_generic - t_raw)
+        print(f"{name:>16} {t_raw:8.2f} {t_generic:9.2f} {t_generated:10.2f}   {saved * 100:5.1f}%")
+    GL.glDeleteTextures([tex])
+
+def finalise_all():
+    count = 0
+    t0 = time.perf_counter()
+    for name in dir(GL):
+        w = getattr(GL, name)
+        if isinstance(w, wrapper.Wrapper):
+            try:
+                w.finalise()
+            except Exception:
+                # a few declarations only finalise lazily with their real arguments
+                continue
+            count += 1
+    return count, time.perf_counter() - t0
+
+def codegen_child():
+    count, elapsed = finalise_all()
+    print(f"{count} {elapsed * 1000:.2f} {len(wrappergen._factories)}")
+
+def bench_codegen():
+    cache = tempfile.mkdtemp(prefix = 'wrappergen-')
+    env = dict(os.environ, PYOPENGL_WRAPPER_CODEGEN_CACHE = cache)
+    try:
+        for label in ('cold', 'warm'):
+            out = subprocess.run([sys.executable, __file__, '--codegen-child'], env = env,
+                                 capture_output = True, text = True, check = True).stdout.split()
+            count, ms, shapes = int(out[0]), float(out[1]), int(out[2])
+            print(f"finalise {count} GL wrappers ({shapes} distinct shapes), {label} cache: {ms:.1f} ms")
+    finally:
+        shutil.rmtree(cache)
+
+def main():
+    if '--codegen-child' in sys.argv:
+        codegen_child()
+        return
+    context = headless.OffscreenContext()
+    try:
+        bench_calls()
+    finally:
+        context.destroy()
+    bench_codegen()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import sys, time, queue, ctypes, argparse, threading
+
+import headless
+import numpy
+
+from OpenGL.GL import (
+    glBindBuffer, glBufferData, glDeleteBuffers, glGenBuffers, glMapBuffer, glPixelStorei,
+    glReadPixels, glUnmapBuffer,
+    GL_PACK_ALIGNMENT, GL_PIXEL_PACK_BUFFER, GL_READ_ONLY, GL_RGB, GL_STREAM_READ, GL_UNSIGNED_BYTE
+)
+
+import project as P
+
+# Offline gameplay capture: the fixed-step simulation drives draw_game_world into an
+# offscreen buffer, frames come back through a ring of pixel-pack buffers and a
+# writer thread converts and streams them, so encoding never sits on the render loop.
+
+writer_queue_frames = 32
+readback_buffers = 3
+
+class AsyncReadback:
+    def __init__(self, width, height, count = readback_buffers):
+        self.width = width
+        self.height = height
+        self.size = width * height * 3
+        self.buffers = [int(b) for b in numpy.atleast_1d(glGenBuffers(count))]
+        for pbo in self.buffers:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+            glBufferData(GL_PIXEL_PACK_BUFFER, self.size, None, GL_STREAM_READ)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.pending = []
+
+    def start(self):
+        # Queue the read into the next buffer; returns the oldest finished frame, if any
+        pbo = self.buffers[len(self.pending) % len(self.buffers)] if len(self.pending) < len(self.buffers) else None
+        frame = None
+        if pbo is None:
+            pbo = self.pending.pop(0)
+            frame = self._map(pbo)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+        glReadPixels(0, 0, self.width, self.height, GL_RGB, GL_UNSIGNED_BYTE, 0)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.pending.append(pbo)
+        return frame
+
+    def drain(self):
+        while self.pending:
+            yield self._map(self.pending.pop(0))
+
+    def _map(self, pbo):
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+        ptr = glMapBuffer(GL_PIXEL_PACK_BUFFER, GL_READ_ONLY)
+        data = (ctypes.c_ubyte * self.size).from_address(ptr)
+        frame = numpy.frombuffer(data, dtype = numpy.uint8).reshape(self.height, self.width, 3)[::-1].copy()
+        glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        return frame
+
+    def release(self):
+        glDeleteBuffers(len(self.buffers), self.buffers)
+
+def rgb_to_yuv420(frame):
+    # BT.601 full range (C420jpeg), chroma averaged over 2x2 blocks; an odd
+    # last row/column is replicated, 4:2:0 planes are ceil(h/2) x ceil(w/2)
+    rgb = frame.astype(numpy.float32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    y = 0.299 * r + 0.587 * g + 0.114 * b
+    u = (b - y) * 0.564 + 128.0
+    v = (r - y) * 0.713 + 128.0
+    h, w = y.shape
+    ch, cw = (h + 1) // 2, (w + 1) // 2
+    padding = ((0, h % 2), (0, w % 2))
+    u = numpy.pad(u, padding, mode = 'edge').reshape(ch, 2, cw, 2).mean(axis = (1, 3))
+    v = numpy.pad(v, padding, mode = 'edge').reshape(ch, 2, cw, 2).mean(axis = (1, 3))
+    return [numpy.clip(plane + 0.5, 0, 255).astype(numpy.uint8) for plane in (y, u, v)]
+
+class FrameWriter(threading.Thread):
+    def __init__(self, path, width, height, fps, fmt):
+        super().__init__(name = 'frame-writer', daemon = True)
+        self.path = path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.fmt = fmt
+        self.frames = queue.Queue(maxsize = writer_queue_frames)
+        self.written = 0
+        self.blocked_time = 0.0
+        self.error = None
+
+    def submit(self, frame):
+        t0 = time.perf_counter()
+        self.frames.put(frame)
+        self.blocked_time += time.perf_counter() - t0
+
+    def close(self):
+        self.frames.put(None)
+        self.join()
+        if self.error:
+            raise self.error
+
+    def run(self):
+        try:
+            with open(self.path, 'wb') as out:
+                if self.fmt == 'y4m':
+                    out.write(b'YUV4MPEG2 W%d H%d F%d:1 Ip A1:1 C420jpeg\n' % (self.width, self.height, self.fps))
+                while True:
+                    frame = self.frames.get()
+                    if frame is None:
+                        break
+                    if self.fmt == 'y4m':
+                        out.write(b'FRAME\n')
+                        for plane in rgb_to_yuv420(frame):
+                            out.write(plane.tobytes())
+                    else:
+                        out.write(frame.tobytes())
+                    self.written += 1
+        except Exception as err:
+            self.error = err
+            # Keep draining so the render loop never deadlocks on a full queue
+            while self.frames.get() is not None:
+                pass
+
+# A script is a list of (seconds, key) pairs fed through the same handler as the keyboard
+default_script = [
+    (0.0, '1'), (0.0, '2'), (0.0, '3'), (0.0, '4'), (0.0, '5'), (0.0, '6'),
+    (12.0, 'f'), (20.0, 'e'), (30.0, 'g'), (42.0, 'm'), (50.0, 'w'),
+]
+
+def record(path, seconds = 60.0, fps = 30, size = (headless.default_width, headless.default_height),
+           fmt = 'y4m', map_name = 'Default', script = default_script, seed = 423):
+    width, height = size
+    renderer = headless.Renderer(width, height)
+    readback = AsyncReadback(width, height)
+    writer = FrameWriter(path, width, height, fps, fmt)
+    writer.start()
+
+    P.random.seed(seed)
+    game = P.GameState()
+    game.selected_map_idx = game.map_names.index(map_name)
+    game.quadric = renderer.quadric
+    P.G = game
+
+    substeps = max(1, round(1.0 / (fps * P.sim_step)))
+    total_frames = int(seconds * fps)
+    events = sorted(script)
+    sim_time = 0.0
+    t_start = time.perf_counter()
+    render_time = 0.0
+    try:
+        with headless.frozen_clock(sim_time):
+            game.reset()
+        for _ in range(total_frames):
+            with headless.frozen_clock(sim_time):
+                while events and events[0][0] <= sim_time:
+                    P.handle_key(events.pop(0)[1])
+                for _ in range(substeps):
+                    if game.game_state == 'PLAYING':
+                        P.update_game(game, P.sim_step)
+                    sim_time += P.sim_step
+                    P.time.t = sim_time
+
+            t0 = time.perf_counter()
+            renderer.render(game, sim_time)
+            frame = readback.start()
+            render_time += time.perf_counter() - t0
+            if frame is not None:
+                writer.submit(frame)
+
+        for frame in readback.drain():
+            writer.submit(frame)
+        writer.close()
+    finally:
+        readback.release()
+        renderer.close()
+
+    wall = time.perf_counter() - t_start
+    return {'frames': writer.written, 'video_seconds': writer.written / fps, 'wall_seconds': wall,
+            'fps': writer.written / wall, 'realtime_factor': (writer.written / fps) / wall,
+            'render_ms': render_time / max(1, writer.written) * 1000.0, 'writer_blocked_s': writer.blocked_time}
+
+def main():
+    parser = argparse.ArgumentParser(description = "Record a scripted game to Y4M or raw RGB without a window")
+    parser.add_argument('out')
+    parser.add_argument('--seconds', type = float, default = 60.0)
+    parser.add_argument('--fps', type = int, default = 30)
+    parser.add_argument('--size', default = f'{headless.default_width}x{headless.default_height}')
+    parser.add_argument('--format', choices = ('y4m', 'raw'), default = 'y4m')
+    parser.add_argument('--map', default = 'Default')
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split('x'))
+    stats = record(args.out, args.seconds, args.fps, (width, height), args.format, args.map)
+    print(f"{stats['frames']} frames ({stats['video_seconds']:.1f}s of video) in {stats['wall_seconds']:.2f}s: "
+          f"{stats['fps']:.1f} frames/s, {stats['realtime_factor']:.2f}x real time, "
+          f"render+readback {stats['render_ms']:.2f} ms/frame, writer backpressure {stats['writer_blocked_s']:.2f}s")
+    if args.format == 'raw':
+        print(f"play with: ffplay -f rawvideo -pixel_format rgb24 -video_size {width}x{height} -framerate {args.fps} {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+import os, sys, time, random, ctypes, argparse, contextlib
+
+# Offscreen rendering of project.py without a window or display server.
+# The platform has to be chosen before OpenGL is imported for the first time.
+if __name__ == "__main__" and '--platform' in sys.argv:
+    os.environ['PYOPENGL_PLATFORM'] = sys.argv[sys.argv.index('--platform') + 1]
+os.environ.setdefault('PYOPENGL_PLATFORM', 'egl')
+if not os.environ.get('DISPLAY'):
+    os.environ.setdefault('EGL_PLATFORM', 'surfaceless')
+
+import numpy
+
+from OpenGL import _configflags
+from OpenGL.error import frameBoundary, installDebugCallback
+from OpenGL.GL import (
+    glBegin, glEnd, glFinish, glNormal3f, glPixelStorei, glReadPixels, glVertex3f,
+    glEnable, GL_DEPTH_TEST, GL_PACK_ALIGNMENT, GL_QUADS, GL_RGB, GL_UNSIGNED_BYTE
+)
+
+import project as P
+
+default_width = 320
+default_height = 224
+golden_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'goldens')
+
+class OffscreenContext:
+    def __init__(self, width = default_width, height = default_height):
+        self.width = width
+        self.height = height
+        self.platform = os.environ['PYOPENGL_PLATFORM']
+        if self.platform == 'egl':
+            self._create_egl()
+        elif self.platform == 'osmesa':
+            self._create_osmesa()
+        else:
+            raise RuntimeError(f"Offscreen rendering needs PYOPENGL_PLATFORM=egl or osmesa, not {self.platform!r}")
+        if _configflags.DEBUG_OUTPUT:
+            installDebugCallback()
+        if _configflags.STATE_CACHE:
+            # the shadowed state belongs to the previous context
+            from OpenGL.GL import statecache
+            statecache.invalidate()
+
+    def _create_egl(self):
+        from OpenGL import EGL
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        EGL.eglInitialize(self.display, ctypes.pointer(major), ctypes.pointer(minor))
+
+        config_attribs = (EGL.EGLint * 13)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+            EGL.EGL_DEPTH_SIZE, 24,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE
+        )
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        EGL.eglChooseConfig(self.display, config_attribs, ctypes.pointer(config), 1, ctypes.pointer(count))
+        if count.value < 1:
+            raise RuntimeError("No EGL config with a pbuffer and desktop GL support")
+
+        surface_attribs = (EGL.EGLint * 5)(EGL.EGL_WIDTH, self.width, EGL.EGL_HEIGHT, self.height, EGL.EGL_NONE)
+        self.surface = EGL.eglCreatePbufferSurface(self.display, config, surface_attribs)
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, None)
+        EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context)
+
+    def _create_osmesa(self):
+        from OpenGL import osmesa, arrays
+        self.context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        self.buffer = arrays.GLubyteArray.zeros((self.height, self.width, 4))
+        if not osmesa.OSMesaMakeCurrent(self.context, self.buffer, GL_UNSIGNED_BYTE, self.width, self.height):
+            raise RuntimeError("OSMesaMakeCurrent failed")
+
+    def read_frame(self):
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        data = glReadPixels(0, 0, self.width, self.height, GL_RGB, GL_UNSIGNED_BYTE)
+        frame = numpy.frombuffer(data, dtype = numpy.uint8).reshape(self.height, self.width, 3)
+        return frame[::-1].copy()
+
+    def destroy(self):
+        if self.platform == 'egl':
+            from OpenGL import EGL
+            EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroySurface(self.display, self.surface)
+            EGL.eglDestroyContext(self.display, self.context)
+            EGL.eglTerminate(self.display)
+        else:
+            from OpenGL import osmesa
+            osmesa.OSMesaDestroyContext(self.context)
+
+# GLUT shapes and fonts need glutInit and a window system, so the harness
+# swaps in plain GL equivalents before drawing anything.
+_cube_faces = (
+    ((0, 0, 1), ((-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1))),
+    ((0, 0, -1), ((-1, -1, -1), (-1, 1, -1), (1, 1, -1), (1, -1, -1))),
+    ((0, 1, 0), ((-1, 1, -1), (-1, 1, 1), (1, 1, 1), (1, 1, -1))),
+    ((0, -1, 0), ((-1, -1, -1), (1, -1, -1), (1, -1, 1), (-1, -1, 1))),
+    ((1, 0, 0), ((1, -1, -1), (1, 1, -1), (1, 1, 1), (1, -1, 1))),
+    ((-1, 0, 0), ((-1, -1, -1), (-1, -1, 1), (-1, 1, 1), (-1, 1, -1))),
+)
+
+def solid_cube(size):
+    h = size * 0.5
+    glBegin(GL_QUADS)
+    for normal, corners in _cube_faces:
+        glNormal3f(*normal)
+        for x, y, z in corners:
+            glVertex3f(x * h, y * h, z * h)
+    glEnd()
+
+def bitmap_character(font, ch):
+    pass
+
+def install_headless_shims(width, height):
+    P.glutSolidCube = solid_cube
+    P.glutBitmapCharacter = bitmap_character
+    P.WIDTH = width
+    P.HEIGHT = height
+
+class _FrozenTime:
+    def __init__(self, t):
+        self.t = t
+
+    def perf_counter(self):
+        return self.t
+
+    def time(self):
+        return self.t
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+@contextlib.contextmanager
+def frozen_clock(t):
+    # Pin the animation clock (pulses, spins, screen shake) so frames are reproducible
+    P.time = _FrozenTime(t)
+    try:
+        yield
+    finally:
+        P.time = time
+
+def build_game(map_name = 'Default', n_enemies = 40, ticks = 120, seed = 423):
+    random.seed(seed)
+    game = P.GameState()
+    game.selected_map_idx = game.map_names.index(map_name)
+    game.reset()
+    for i in range(len(game.tower_slots)):
+        P.build_tower_at_slot(game, i)
+
+    path = game.map.path_points
+    for i in range(n_enemies):
+        idx = i % (len(path) - 1)
+        (ax, az), (bx, bz) = path[idx], path[idx + 1]
+        t = (i * 0.618) % 1.0
+        e = P.Enemy(ax + (bx - ax) * t, az + (bz - az) * t, 1.2, 500.0, is_boss = (i % 17 == 16))
+        e.path_idx = idx
+        game.enemies.append(e)
+
+    P.G = game
+    with frozen_clock(0.0):
+        for _ in range(ticks):
+            P.update_game(game, P.sim_step)
+    return game
+
+class Renderer:
+    def __init__(self, width = default_width, height = default_height):
+        self.context = OffscreenContext(width, height)
+        install_headless_shims(width, height)
+        glEnable(GL_DEPTH_TEST)
+        self.quadric = P.gluNewQuadric()
+
+    def render(self, game, clock = 0.0):
+        P.G = game
+        game.quadric = self.quadric
+        with frozen_clock(clock):
+            P.glClear(P.GL_COLOR_BUFFER_BIT | P.GL_DEPTH_BUFFER_BIT)
+            P.draw_game_world(P.live_scene(game))
+        glFinish()
+        frameBoundary()
+
+    def capture(self, game, clock = 0.0):
+        self.render(game, clock)
+        return self.context.read_frame()
+
+    def benchmark(self, game, frames = 200, warmup = 10):
+        for i in range(warmup):
+            self.render(game, i * P.sim_step)
+        times = []
+        for i in range(frames):
+            t0 = time.perf_counter()
+            self.render(game, i * P.sim_step)
+            times.append(time.perf_counter() - t0)
+        times.sort()
+        return {'frames': frames, 'mean_ms': sum(times) / frames * 1000.0,
+                'p50_ms': times[frames // 2] * 1000.0, 'p99_ms': times[min(frames - 1, int(frames * 0.99))] * 1000.0,
+                'max_ms': times[-1] * 1000.0, 'drawn': game.drawn_count, 'culled': game.culled_count}
+
+    def close(self):
+        self.context.destroy()
+
+def write_ppm(path, frame):
+    h, w, _ = frame.shape
+    with open(path, 'wb') as f:
+        f.write(b'P6\n%d %d\n255\n' % (w, h))
+        f.write(numpy.ascontiguousarray(frame, dtype = numpy.uint8).tobytes())
+
+def read_ppm(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, w, h, maxval, pixels = data.split(maxsplit = 4)
+    if magic != b'P6' or maxval != b'255':
+        raise ValueError(f"{path} is not an 8-bit binary PPM")
+    return numpy.frombuffer(pixels, dtype = numpy.uint8).reshape(int(h), int(w), 3)
+
+def compare_to_golden(frame, name, tolerance = 8, max_bad_fraction = 0.002, update = False):
+    # Returns (ok, bad_fraction); bad_fraction is None when there is no golden to compare to
+    path = os.path.join(golden_dir, name + '.ppm')
+    if update:
+        os.makedirs(golden_dir, exist_ok = True)
+        write_ppm(path, frame)
+        return True, 0.0
+    if not os.path.exists(path):
+        return False, None
+    golden = read_ppm(path)
+    if golden.shape != frame.shape:
+        return False, 1.0
+    diff = numpy.abs(golden.astype(numpy.int16) - frame.astype(numpy.int16)).max(axis = 2)
+    bad_fraction = float((diff > tolerance).mean())
+    if bad_fraction > max_bad_fraction:
+        write_ppm(os.path.join(golden_dir, name + '.actual.ppm'), frame)
+    return bad_fraction <= max_bad_fraction, bad_fraction
+
+golden_scenes = {
+    'default_wave': dict(map_name = 'Default', n_enemies = 24),
+    'mohammadpur_crowd': dict(map_name = 'Mohammadpur', n_enemies = 120),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description = "Render project.py offscreen (EGL or OSMesa)")
+    parser.add_argument('command', choices = ('bench', 'golden', 'snapshot'))
+    parser.add_argument('--platform', choices = ('egl', 'osmesa'), default = os.environ['PYOPENGL_PLATFORM'])
+    parser.add_argument('--map', default = 'Default')
+    parser.add_argument('--enemies', type = int, default = 200)
+    parser.add_argument('--frames', type = int, default = 200)
+    parser.add_argument('--size', default = f'{default_width}x{default_height}')
+    parser.add_argument('--update', action = 'store_true', help = "rewrite golden images")
+    parser.add_argument('--out', default = 'frame.ppm')
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split('x'))
+    renderer = Renderer(width, height)
+    try:
+        if args.command == 'bench':
+            game = build_game(args.map, args.enemies)
+            stats = renderer.benchmark(game, args.frames)
+            print(f"{args.map} {args.enemies} enemies @ {width}x{height} ({renderer.context.platform}): "
+                  f"mean {stats['mean_ms']:.2f} ms  p50 {stats['p50_ms']:.2f} ms  p99 {stats['p99_ms']:.2f} ms  "
+                  f"max {stats['max_ms']:.2f} ms  drawn {stats['drawn']} culled {stats['culled']}")
+        elif args.command == 'golden':
+            failed = 0
+            for name, params in golden_scenes.items():
+                ok, bad = compare_to_golden(renderer.capture(build_game(**params)), name, update = args.update)
+                if bad is None:
+                    print(f"{name}: no golden, run with --update")
+                else:
+                    print(f"{name}: {'ok' if ok else 'MISMATCH'} ({bad * 100:.3f}% pixels differ)")
+                failed += not ok
+            sys.exit(1 if failed else 0)
+        else:
+            write_ppm(args.out, renderer.capture(build_game(args.map, args.enemies)))
+            print(f"wrote {args.out}")
+    finally:
+        renderer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,481 @@
+import sys, json, time, zlib, struct, asyncio, hashlib, argparse, subprocess, collections
+
+import project as P
+
+# Two-player lockstep over TCP. Peers only exchange the keys each player pressed,
+# scheduled input_delay ticks ahead; both run the identical fixed-step simulation
+# and compare state hashes every hash_interval ticks. The host can also stream
+# delta-compressed entity snapshots to spectators.
+
+default_port = 7777
+default_spectate_port = 7778
+input_delay_ticks = 4
+hash_interval_ticks = 60
+spectator_interval_ticks = 2
+keyframe_interval_ticks = 120
+ping_interval = 0.5
+command_keys = '1234567890femgrw'
+
+MSG_HELLO, MSG_COMMANDS, MSG_HASH, MSG_PING, MSG_PONG, MSG_SNAPSHOT, MSG_BYE = range(7)
+
+class Link:
+    # Length-prefixed messages over an asyncio stream, with traffic counters
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.messages_sent = 0
+
+    async def send(self, kind, payload = b''):
+        frame = struct.pack('<IB', len(payload) + 1, kind) + payload
+        self.writer.write(frame)
+        self.bytes_sent += len(frame)
+        self.messages_sent += 1
+        await self.writer.drain()
+
+    async def recv(self):
+        size, = struct.unpack('<I', await self.reader.readexactly(4))
+        body = await self.reader.readexactly(size)
+        self.bytes_received += 4 + size
+        return body[0], body[1:]
+
+    def close(self):
+        self.writer.close()
+
+def state_hash(game, tick):
+    h = hashlib.blake2b(digest_size = 8)
+    p = game.player
+    h.update(struct.pack('<Iiddi', tick, int(p.health), p.score, p.money, game.wave.wave_num))
+    for e in game.enemies:
+        h.update(struct.pack('<dddi?', e.x, e.z, e.health, e.path_idx, e.alive))
+    for s in game.tower_slots:
+        if s.occupied:
+            h.update(struct.pack('<ddd', s.tower.hp, s.tower.cooldown, s.tower.rotate_degree))
+    for pr in game.projectiles:
+        h.update(struct.pack('<ddd', pr.x, pr.y, pr.z))
+    for m in game.abilities.meteors:
+        h.update(struct.pack('<ddd', m.x, m.y, m.z))
+    mk = game.abilities.mega_knight
+    if mk and mk.alive:
+        h.update(struct.pack('<ddd', mk.x, mk.y, mk.z))
+    return h.digest()
+
+# Spectator snapshots: quantized entity records, only those that changed since the
+# last message (everything on a keyframe), then zlib.
+KIND_ENEMY, KIND_BOSS, KIND_TOWER, KIND_PROJECTILE, KIND_METEOR, KIND_MEGAKNIGHT = range(6)
+position_scale = 32.0
+snapshot_header = struct.Struct('<IBIiiidII')
+snapshot_record = struct.Struct('<IBhhhH')
+snapshot_removed = struct.Struct('<I')
+
+def quantize(x):
+    return int(max(-32768, min(32767, round(x * position_scale))))
+
+def entity_records(game):
+    records = {}
+    for e in game.enemies:
+        if e.alive:
+            records[e.uid] = (KIND_BOSS if e.is_boss else KIND_ENEMY, quantize(e.x), quantize(e.y), quantize(e.z),
+                              int(max(0, min(65535, e.health))))
+    for s in game.tower_slots:
+        if s.occupied:
+            t = s.tower
+            records[t.uid] = (KIND_TOWER, quantize(t.x), quantize(t.y), quantize(t.z), int(65535 * P.clamp(t.hp / t.max_hp, 0.0, 1.0)))
+    for pr in game.projectiles:
+        records[pr.uid] = (KIND_PROJECTILE, quantize(pr.x), quantize(pr.y), quantize(pr.z), 0)
+    for m in game.abilities.meteors:
+        records[m.uid] = (KIND_METEOR, quantize(m.x), quantize(m.y), quantize(m.z), 0)
+    mk = game.abilities.mega_knight
+    if mk and mk.alive:
+        records[mk.uid] = (KIND_MEGAKNIGHT, quantize(mk.x), quantize(mk.y), quantize(mk.z), int(max(0, min(65535, mk.health))))
+    return records
+
+class SnapshotEncoder:
+    def __init__(self):
+        self.last = {}
+        self.last_keyframe = None
+
+    def encode(self, game, tick):
+        current = entity_records(game)
+        keyframe = self.last_keyframe is None or tick - self.last_keyframe >= keyframe_interval_ticks
+        if keyframe:
+            self.last_keyframe = tick
+            changed = list(current.items())
+            removed = []
+        else:
+            last = self.last
+            changed = [(uid, rec) for uid, rec in current.items() if last.get(uid) != rec]
+            removed = [uid for uid in last if uid not in current]
+        self.last = current
+
+        p = game.player
+        parts = [snapshot_header.pack(tick, keyframe, len(current), int(p.health), p.score, game.wave.wave_num,
+                                      p.money, len(changed), len(removed))]
+        parts.extend(snapshot_record.pack(uid, *rec) for uid, rec in changed)
+        parts.extend(snapshot_removed.pack(uid) for uid in removed)
+        return zlib.compress(b''.join(parts), 1)
+
+class SnapshotMirror:
+    # Spectator-side copy of the host's entities rebuilt from snapshot deltas
+    def __init__(self):
+        self.entities = {}
+        self.hud = None
+        self.tick = 0
+        self.mismatches = 0
+
+    def apply(self, payload):
+        data = zlib.decompress(payload)
+        tick, keyframe, total, health, score, wave_num, money, n_changed, n_removed = snapshot_header.unpack_from(data)
+        offset = snapshot_header.size
+        if keyframe:
+            self.entities = {}
+        for _ in range(n_changed):
+            uid, *rec = snapshot_record.unpack_from(data, offset)
+            self.entities[uid] = tuple(rec)
+            offset += snapshot_record.size
+        for _ in range(n_removed):
+            uid, = snapshot_removed.unpack_from(data, offset)
+            self.entities.pop(uid, None)
+            offset += snapshot_removed.size
+        if len(self.entities) != total:
+            self.mismatches += 1
+        self.tick = tick
+        self.hud = (health, score, wave_num, money)
+
+def script_ticks(script):
+    return sorted((int(round(seconds / P.sim_step)), key) for seconds, key in script)
+
+host_script = [(0.0, '1'), (0.0, '2'), (0.0, '3'), (8.0, 'f'), (15.0, 'e'), (26.0, 'm')]
+join_script = [(0.5, '4'), (0.5, '5'), (0.5, '6'), (12.0, 'g'), (20.0, 'w'), (31.0, 'r')]
+
+class LockstepSession:
+    def __init__(self, game, link, player, ticks, paced = True, script = (), inject_desync = None):
+        self.game = game
+        self.link = link
+        self.player = player
+        self.ticks = ticks
+        self.paced = paced
+        self.script = collections.deque(script_ticks(script))
+        self.inject_desync = inject_desync
+
+        self.tick = 0
+        self.pending = collections.defaultdict(lambda: [None, None])
+        for t in range(input_delay_ticks):
+            self.pending[t] = [b'', b'']
+        self.local_keys = collections.deque()
+        self.remote_ready = asyncio.Event()
+        self.stopped = False
+
+        self.local_hashes = {}
+        self.remote_hashes = {}
+        self.hashes_checked = 0
+        self.desync_tick = None
+        self.rtts = []
+        self.stall_time = 0.0
+        self.stall_ticks = 0
+        self.spectators = []
+        self.snapshot_bytes = 0
+        self.on_tick = None
+
+    def submit(self, key):
+        # Called from any thread (e.g. the GLUT keyboard handler)
+        if key in command_keys:
+            self.local_keys.append(key)
+
+    def apply_commands(self, keys):
+        for k in keys.decode('ascii'):
+            if self.game.game_state == 'PLAYING' and k in command_keys:
+                P.handle_key(k)
+
+    def check_hash(self, tick):
+        if tick in self.local_hashes and tick in self.remote_hashes:
+            self.hashes_checked += 1
+            if self.local_hashes.pop(tick) != self.remote_hashes.pop(tick) and self.desync_tick is None:
+                self.desync_tick = tick
+                print(f"DESYNC detected at tick {tick}", file = sys.stderr)
+
+    async def receive_loop(self):
+        try:
+            while True:
+                kind, payload = await self.link.recv()
+                if kind == MSG_COMMANDS:
+                    tick, = struct.unpack_from('<I', payload)
+                    self.pending[tick][1 - self.player] = payload[4:]
+                    self.remote_ready.set()
+                elif kind == MSG_HASH:
+                    tick, = struct.unpack_from('<I', payload)
+                    self.remote_hashes[tick] = payload[4:]
+                    self.check_hash(tick)
+                elif kind == MSG_PING:
+                    await self.link.send(MSG_PONG, payload)
+                elif kind == MSG_PONG:
+                    sent, = struct.unpack('<d', payload)
+                    self.rtts.append(time.perf_counter() - sent)
+                elif kind == MSG_BYE:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        self.stopped = True
+        self.remote_ready.set()
+
+    async def ping_loop(self):
+        while not self.stopped:
+            await self.link.send(MSG_PING, struct.pack('<d', time.perf_counter()))
+            await asyncio.sleep(ping_interval)
+
+    async def add_spectator(self, reader, writer):
+        self.spectators.append((Link(reader, writer), SnapshotEncoder()))
+
+    async def send_snapshots(self):
+        for link, encoder in list(self.spectators):
+            payload = encoder.encode(self.game, self.tick)
+            try:
+                await link.send(MSG_SNAPSHOT, payload)
+                self.snapshot_bytes += len(payload) + 5
+            except ConnectionError:
+                self.spectators.remove((link, encoder))
+
+    async def run(self):
+        receiver = asyncio.ensure_future(self.receive_loop())
+        pinger = asyncio.ensure_future(self.ping_loop())
+        next_tick = time.perf_counter()
+        try:
+            while self.tick < self.ticks and not self.stopped:
+                while self.script and self.script[0][0] <= self.tick:
+                    self.local_keys.append(self.script.popleft()[1])
+                keys = bytearray()
+                while self.local_keys:
+                    keys += self.local_keys.popleft().encode('ascii')
+
+                target = self.tick + input_delay_ticks
+                self.pending[target][self.player] = bytes(keys)
+                await self.link.send(MSG_COMMANDS, struct.pack('<I', target) + bytes(keys))
+
+                t0 = time.perf_counter()
+                waited = False
+                while self.pending[self.tick][1 - self.player] is None and not self.stopped:
+                    waited = True
+                    self.remote_ready.clear()
+                    await self.remote_ready.wait()
+                if self.stopped:
+                    break
+                if waited:
+                    self.stall_ticks += 1
+                    self.stall_time += time.perf_counter() - t0
+
+                commands = self.pending.pop(self.tick)
+                with self.game.sim_lock:
+                    for keys in commands:
+                        self.apply_commands(keys)
+                    if self.game.game_state == 'PLAYING':
+                        P.update_game(self.game, P.sim_step)
+                    if self.inject_desync == self.tick:
+                        self.game.player.score += 1
+                    if self.on_tick:
+                        self.on_tick()
+                self.tick += 1
+
+                if self.tick % hash_interval_ticks == 0:
+                    digest = state_hash(self.game, self.tick)
+                    self.local_hashes[self.tick] = digest
+                    await self.link.send(MSG_HASH, struct.pack('<I', self.tick) + digest)
+                    self.check_hash(self.tick)
+                if self.spectators and self.tick % spectator_interval_ticks == 0:
+                    await self.send_snapshots()
+
+                if self.paced:
+                    next_tick += P.sim_step
+                    await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+                else:
+                    await asyncio.sleep(0)
+
+            await self.link.send(MSG_BYE)
+            await asyncio.wait_for(receiver, 2.0)
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            pinger.cancel()
+            receiver.cancel()
+            for link, _ in self.spectators:
+                link.close()
+            self.link.close()
+
+    def stats(self, elapsed):
+        rtts = sorted(self.rtts)
+        return {
+            'player': self.player, 'ticks': self.tick, 'seconds': round(elapsed, 3),
+            'bytes_sent': self.link.bytes_sent, 'bytes_received': self.link.bytes_received,
+            'kbps_up': round(self.link.bytes_sent * 8 / 1000.0 / max(elapsed, 1e-6), 2),
+            'rtt_ms_p50': round(rtts[len(rtts) // 2] * 1000.0, 3) if rtts else None,
+            'rtt_ms_max': round(rtts[-1] * 1000.0, 3) if rtts else None,
+            'stall_ticks': self.stall_ticks, 'stall_ms': round(self.stall_time * 1000.0, 2),
+            'hashes_checked': self.hashes_checked, 'desync_tick': self.desync_tick,
+            'spectator_bytes': self.snapshot_bytes,
+            'wave': self.game.wave.wave_num, 'score': self.game.player.score,
+        }
+
+def new_game(map_name, seed):
+    game = P.GameState()
+    game.selected_map_idx = game.map_names.index(map_name)
+    game.reset(seed = seed)
+    P.G = game
+    return game
+
+async def run_host(args):
+    connected = asyncio.get_running_loop().create_future()
+
+    async def on_peer(reader, writer):
+        if not connected.done():
+            connected.set_result(Link(reader, writer))
+
+    server = await asyncio.start_server(on_peer, args.bind, args.port)
+    link = await connected
+    server.close()
+
+    hello = {'map': args.map, 'seed': args.seed, 'ticks': args.ticks}
+    await link.send(MSG_HELLO, json.dumps(hello).encode())
+    game = new_game(args.map, args.seed)
+    session = LockstepSession(game, link, 0, args.ticks, not args.unpaced, host_script if args.script else ())
+
+    spectator_server = None
+    if args.spectate_port:
+        spectator_server = await asyncio.start_server(session.add_spectator, args.bind, args.spectate_port)
+        if args.wait_spectator:
+            while not session.spectators:
+                await asyncio.sleep(0.01)
+    return await run_session(session, args, spectator_server)
+
+async def run_join(args):
+    for _ in range(100):
+        try:
+            reader, writer = await asyncio.open_connection(args.host, args.port)
+            break
+        except ConnectionError:
+            await asyncio.sleep(0.05)
+    else:
+        raise SystemExit(f"could not connect to {args.host}:{args.port}")
+    link = Link(reader, writer)
+    kind, payload = await link.recv()
+    if kind != MSG_HELLO:
+        raise SystemExit("expected HELLO from host")
+    hello = json.loads(payload)
+    game = new_game(hello['map'], hello['seed'])
+    session = LockstepSession(game, link, 1, hello['ticks'], not args.unpaced, join_script if args.script else (),
+                              inject_desync = args.inject_desync)
+    return await run_session(session, args)
+
+async def run_session(session, args, spectator_server = None):
+    if args.window:
+        start_window(session)
+    t0 = time.perf_counter()
+    await session.run()
+    if spectator_server:
+        spectator_server.close()
+    stats = session.stats(time.perf_counter() - t0)
+    print(json.dumps(stats))
+    return stats
+
+def start_window(session):
+    # Render from snapshots on the GLUT thread while this thread runs the session
+    import threading
+    game = session.game
+
+    # Only the snapshot buffers are used; the session thread is the one stepping the game
+    view = P.SimulationThread(game, P.sim_step)
+    view.publish(P.snapshot_scene(game))
+    session.on_tick = lambda: view.publish(P.snapshot_scene(game))
+    game.sim_thread = view
+    game.command_sink = session.submit
+
+    def window():
+        P.init_glut()
+        P.glutMainLoop()
+
+    threading.Thread(target = window, name = 'glut', daemon = True).start()
+
+async def run_spectator(args):
+    for _ in range(100):
+        try:
+            reader, writer = await asyncio.open_connection(args.host, args.spectate_port)
+            break
+        except ConnectionError:
+            await asyncio.sleep(0.05)
+    else:
+        raise SystemExit(f"could not connect to {args.host}:{args.spectate_port}")
+    link = Link(reader, writer)
+    mirror = SnapshotMirror()
+    t0 = time.perf_counter()
+    snapshots = 0
+    try:
+        while True:
+            kind, payload = await link.recv()
+            if kind == MSG_SNAPSHOT:
+                mirror.apply(payload)
+                snapshots += 1
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    elapsed = time.perf_counter() - t0
+    stats = {'spectator': True, 'snapshots': snapshots, 'last_tick': mirror.tick, 'entities': len(mirror.entities),
+             'bytes_received': link.bytes_received, 'bytes_per_snapshot': round(link.bytes_received / max(1, snapshots), 1),
+             'kbps_down': round(link.bytes_received * 8 / 1000.0 / max(elapsed, 1e-6), 2), 'mismatches': mirror.mismatches}
+    print(json.dumps(stats))
+    return stats
+
+def selftest(args):
+    # Host, joining peer and a spectator as separate processes over loopback
+    base = [sys.executable, __file__]
+    common = ['--port', str(args.port), '--ticks', str(args.ticks), '--script']
+    if args.unpaced:
+        common.append('--unpaced')
+    host = subprocess.Popen(base + ['host', '--spectate-port', str(args.spectate_port), '--wait-spectator'] + common,
+                            stdout = subprocess.PIPE, text = True)
+    spectator = subprocess.Popen(base + ['spectate', '--spectate-port', str(args.spectate_port)],
+                                 stdout = subprocess.PIPE, text = True)
+    join_args = ['join'] + common
+    if args.inject_desync is not None:
+        join_args += ['--inject-desync', str(args.inject_desync)]
+    join = subprocess.Popen(base + join_args, stdout = subprocess.PIPE, text = True)
+
+    results = {}
+    for name, proc in (('host', host), ('join', join), ('spectator', spectator)):
+        out, _ = proc.communicate(timeout = 600)
+        lines = [line for line in out.splitlines() if line.startswith('{')]
+        results[name] = json.loads(lines[-1]) if lines else None
+
+    for name, stats in results.items():
+        print(f"{name:>9}: {stats}")
+    host_stats, join_stats = results['host'], results['join']
+    ok = (host_stats and join_stats and host_stats['desync_tick'] is None and join_stats['desync_tick'] is None
+          and host_stats['hashes_checked'] > 0)
+    print("lockstep selftest:", "in sync" if ok else "FAILED / desync")
+    return 0 if ok else 1
+
+def main():
+    parser = argparse.ArgumentParser(description = "Two-player lockstep over TCP with an optional spectator stream")
+    parser.add_argument('role', choices = ('host', 'join', 'spectate', 'selftest'))
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--bind', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = default_port)
+    parser.add_argument('--spectate-port', type = int, default = None)
+    parser.add_argument('--wait-spectator', action = 'store_true')
+    parser.add_argument('--map', default = 'Default')
+    parser.add_argument('--seed', type = int, default = 423)
+    parser.add_argument('--ticks', type = int, default = 60 * 60)
+    parser.add_argument('--unpaced', action = 'store_true', help = "run ticks as fast as the link allows")
+    parser.add_argument('--script', action = 'store_true', help = "play the built-in scripted commands")
+    parser.add_argument('--window', action = 'store_true', help = "open a GLUT window and play with the keyboard")
+    parser.add_argument('--inject-desync', type = int, default = None, help = "perturb local state at this tick")
+    args = parser.parse_args()
+
+    if args.role == 'selftest':
+        if args.spectate_port is None:
+            args.spectate_port = default_spectate_port
+        sys.exit(selftest(args))
+    if args.role == 'spectate' and args.spectate_port is None:
+        args.spectate_port = default_spectate_port
+    runner = {'host': run_host, 'join': run_join, 'spectate': run_spectator}[args.role]
+    asyncio.run(runner(args))
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
-import math, time, random, sys
+import math, time, random, sys, collections, threading, json, itertools, gc, tracemalloc, bisect
 from math import sin, cos, radians, sqrt, atan2, pi
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from OpenGL.GL import (
-    glBegin, glEnd, glClear, glColor3f, glLoadIdentity, glMatrixMode, glPointSize,
-    glPopMatrix, glPushMatrix, glRasterPos2f, glRotatef, glScalef, glTranslatef,
-    glVertex3f, glViewport,
-    GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT, GL_LINES, GL_QUADS, GL_MODELVIEW,
-    GL_PROJECTION, GL_DEPTH_TEST
+    glBegin, glCallList, glClear, glColor3f, glColorPointer, glDeleteLists, glDisableClientState,
+    glDrawArrays, glEnableClientState, glEnd, glEndList, glGenLists, glLoadIdentity, glMatrixMode,
+    glNewList, glPointSize, glPopMatrix, glPushMatrix, glRasterPos2f, glRotatef, glScalef,
+    glTranslatef, glVertex3f, glVertexPointer, glViewport,
+    GL_COLOR_ARRAY, GL_COLOR_BUFFER_BIT, GL_COMPILE, GL_COMPILE_AND_EXECUTE, GL_DEPTH_BUFFER_BIT, GL_FLOAT,
+    GL_LINES, GL_POINTS, GL_QUADS, GL_MODELVIEW, GL_PROJECTION, GL_DEPTH_TEST, GL_VERTEX_ARRAY
 )
 
 from OpenGL.GLU import (
@@ -14,10 +20,10 @@ from OpenGL.GLU import (
 )
 
 from OpenGL.GLUT import (
-    glutBitmapCharacter, glutCreateWindow, glutDisplayFunc, glutIdleFunc, glutInit,
+    glutBitmapCharacter, glutCreateWindow, glutDisplayFunc, glutInit,
     glutInitDisplayMode, glutInitWindowPosition, glutInitWindowSize, glutKeyboardFunc,
     glutMainLoop, glutMouseFunc, glutPostRedisplay, glutSolidCube, glutSpecialFunc,
-    glutSwapBuffers, GLUT_DOUBLE, GLUT_RGB, GLUT_DEPTH,
+    glutSwapBuffers, glutTimerFunc, GLUT_DOUBLE, GLUT_RGB, GLUT_DEPTH,
     GLUT_LEFT_BUTTON, GLUT_RIGHT_BUTTON, GLUT_DOWN,
     GLUT_BITMAP_HELVETICA_18,
     GLUT_KEY_LEFT, GLUT_KEY_RIGHT, GLUT_KEY_UP, GLUT_KEY_DOWN
@@ -81,6 +87,20 @@ meteor_aoe_radius = 9999.0
 sphere_slices = 18
 sphere_stacks = 14
 
+# Camera projection
+camera_fovy = 60.0
+camera_near = 0.1
+camera_far = 300.0
+
+# Frustum culling and distance LOD (distances measured from the camera eye)
+frustum_culling = True
+frustum_margin = 1.0
+lod_mid_distance = 30.0
+lod_far_distance = 60.0
+lod_detail_scale = (1.0, 0.6, 0.35)
+lod_min_slices = 5
+lod_min_stacks = 4
+
 # Sky
 sky_wall_extent = 120.0
 sky_wall_height = 60.0
@@ -95,6 +115,8 @@ fast_explosive_bullet_color = (1.0, 0.9, 0.2)
 tower_lifetime = 30
 boss_tower_aoe_radius = 6.0
 boss_tower_dps = 0    
+slot_grid_cell = 4.0
+slot_neighbour_radius = 8.0
 
 # Health bar settings
 HPBAR_WIDTH = 2.8
@@ -108,6 +130,47 @@ HPBAR_LAG_SEC = 0.25
 
 TOWER_DECAY_RATE = 1.0
 
+# Particles (need numpy; without it effects are silently skipped)
+explosion_particle_count = 80
+meteor_particle_count = 10000
+wind_particle_count = 600
+explosion_color = (1.0, 0.55, 0.10)
+meteor_particle_color = (0.95, 0.35, 0.15)
+wind_particle_color = (0.85, 0.95, 1.00)
+
+# Frame pacing
+target_fps = 60.0
+idle_poll_interval = 0.1
+frame_stats_window = 240
+frame_stats_report = True  # print frame rate and jitter when pausing or quitting
+
+# Run the fixed-step simulation on a worker thread and render from snapshots
+simulation_thread = False
+sim_step = 1.0 / 60.0
+sim_switch_interval = 0.001
+
+# Fast-forward: X cycles the speed (0 = as many steps as the frame budget allows), N skips to the next wave
+speed_modes = (1, 2, 4, 8, 0)
+fast_forward_budget = 0.75
+max_substeps = 64
+skip_wave_limit = 600.0
+
+# Bake every map on a worker thread while the menu is up; GL uploads get a per-tick budget
+map_preload = True
+map_preload_waves = 3
+map_upload_budget = 0.004
+
+# Mouse picking: rays are tested against objects whose pick spheres fit below pick_height
+pick_height = 4.5
+pick_slot_radius = 0.65
+pick_enemy_scale = 1.25
+
+# Allocation profiling (--alloc-profile) and GC tuning (--gc-freeze)
+alloc_profiling = False
+alloc_report_interval = 600
+alloc_report_top = 12
+gc_freeze_after_load = False
+
 
 class MapPreset:
     def __init__(self, name, path_points, tower_slots, path_width, ground_scale, camera_distance):
@@ -243,6 +306,40 @@ Forest_Adventure = MapPreset(
 
 MAPS = {"Default" : DEFAULT_MAP, "Mohammadpur" : Mohammadpur, "Male Fantasy": Male_Fantasy, "Swamp Lands" : Swamp_Lands, "Cityscape" : Cityscape, "Desert Storm": Desert_Storm, "Mountain Peak": Mountain_Peak}
 
+# Wave definitions are plain JSON-compatible data. Numeric rules are [base, per_wave]
+# with an optional floor as a third item. "overrides" replaces group fields for one
+# wave, "per_spawn" releases several enemies on the same tick, the mid boss joins
+# the first group once its remaining spawns drop to "remaining", and the end boss
+# follows the last spawn on every "every"-th wave.
+ENEMY_ARCHETYPES = {
+    "grunt": {"speed": [1.2, 0.08], "health": [85, 18], "boss": False},
+    "boss": {"speed": [boss_speed, 0.0], "health": [boss_base_hp - boss_hp_wave_scale, boss_hp_wave_scale], "boss": True},
+}
+
+DEFAULT_WAVES = {
+    "rest": 4.0,
+    "groups": [
+        {"archetype": "grunt", "count": [8, 2], "interval": [1.4, -0.07, 0.7],
+         "overrides": {"1": {"interval": [1.25, 0.0], "start": 2.0}}},
+    ],
+    "mid_boss": {"archetype": "boss", "remaining": [0, 1]},
+    "end_boss": {"archetype": "boss", "every": 2},
+}
+
+STRESS_WAVES = {
+    "rest": 2.0,
+    "groups": [
+        {"archetype": "grunt", "count": [10000, 10000], "interval": [0.05, 0.0], "per_spawn": [100, 0]},
+    ],
+    "end_boss": {"archetype": "boss", "every": 1},
+}
+
+wave_definition = DEFAULT_WAVES
+
+def load_wave_definition(path):
+    with open(path) as f:
+        return json.load(f)
+
 def dist2D(ax, az, bx, bz):
     return math.hypot(bx - ax, bz - az)
 
@@ -255,8 +352,25 @@ def normalize2D(dx, dz):
 def clamp(value, lo, hi):
     return max(lo, min(hi, value))
 
+# Stable ids for network snapshots; never part of the simulation itself
+entity_ids = itertools.count(1)
+
+def lod_for_distance(dist):
+    if dist >= lod_far_distance:
+        return 2
+    if dist >= lod_mid_distance:
+        return 1
+    return 0
+
+def lod_detail(slices, stacks, lod):
+    if lod <= 0:
+        return (slices, stacks)
+    scale = lod_detail_scale[lod]
+    return (max(lod_min_slices, int(slices * scale)), max(lod_min_stacks, int(stacks * scale)))
+
 class Enemy:
     def __init__(self, x, z, speed, health, is_boss = False):
+        self.uid = next(entity_ids)
         self.x = x
         self.z = z
 
@@ -332,6 +446,7 @@ def lead_direction(shooter_x, shooter_z, target_x, target_z, vtx, vtz, proj_spee
 
 class Projectile:
     def __init__(self, x, y, z, dir_x, dir_y, dir_z, speed, damage, explosive = False, fast = False):
+        self.uid = next(entity_ids)
         self.x = x
         self.y = y
         self.z = z
@@ -355,6 +470,7 @@ class Projectile:
 
 class Tower:
     def __init__(self, x, z):
+        self.uid = next(entity_ids)
         self.x = x
         self.z = z
         self.y = ground_y
@@ -376,12 +492,66 @@ class Tower:
         return interval
 
 class TowerSlot:
-    def __init__(self, x, z):
+    def __init__(self, x, z, index = 0):
         self.x = x
         self.z = z
+        self.index = index
         self.occupied = False
         self.tower = None
 
+class SlotIndex:
+    # Uniform grid over a map's (static) slot positions plus a neighbour table per slot
+    def __init__(self, positions, cell = slot_grid_cell, neighbour_radius = slot_neighbour_radius):
+        self.positions = positions
+        self.cell = cell
+        self.cells = collections.defaultdict(list)
+        for i, (x, z) in enumerate(positions):
+            self.cells[self.cell_of(x, z)].append(i)
+        self.neighbours = []
+        for i, (x, z) in enumerate(positions):
+            near = [j for j in self.query(x, z, neighbour_radius) if j != i]
+            near.sort(key = lambda j: dist2D(x, z, positions[j][0], positions[j][1]))
+            self.neighbours.append(near)
+
+    def cell_of(self, x, z):
+        return (int(math.floor(x / self.cell)), int(math.floor(z / self.cell)))
+
+    def query_segment(self, x0, z0, x1, z1, radius):
+        # Slot indices within radius of the segment, in slot order
+        cx0, cz0 = self.cell_of(min(x0, x1) - radius, min(z0, z1) - radius)
+        cx1, cz1 = self.cell_of(max(x0, x1) + radius, max(z0, z1) + radius)
+        found = []
+        for cx in range(cx0, cx1 + 1):
+            for cz in range(cz0, cz1 + 1):
+                for i in self.cells.get((cx, cz), ()):
+                    sx, sz = self.positions[i]
+                    if point_to_segment_distance(sx, sz, x0, z0, x1, z1) <= radius:
+                        found.append(i)
+        found.sort()
+        return found
+
+    def query(self, x, z, radius):
+        # Slot indices within radius, in slot order
+        x0, z0 = self.cell_of(x - radius, z - radius)
+        x1, z1 = self.cell_of(x + radius, z + radius)
+        found = []
+        for cx in range(x0, x1 + 1):
+            for cz in range(z0, z1 + 1):
+                for i in self.cells.get((cx, cz), ()):
+                    sx, sz = self.positions[i]
+                    if dist2D(sx, sz, x, z) <= radius:
+                        found.append(i)
+        found.sort()
+        return found
+
+slot_indices = {}
+
+def slot_index_for(map_preset):
+    index = slot_indices.get(map_preset.name)
+    if index is None:
+        index = slot_indices[map_preset.name] = SlotIndex(map_preset.tower_slots)
+    return index
+
 class Player:
     def __init__(self):
         self.health = player_hp
@@ -421,6 +591,7 @@ class Abilities:
 
 class MegaKnight:
     def __init__(self):
+        self.uid = next(entity_ids)
         self.x = 0.0
         self.z = 0.0
         self.y = ground_y + 0.5
@@ -631,165 +802,13 @@ class MegaKnight:
         self.jump_time = self.jump_duration
 
     def deal_landing_damage(self):
-        for e in G.enemies:
-            if e.alive and dist2D(self.x, self.z, e.x, e.z) <= self.aoe_radius:
-                e.health -= self.landing_damage
-                if e.health <= 0 and e.alive:
-                    e.alive = False
-                    G.player.money += (boss_reward if e.is_boss else kill_reward)
-                    G.player.score += (50 if e.is_boss else 10)
+        area_damage(G, area_query(G.enemies, self.x, self.z, self.aoe_radius), damage = self.landing_damage)
         G.shake_timer = 1.0
         G.shake_mag = 0.6
 
-    def draw(self, quadric):
-        if not self.alive:
-            return
-        
-        glPushMatrix()
-        s = self.radius
-        base_lift = 1.09 * s - 0.5
-        glTranslatef(self.x, self.y + base_lift, self.z)
-        glRotatef(self.rotate_degree, 0, 1, 0)
-
-        glPushMatrix() 
-        
-        glTranslatef(0.0, 0.8 * s, -0.5 * s) 
-        glColor3f(0.06, 0.12, 0.55)
-        glScalef(1.0 * s, 1.3 * s, 0.08 * s)
-        glutSolidCube(1.0)
-
-        glPopMatrix()
-        glPushMatrix()
-
-        glTranslatef(0.0, 0.55 * s, 0.0)
-        glColor3f(0.42, 0.44, 0.50)
-        glScalef(1.5 * s, 1.1 * s, 1.0 * s)
-        glutSolidCube(1.0)
-        
-        glPopMatrix()
-        glPushMatrix()
-
-        glTranslatef(0.0, 0.7 * s, 0.45 * s)
-        glColor3f(0.18, 0.20, 0.24)
-        glScalef(0.9 * s, 0.4 * s, 0.08 * s)
-        glutSolidCube(1.0)
-
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(0.0, 0.12 * s, 0.0)
-        glColor3f(0.35, 0.25, 0.15)
-        glScalef(1.3 * s, 0.25 * s, 0.95 * s)
-        glutSolidCube(1.0)
-
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(0.0, 0.12 * s, 0.49 * s)
-        glColor3f(0.85, 0.65, 0.20)
-        glScalef(0.35 * s, 0.2 * s, 0.06 * s)
-        glutSolidCube(1.0)
-        
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(-0.95 * s, 1.05 * s, 0.0)
-        glColor3f(0.20, 0.20, 0.25)
-        gluSphere(quadric, 0.42 * s, sphere_slices, sphere_stacks)
-
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(0.95 * s, 1.05 * s, 0.0)
-        glColor3f(0.20, 0.20, 0.25)
-        gluSphere(quadric, 0.42 * s, sphere_slices, sphere_stacks)
-
-        glPopMatrix()
-        glPushMatrix()
-
-        glTranslatef(-1.15 * s, 0.7 * s, 0.0)
-        glColor3f(0.28, 0.28, 0.35)
-        glScalef(0.35 * s, 0.75 * s, 0.35 * s)
-        glutSolidCube(1.0)
-        
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(1.15 * s, 0.7 * s, 0.0)
-        glColor3f(0.28, 0.28, 0.35)
-        glScalef(0.35 * s, 0.75 * s, 0.35 * s)
-        glutSolidCube(1.0)
-
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(-1.2 * s, 0.25 * s, 0.0)
-        glColor3f(0.10, 0.10, 0.12)
-        gluSphere(quadric, 0.24 * s, sphere_slices, sphere_stacks)
-
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(1.2 * s, 0.25 * s, 0.0)
-        glColor3f(0.10, 0.10, 0.12)
-        gluSphere(quadric, 0.24 * s, sphere_slices, sphere_stacks)
-
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(-0.38 * s, -0.35 * s, 0.0)
-        glColor3f(0.25, 0.25, 0.30)
-        glScalef(0.35 * s, 0.85 * s, 0.38 * s); glutSolidCube(1.0)
-
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(0.38 * s, -0.35 * s, 0.0)
-        glColor3f(0.25, 0.25, 0.30)
-        glScalef(0.35 * s, 0.85 * s, 0.38 * s)
-        glutSolidCube(1.0)
+    def draw(self, quadric, lod = 0):
+        draw_mega_knight(self, quadric, lod)
 
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(-0.38 * s, -0.95 * s, 0.1 * s)
-        glColor3f(0.10, 0.10, 0.12)
-        glScalef(0.7 * s, 0.28 * s, 1.0 * s)
-        glutSolidCube(1.0)
-
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(0.38 * s, -0.95 * s, 0.1 * s)
-        glColor3f(0.10, 0.10, 0.12); glScalef(0.7 * s, 0.28 * s, 1.0 * s)
-        glutSolidCube(1.0)
-        
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(0.0, 1.25 * s, 0.0)
-        glColor3f(0.30, 0.31, 0.34)
-        gluSphere(quadric, 0.38 * s, sphere_slices, sphere_stacks)
-        
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(0.0, 1.15 * s, 0.38 * s)
-        glColor3f(0.05, 0.05, 0.08); glScalef(0.55 * s, 0.20 * s, 0.07 * s)
-        glutSolidCube(1.0)
-        
-        glPopMatrix()
-        glPushMatrix()
-        
-        glTranslatef(0.0, 1.55 * s, 0.0)
-        glColor3f(0.15, 0.30, 0.85)
-        glScalef(0.35 * s, 0.45 * s, 0.35 * s)
-        glutSolidCube(1.0)
-        
-        glPopMatrix()
-        glPopMatrix()
-        
-        
     def use_wind_ability(self, game_time):
         if not self.can_use_wind or self.wind_cooldown_timer > 0:
             return False
@@ -798,84 +817,170 @@ class MegaKnight:
             return False
         
         G.player.money -= wind_ability_cost
-        
-        affected_enemies = []
-        for enemy in G.enemies:
-            if enemy.alive:
-                distance = dist2D(self.x, self.z, enemy.x, enemy.z)
-                if distance <= wind_radius:
-                    affected_enemies.append((enemy, distance))
-        
-        for enemy, distance in affected_enemies:
-            push_dx = enemy.x - self.x
-            push_dz = enemy.z - self.z
-            push_ndx, push_ndz = normalize2D(push_dx, push_dz)
-            
-            force_multiplier = max(0.2, (wind_radius - distance) / wind_radius)
-            actual_push = wind_push_force * force_multiplier
-            
-            self.push_enemy_back(enemy, push_ndx * actual_push, push_ndz * actual_push)
-            
-            enemy.apply_wind_effect(game_time, wind_slow_duration)
+        area_wind(G, area_query(G.enemies, self.x, self.z, wind_radius), self.x, self.z, game_time)
        
         self.wind_cooldown_timer = self.wind_max_cooldown
         self.can_use_wind = False
+        G.particles.emit_wind(self.x, self.z)
         
         G.shake_timer = 0.8
         G.shake_mag = 0.4
         
         return True
 
-    def push_enemy_back(self, enemy, push_x, push_z):
-        new_x = enemy.x + push_x
-        new_z = enemy.z + push_z
-        
-        if hasattr(G, 'map') and G.map and G.map.path_points:
-            path = G.map.path_points
-            
-            min_dist_to_path = float('inf')
-            closest_segment = 0
-            
-            for i in range(len(path) - 1):
-                seg_dist = self.point_to_segment_distance(new_x, new_z, 
-                                                        path[i][0], path[i][1], 
-                                                        path[i+1][0], path[i+1][1])
-                if seg_dist < min_dist_to_path:
-                    min_dist_to_path = seg_dist
-                    closest_segment = i
-            if min_dist_to_path <= G.map.path_width * 2:
-                enemy.x = new_x
-                enemy.z = new_z
-
-                for i in range(len(path) - 1):
-                    point_dist = dist2D(enemy.x, enemy.z, path[i][0], path[i][1])
-                    next_point_dist = dist2D(enemy.x, enemy.z, path[i+1][0], path[i+1][1])
-                    if point_dist <= next_point_dist:
-                        enemy.path_idx = max(0, i)
-                        break
-
-    def point_to_segment_distance(self, px, pz, ax, az, bx, bz):
-        abx = bx - ax
-        abz = bz - az
-        
-        apx = px - ax
-        apz = pz - az
-        
-        ab_length_sq = abx * abx + abz * abz
-        if ab_length_sq == 0:
-            return dist2D(px, pz, ax, az)
-        
-        t = max(0, min(1, (apx * abx + apz * abz) / ab_length_sq))
-        closest_x = ax + t * abx
-        closest_z = az + t * abz
-        
-        return dist2D(px, pz, closest_x, closest_z)
+def draw_mega_knight(mk, quadric, lod = 0):
+    if not mk.alive:
+        return
+    slices, stacks = lod_detail(sphere_slices, sphere_stacks, lod)
+    
+    glPushMatrix()
+    s = mk.radius
+    base_lift = 1.09 * s - 0.5
+    glTranslatef(mk.x, mk.y + base_lift, mk.z)
+    glRotatef(mk.rotate_degree, 0, 1, 0)
+
+    glPushMatrix() 
+    
+    glTranslatef(0.0, 0.8 * s, -0.5 * s) 
+    glColor3f(0.06, 0.12, 0.55)
+    glScalef(1.0 * s, 1.3 * s, 0.08 * s)
+    glutSolidCube(1.0)
+
+    glPopMatrix()
+    glPushMatrix()
+
+    glTranslatef(0.0, 0.55 * s, 0.0)
+    glColor3f(0.42, 0.44, 0.50)
+    glScalef(1.5 * s, 1.1 * s, 1.0 * s)
+    glutSolidCube(1.0)
+    
+    glPopMatrix()
+    glPushMatrix()
+
+    glTranslatef(0.0, 0.7 * s, 0.45 * s)
+    glColor3f(0.18, 0.20, 0.24)
+    glScalef(0.9 * s, 0.4 * s, 0.08 * s)
+    glutSolidCube(1.0)
+
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(0.0, 0.12 * s, 0.0)
+    glColor3f(0.35, 0.25, 0.15)
+    glScalef(1.3 * s, 0.25 * s, 0.95 * s)
+    glutSolidCube(1.0)
+
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(0.0, 0.12 * s, 0.49 * s)
+    glColor3f(0.85, 0.65, 0.20)
+    glScalef(0.35 * s, 0.2 * s, 0.06 * s)
+    glutSolidCube(1.0)
+    
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(-0.95 * s, 1.05 * s, 0.0)
+    glColor3f(0.20, 0.20, 0.25)
+    gluSphere(quadric, 0.42 * s, slices, stacks)
+
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(0.95 * s, 1.05 * s, 0.0)
+    glColor3f(0.20, 0.20, 0.25)
+    gluSphere(quadric, 0.42 * s, slices, stacks)
+
+    glPopMatrix()
+    glPushMatrix()
 
+    glTranslatef(-1.15 * s, 0.7 * s, 0.0)
+    glColor3f(0.28, 0.28, 0.35)
+    glScalef(0.35 * s, 0.75 * s, 0.35 * s)
+    glutSolidCube(1.0)
+    
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(1.15 * s, 0.7 * s, 0.0)
+    glColor3f(0.28, 0.28, 0.35)
+    glScalef(0.35 * s, 0.75 * s, 0.35 * s)
+    glutSolidCube(1.0)
+
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(-1.2 * s, 0.25 * s, 0.0)
+    glColor3f(0.10, 0.10, 0.12)
+    gluSphere(quadric, 0.24 * s, slices, stacks)
+
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(1.2 * s, 0.25 * s, 0.0)
+    glColor3f(0.10, 0.10, 0.12)
+    gluSphere(quadric, 0.24 * s, slices, stacks)
+
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(-0.38 * s, -0.35 * s, 0.0)
+    glColor3f(0.25, 0.25, 0.30)
+    glScalef(0.35 * s, 0.85 * s, 0.38 * s); glutSolidCube(1.0)
+
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(0.38 * s, -0.35 * s, 0.0)
+    glColor3f(0.25, 0.25, 0.30)
+    glScalef(0.35 * s, 0.85 * s, 0.38 * s)
+    glutSolidCube(1.0)
+
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(-0.38 * s, -0.95 * s, 0.1 * s)
+    glColor3f(0.10, 0.10, 0.12)
+    glScalef(0.7 * s, 0.28 * s, 1.0 * s)
+    glutSolidCube(1.0)
+
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(0.38 * s, -0.95 * s, 0.1 * s)
+    glColor3f(0.10, 0.10, 0.12); glScalef(0.7 * s, 0.28 * s, 1.0 * s)
+    glutSolidCube(1.0)
+    
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(0.0, 1.25 * s, 0.0)
+    glColor3f(0.30, 0.31, 0.34)
+    gluSphere(quadric, 0.38 * s, slices, stacks)
+    
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(0.0, 1.15 * s, 0.38 * s)
+    glColor3f(0.05, 0.05, 0.08); glScalef(0.55 * s, 0.20 * s, 0.07 * s)
+    glutSolidCube(1.0)
+    
+    glPopMatrix()
+    glPushMatrix()
+    
+    glTranslatef(0.0, 1.55 * s, 0.0)
+    glColor3f(0.15, 0.30, 0.85)
+    glScalef(0.35 * s, 0.45 * s, 0.35 * s)
+    glutSolidCube(1.0)
+    
+    glPopMatrix()
+    glPopMatrix()
 
-def apply_screen_shake():
-    if G.shake_timer <= 0.0:
+def apply_screen_shake(scene):
+    if scene.shake_timer <= 0.0:
         return
-    amp = G.shake_mag * (G.shake_timer / 1.0)
+    amp = scene.shake_mag * (scene.shake_timer / 1.0)
     t = time.perf_counter()
     ox = math.sin(t * G.shake_freq) * amp
     oy = math.cos(t * G.shake_freq * 1.3) * amp * 0.5
@@ -884,6 +989,7 @@ def apply_screen_shake():
 
 class Meteor:
     def __init__(self, start_x, start_y, start_z, target_x, target_z):
+        self.uid = next(entity_ids)
         self.x = start_x
         self.y = start_y
         self.z = start_z
@@ -918,52 +1024,220 @@ class Meteor:
             G.shake_timer = 1.0
             G.shake_mag = 1.0
 
-class WaveManager:
+class ParticleEmitter:
+    rng = numpy.random.default_rng() if numpy else None
+
+    def __init__(self, capacity, point_size, gravity, drag):
+        self.capacity = capacity
+        self.point_size = point_size
+        self.gravity = gravity
+        self.drag = drag
+        self.count = 0
+
+        self.pos = numpy.zeros((capacity, 3), numpy.float32)
+        self.vel = numpy.zeros((capacity, 3), numpy.float32)
+        self.life = numpy.zeros(capacity, numpy.float32)
+        self.color = numpy.zeros((capacity, 3), numpy.float32)
+
+    def spawn(self, x, y, z, n, speed, lift, life, color, jitter = 0.15):
+        n = min(n, self.capacity - self.count)
+        if n <= 0:
+            return
+        s = slice(self.count, self.count + n)
+
+        # One float32 draw for every random quantity: angle, speed, lift, lifetime, tint
+        r = self.rng.random((5, n), dtype = numpy.float32)
+        theta = r[0] * (2.0 * pi)
+        mag = (r[1] * 0.7 + 0.3) * speed
+        self.vel[s, 0] = numpy.cos(theta) * mag
+        self.vel[s, 1] = (r[2] * (lift[1] - lift[0]) + lift[0]) * speed
+        self.vel[s, 2] = numpy.sin(theta) * mag
+        self.pos[s] = (x, y, z)
+        self.life[s] = (r[3] * 0.5 + 0.5) * life
+
+        color_out = self.color[s]
+        color_out[:] = color
+        color_out += ((r[4] - 0.5) * (2.0 * jitter))[:, None]
+        numpy.clip(color_out, 0.0, 1.0, out = color_out)
+        self.count += n
+
+    def update(self, dt):
+        n = self.count
+        if n == 0:
+            return
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+        life = self.life[:n]
+
+        vel *= max(0.0, 1.0 - self.drag * dt)
+        vel[:, 1] += self.gravity * dt
+        pos += vel * dt
+
+        landed = pos[:, 1] < ground_y
+        pos[landed, 1] = ground_y
+        vel[landed, 1] *= -0.3
+
+        life -= dt
+        alive = life > 0.0
+        k = int(numpy.count_nonzero(alive))
+        if k < n:
+            # Compact survivors to the front so the live range stays one contiguous slice
+            for arr in (self.pos, self.vel, self.life, self.color):
+                arr[:k] = arr[:n][alive]
+        self.count = k
+
+    def batch(self, copy = False):
+        n = self.count
+        if copy:
+            return (self.point_size, self.pos[:n].copy(), self.color[:n].copy())
+        return (self.point_size, self.pos[:n], self.color[:n])
+
+class ParticleSystem:
     def __init__(self):
+        self.emitters = {}
+        if numpy is None:
+            return
+        self.emitters['explosion'] = ParticleEmitter(4000, 4.0, -9.8, 1.0)
+        self.emitters['meteor'] = ParticleEmitter(20000, 3.0, -14.0, 0.6)
+        self.emitters['wind'] = ParticleEmitter(4000, 3.0, 0.5, 1.5)
+
+    def emit_explosion(self, x, y, z):
+        if self.emitters:
+            self.emitters['explosion'].spawn(x, y, z, explosion_particle_count, 4.0, (0.2, 1.0), 0.6, explosion_color)
+
+    def emit_meteor_impact(self, x, z):
+        if self.emitters:
+            self.emitters['meteor'].spawn(x, ground_y + 0.2, z, meteor_particle_count, 14.0, (0.3, 1.4), 1.8, meteor_particle_color)
+
+    def emit_wind(self, x, z):
+        if self.emitters:
+            self.emitters['wind'].spawn(x, ground_y + 0.5, z, wind_particle_count, wind_radius * 1.5, (0.0, 0.08), 0.9, wind_particle_color, 0.05)
+
+    def update(self, dt):
+        for emitter in self.emitters.values():
+            emitter.update(dt)
+
+    def batches(self, copy = False):
+        return [emitter.batch(copy) for emitter in self.emitters.values() if emitter.count]
+
+def wave_rule(rule, wave_num):
+    value = rule[0] + rule[1] * wave_num
+    if len(rule) > 2:
+        value = max(rule[2], value)
+    return value
+
+class WaveSchedule:
+    # One wave compiled into a flat timeline of parallel lists, one entry per spawn tick
+    def __init__(self, definition, wave_num):
+        events = []
+        groups = definition["groups"]
+        mid_boss = definition.get("mid_boss")
+
+        for order, group in enumerate(groups):
+            group = dict(group, **group.get("overrides", {}).get(str(wave_num), {}))
+            count = int(wave_rule(group["count"], wave_num))
+            interval = wave_rule(group["interval"], wave_num)
+            per_spawn = max(1, int(wave_rule(group.get("per_spawn", [1, 0]), wave_num)))
+            boss_at = wave_rule(mid_boss["remaining"], wave_num) if mid_boss and order == 0 else None
+
+            start = group.get("start", interval)
+            spawned = 0
+            tick = 0
+            while spawned < count:
+                t = start + tick * interval
+                n = min(per_spawn, count - spawned)
+                spawned += n
+                events.append((t, order, group["archetype"], n))
+                if boss_at is not None and count - spawned <= boss_at:
+                    events.append((t, order, mid_boss["archetype"], 1))
+                    boss_at = None
+                tick += 1
+
+        end_boss = definition.get("end_boss")
+        if end_boss and wave_num % end_boss["every"] == 0:
+            last = max((e[0] for e in events), default = 0.0)
+            events.append((last, len(groups), end_boss["archetype"], 1))
+
+        events.sort(key = lambda e: (e[0], e[1]))
+
+        self.times = []
+        self.counts = []
+        self.speeds = []
+        self.healths = []
+        self.bosses = []
+        prev = None
+        for t, _, archetype, n in events:
+            if prev == (t, archetype):
+                self.counts[-1] += n
+                continue
+            stats = ENEMY_ARCHETYPES[archetype]
+            self.times.append(t)
+            self.counts.append(n)
+            self.speeds.append(wave_rule(stats["speed"], wave_num))
+            self.healths.append(wave_rule(stats["health"], wave_num))
+            self.bosses.append(stats["boss"])
+            prev = (t, archetype)
+
+        self.total = sum(self.counts)
+
+# Compiled schedules keyed on the definition's content (ids get reused once a definition
+# is collected) and the wave number, least recently used dropped past the limit.
+# MapBake fills it from the preload thread, hence the lock.
+compiled_wave_limit = 32
+compiled_waves = collections.OrderedDict()
+compiled_waves_lock = threading.Lock()
+
+def compile_wave(definition, wave_num):
+    key = (json.dumps(definition, sort_keys = True), wave_num)
+    with compiled_waves_lock:
+        schedule = compiled_waves.get(key)
+        if schedule is not None:
+            compiled_waves.move_to_end(key)
+            return schedule
+    schedule = WaveSchedule(definition, wave_num)
+    with compiled_waves_lock:
+        compiled_waves[key] = schedule
+        while len(compiled_waves) > compiled_wave_limit:
+            compiled_waves.popitem(last = False)
+    return schedule
+
+class WaveManager:
+    def __init__(self, definition = None):
+        self.definition = definition or wave_definition
         self.wave_num = 1
-        self.spawn_interval = 1.25
-        self.time_to_next = 2.0
-        self.to_spawn = 8 + 2 * self.wave_num
-        self.between_waves = 4.0
+        self.between_waves = self.definition.get("rest", 4.0)
+        self.time_to_next = 0.0
+        self.start_wave()
+
+    def start_wave(self):
         self.resting = False
-        self.boss_spawned = False
-        self.middle_boss_spawned = False
+        self.schedule = compile_wave(self.definition, self.wave_num)
+        self.cursor = 0
+        self.wave_time = 0.0
 
     def update(self, dt, game):
         if self.resting:
             self.time_to_next -= dt
             if self.time_to_next <= 0:
-                self.resting = False
-                self.boss_spawned = False
-                self.middle_boss_spawned = False
-                self.to_spawn = 8 + self.wave_num * 2
-                self.spawn_interval = max(0.7, 1.4 - 0.07 * self.wave_num)
-                self.time_to_next = self.spawn_interval
+                self.start_wave()
             return
 
-        if self.to_spawn > 0:
-            self.time_to_next -= dt
-
-            if self.time_to_next <= 0:
-                self.time_to_next = self.spawn_interval
-                self.to_spawn -= 1
-
-                spawn_enemy(game, speed = 1.2 + 0.08 * self.wave_num, health = 85 + 18 * self.wave_num)
-                if not self.middle_boss_spawned and self.to_spawn <= self.wave_num:
-                    self.middle_boss_spawned = True
-                    spawn_boss(game)
-            return
-
-        if not self.boss_spawned:
-            self.boss_spawned = True
-            if self.wave_num % 2 == 0:
-                spawn_boss(game)
+        schedule = self.schedule
+        if self.cursor < len(schedule.times):
+            self.wave_time += dt
+            while self.cursor < len(schedule.times) and schedule.times[self.cursor] <= self.wave_time:
+                i = self.cursor
+                spawn_batch(game, schedule.counts[i], schedule.speeds[i], schedule.healths[i], schedule.bosses[i])
+                self.cursor += 1
             return
 
         if not any(e.alive for e in game.enemies):
             self.resting = True
             self.wave_num += 1
             self.time_to_next = self.between_waves
+            # Compile the next wave while resting so the first spawn tick stays cheap
+            compile_wave(self.definition, self.wave_num)
+
 class Camera:
     def __init__(self):
         self.target_x = 0.0
@@ -983,6 +1257,104 @@ class Camera:
         cz = self.target_z + self.distance * math.cos(pitch_r) * math.cos(rotate_r)
         return (cx, cy, cz)
 
+    def view_matrix(self):
+        return look_at_matrix(self.eye(), (self.target_x, self.target_y, self.target_z), (0.0, 1.0, 0.0))
+
+    def frustum(self, aspect):
+        proj = perspective_matrix(camera_fovy, aspect, camera_near, camera_far)
+        return Frustum(mat4_mul(proj, self.view_matrix()))
+
+    def ray(self, mx, my, width, height):
+        # Unproject a window pixel (GLUT origin, top-left) into a world-space ray. The rows
+        # of the view matrix are the camera's right, up and backward axes.
+        view = self.view_matrix()
+        tan_half = math.tan(math.radians(camera_fovy) * 0.5)
+        vx = (2.0 * (mx + 0.5) / width - 1.0) * tan_half * width / float(height)
+        vy = (1.0 - 2.0 * (my + 0.5) / height) * tan_half
+        dx, dy, dz = (view[0][i] * vx + view[1][i] * vy - view[2][i] for i in range(3))
+        mag = math.sqrt(dx * dx + dy * dy + dz * dz)
+        ox, oy, oz = self.eye()
+        return Ray(ox, oy, oz, dx / mag, dy / mag, dz / mag)
+
+# Row-major 4x4 matrices matching what gluPerspective / gluLookAt load
+def perspective_matrix(fovy, aspect, near, far):
+    f = 1.0 / math.tan(math.radians(fovy) * 0.5)
+    return [[f / aspect, 0.0, 0.0, 0.0],
+            [0.0, f, 0.0, 0.0],
+            [0.0, 0.0, (far + near) / (near - far), 2.0 * far * near / (near - far)],
+            [0.0, 0.0, -1.0, 0.0]]
+
+def look_at_matrix(eye, target, up):
+    ex, ey, ez = eye
+    fx, fy, fz = target[0] - ex, target[1] - ey, target[2] - ez
+    mag = math.sqrt(fx * fx + fy * fy + fz * fz)
+    fx, fy, fz = fx / mag, fy / mag, fz / mag
+
+    ux, uy, uz = up
+    sx, sy, sz = fy * uz - fz * uy, fz * ux - fx * uz, fx * uy - fy * ux
+    mag = math.sqrt(sx * sx + sy * sy + sz * sz)
+    sx, sy, sz = sx / mag, sy / mag, sz / mag
+
+    ux, uy, uz = sy * fz - sz * fy, sz * fx - sx * fz, sx * fy - sy * fx
+    return [[sx, sy, sz, -(sx * ex + sy * ey + sz * ez)],
+            [ux, uy, uz, -(ux * ex + uy * ey + uz * ez)],
+            [-fx, -fy, -fz, fx * ex + fy * ey + fz * ez],
+            [0.0, 0.0, 0.0, 1.0]]
+
+def mat4_mul(a, b):
+    return [[sum(a[i][k] * b[k][j] for k in range(4)) for j in range(4)] for i in range(4)]
+
+class Frustum:
+    def __init__(self, clip):
+        r0, r1, r2, r3 = clip
+        self.planes = []
+
+        # left, right, bottom, top, near, far
+        for row, sign in ((r0, 1), (r0, -1), (r1, 1), (r1, -1), (r2, 1), (r2, -1)):
+            a, b, c, d = (r3[i] + sign * row[i] for i in range(4))
+            mag = math.sqrt(a * a + b * b + c * c)
+            self.planes.append((a / mag, b / mag, c / mag, d / mag))
+
+    def sphere_visible(self, x, y, z, radius):
+        for a, b, c, d in self.planes:
+            if a * x + b * y + c * z + d < -radius:
+                return False
+        return True
+
+Ray = collections.namedtuple('Ray', 'ox oy oz dx dy dz')
+
+def ray_point(ray, t):
+    return (ray.ox + ray.dx * t, ray.oy + ray.dy * t, ray.oz + ray.dz * t)
+
+def ray_plane_y(ray, y):
+    if abs(ray.dy) < 1e-9:
+        return None
+    t = (y - ray.oy) / ray.dy
+    return t if t >= 0.0 else None
+
+def ray_sphere(ray, cx, cy, cz, radius):
+    # Distance along the ray to the first hit on the sphere, or None
+    lx, ly, lz = cx - ray.ox, cy - ray.oy, cz - ray.oz
+    tca = lx * ray.dx + ly * ray.dy + lz * ray.dz
+    d2 = lx * lx + ly * ly + lz * lz - tca * tca
+    r2 = radius * radius
+    if d2 > r2:
+        return None
+    thc = math.sqrt(r2 - d2)
+    t = tca - thc if tca - thc >= 0.0 else tca + thc
+    return t if t >= 0.0 else None
+
+def ray_footprint(ray, y_low, y_high):
+    # The ground-plane segment the ray covers while it is between y_low and y_high
+    if abs(ray.dy) < 1e-9:
+        t0, t1 = 0.0, camera_far
+    else:
+        t0, t1 = sorted(((y_high - ray.oy) / ray.dy, (y_low - ray.oy) / ray.dy))
+        t0, t1 = max(0.0, t0), max(0.0, min(t1, camera_far))
+    x0, _, z0 = ray_point(ray, t0)
+    x1, _, z1 = ray_point(ray, t1)
+    return x0, z0, x1, z1
+
 class GameState:
     def __init__(self):
         self.game_state = 'MAIN_MENU'
@@ -998,6 +1370,9 @@ class GameState:
 
         self.projectiles = []
         self.tower_slots = []
+        self.slot_index = None
+        # Slot indices holding a tower, kept sorted; towers stay active until destroyed
+        self.occupied_slots = []
 
         self.camera = Camera()
         self.quadric = None
@@ -1006,7 +1381,24 @@ class GameState:
         self.shake_mag = 0.0
         self.shake_freq = 35.0
 
-    def reset(self, start_game = True):
+        self.drawn_count = 0
+        self.culled_count = 0
+        self.text_layer = TextLayer()
+        self.frame_scheduler = FrameScheduler(target_fps)
+        self.sim_lock = threading.Lock()
+        self.sim_thread = None
+        self.command_sink = None
+        self.particles = ParticleSystem()
+        self.alloc_profiler = None
+        self.gc_freeze = gc_freeze_after_load
+        self.fast_forward = FastForward(sim_step)
+        self.map_preloader = MapPreloader()
+
+        # Simulation clock and randomness; anything that affects game outcome reads these
+        self.sim_time = 0.0
+        self.rng = random.Random()
+
+    def reset(self, start_game = True, seed = None):
         self.map = MAPS[self.get_selected_map_name()]
         self.player = Player()
         self.player.money = player_start_money
@@ -1015,7 +1407,10 @@ class GameState:
 
         self.enemies = []
         self.projectiles = []
-        self.tower_slots = [TowerSlot(x, z) for (x, z) in self.map.tower_slots]
+        self.particles = ParticleSystem()
+        self.tower_slots = [TowerSlot(x, z, i) for i, (x, z) in enumerate(self.map.tower_slots)]
+        self.slot_index = slot_index_for(self.map)
+        self.occupied_slots = []
 
         self.camera.distance = self.map.camera_distance
         self.camera.target_x = 0.0
@@ -1023,43 +1418,58 @@ class GameState:
         self.camera.target_z = 0.0
 
         self.last_time = time.perf_counter()
+        self.sim_time = 0.0
+        self.rng = random.Random(seed)
         self.shake_timer = 0.0
         self.shake_mag = 0.0
+        self.fast_forward.reset()
+        if self.gc_freeze:
+            freeze_long_lived_objects()
         if start_game:
             self.game_state = 'PLAYING'
 
     def select_next_map(self):
         self.selected_map_idx = (self.selected_map_idx + 1) % len(self.map_names)
+        self.map_preloader.prioritize(self.get_selected_map_name())
 
     def get_selected_map_name(self):
         return self.map_names[self.selected_map_idx]
 
+    def active_tower_count(self):
+        return len(self.occupied_slots)
+
+    def towers(self):
+        return [self.tower_slots[i].tower for i in self.occupied_slots]
+
     def activate_mega_knight(self):
         if not self.abilities.activate_mega_knight(self):
             print("Not enough money for Mega Knight!")
 
+def freeze_long_lived_objects():
+    # Map presets, slots, compiled waves and module data live for the whole session;
+    # parking them in the permanent generation keeps full collections from rescanning them
+    gc.unfreeze()
+    gc.collect()
+    gc.freeze()
+
 def apply_boss_aoe_to_towers(game, dt):
     #Edi baad
     bosses = [e for e in game.enemies if e.alive and e.is_boss]
-    if not bosses:
+    if not bosses or not game.occupied_slots:
         return
-    for slot in game.tower_slots:
-        if not slot.occupied:
-            continue
-        t = slot.tower
-        for b in bosses:
-            if dist2D(t.x, t.z, b.x, b.z) <= boss_tower_aoe_radius:
-                t.hp -= boss_tower_dps * dt
+    for b in bosses:
+        for i in game.slot_index.query(b.x, b.z, boss_tower_aoe_radius):
+            slot = game.tower_slots[i]
+            if slot.occupied:
+                slot.tower.hp -= boss_tower_dps * dt
 
 def activate_repair_all(game):
-    active_slots = [s for s in game.tower_slots if s.occupied and s.tower and s.tower.active]
-    cost = max(0.0, len(active_slots) * float(tower_cost) - 100.0)
+    cost = max(0.0, game.active_tower_count() * float(tower_cost) - 100.0)
     if game.player.money < cost:
         return False
 
     game.player.money -= cost
-    for s in active_slots:
-        t = s.tower
+    for t in game.towers():
         t.hp = t.max_hp
         t.hp_vis = t.hp 
 
@@ -1068,17 +1478,15 @@ def activate_repair_all(game):
 # Logic
 
 def spawn_enemy(game, speed, health):
-    path_start = game.map.path_points[0]
-    x0 = path_start[0]
-    z0 = path_start[1]
-    game.enemies.append(Enemy(x0, z0, speed, health, is_boss = False))
+    spawn_batch(game, 1, speed, health)
 
 def spawn_boss(game):
-    path_start = game.map.path_points[0]
-    x0 = path_start[0]
-    z0 = path_start[1]
     hp = boss_base_hp + (game.wave.wave_num - 1) * boss_hp_wave_scale
-    game.enemies.append(Enemy(x0, z0, boss_speed, hp, is_boss=True))
+    spawn_batch(game, 1, boss_speed, hp, is_boss = True)
+
+def spawn_batch(game, count, speed, health, is_boss = False):
+    x0, z0 = game.map.path_points[0]
+    game.enemies.extend([Enemy(x0, z0, speed, health, is_boss) for _ in range(count)])
 
 def build_tower_at_slot(game, slot_idx):
     if not (0 <= slot_idx < len(game.tower_slots)):
@@ -1088,9 +1496,16 @@ def build_tower_at_slot(game, slot_idx):
         return False
     slot.occupied = True
     slot.tower = Tower(slot.x, slot.z)
+    bisect.insort(game.occupied_slots, slot_idx)
     game.player.money -= tower_cost
     return True
 
+def destroy_tower_at_slot(game, slot_idx):
+    slot = game.tower_slots[slot_idx]
+    slot.occupied = False
+    slot.tower = None
+    game.occupied_slots.remove(slot_idx)
+
 def activate_fast_attack(game, now):
     if game.player.money < abilitycost_fast:
         return False
@@ -1127,7 +1542,7 @@ def activate_meteor(game):
 
     start_y = 40.0
     spawn_radius_xz = 25.0 
-    random_angle = random.uniform(0, 2 * pi)
+    random_angle = game.rng.uniform(0, 2 * pi)
     
     start_x = target_x + cos(random_angle) * spawn_radius_xz
     start_z = target_z + sin(random_angle) * spawn_radius_xz
@@ -1136,7 +1551,8 @@ def activate_meteor(game):
     return True
 
 def update_game(game, dt):
-    now = time.perf_counter()
+    game.sim_time += dt
+    now = game.sim_time
     game.abilities.update(now, dt)
     game.wave.update(dt, game)
 
@@ -1145,12 +1561,13 @@ def update_game(game, dt):
     update_towers(game, dt)
     update_projectiles(game, dt)
     update_meteors(game, dt)
+    game.particles.update(dt)
 
     if game.shake_timer > 0.0:
         game.shake_timer = max(0.0, game.shake_timer - dt)
 
 def update_enemies(game, dt):
-    now = time.perf_counter()
+    now = game.sim_time
     for e in game.enemies:
         if e.alive:
             e.update_wind_effect(now)
@@ -1211,33 +1628,16 @@ def cast_wind_spell(game, now):
 
     cx, cz = front.x, front.z
 
-    affected = []
-    for enemy in game.enemies:
-        if enemy.alive:
-            d = dist2D(cx, cz, enemy.x, enemy.z)
-            if d <= wind_radius:
-                affected.append((enemy, d))
-
-    if not affected:
+    hits = area_query(game.enemies, cx, cz, wind_radius)
+    if not hits.enemies:
         return None
 
     game.player.money -= wind_ability_cost
-    count = 0
-
-    for enemy, d in affected:
-        push_dx = enemy.x - cx
-        push_dz = enemy.z - cz
-        ndx, ndz = normalize2D(push_dx, push_dz)
-
-        force_multiplier = max(0.2, (wind_radius - d) / wind_radius)
-        actual_push = wind_push_force * force_multiplier
-
-        push_enemy_back(enemy, ndx * actual_push, ndz * actual_push)
-        enemy.apply_wind_effect(now, wind_slow_duration)
-
-        count += 1
+    area_wind(game, hits, cx, cz, now)
+    count = len(hits.enemies)
 
     game.abilities.wind_cooldown_end = now + wind_cooldown
+    game.particles.emit_wind(cx, cz)
 
     return count
 
@@ -1286,18 +1686,136 @@ def push_enemy_back(enemy, push_x, push_z):
                 enemy.path_idx = max(0, i)
                 break
 
-def update_towers(game, dt):
-    for slot in game.tower_slots:
-        if not (slot.occupied and slot.tower.active):
-            continue
+# Area effects. With numpy the distance tests, wind pushes and path checks run as array
+# operations over every hit at once; without it they fall back to the per-enemy loops.
+
+class AreaHits:
+    def __init__(self, index, enemies, x, z, dist):
+        self.index = index
+        self.enemies = enemies
+        self.x = x
+        self.z = z
+        self.dist = dist
+
+def area_query(enemies, cx, cz, radius):
+    # Alive enemies within radius of (cx, cz): list indices, objects, positions and distances
+    if numpy is None:
+        hits = [(i, e, dist2D(cx, cz, e.x, e.z)) for i, e in enumerate(enemies) if e.alive]
+        hits = [h for h in hits if h[2] <= radius]
+        return AreaHits([h[0] for h in hits], [h[1] for h in hits], None, None, [h[2] for h in hits])
+
+    n = len(enemies)
+    xz = numpy.fromiter((c for e in enemies for c in (e.x, e.z)), numpy.float64, 2 * n).reshape(n, 2)
+    alive = numpy.fromiter((e.alive for e in enemies), bool, n)
+    dist = numpy.hypot(xz[:, 0] - cx, xz[:, 1] - cz)
+    index = numpy.flatnonzero(alive & (dist <= radius))
+    return AreaHits(index, [enemies[i] for i in index.tolist()], xz[index, 0], xz[index, 1], dist[index])
+
+def area_damage(game, hits, damage = 0.0, boss_scale = 1.0, kill_minions = False):
+    # Flat damage, then a multiplier on bosses; anything at or below zero (or any minion
+    # when kill_minions is set) dies and pays out. Returns the number killed.
+    if not hits.enemies:
+        return 0
+    if numpy is None:
+        killed = 0
+        for e in hits.enemies:
+            if damage:
+                e.health -= damage
+            if e.is_boss and boss_scale != 1.0:
+                e.health *= boss_scale
+            if e.health <= 0 or (kill_minions and not e.is_boss):
+                e.alive = False
+                game.player.money += (boss_reward if e.is_boss else kill_reward)
+                game.player.score += (50 if e.is_boss else 10)
+                killed += 1
+        return killed
+
+    n = len(hits.enemies)
+    health = numpy.fromiter((e.health for e in hits.enemies), numpy.float64, n)
+    boss = numpy.fromiter((e.is_boss for e in hits.enemies), bool, n)
+    if damage:
+        health = health - damage
+    if boss_scale != 1.0:
+        health = numpy.where(boss, health * boss_scale, health)
+    dead = health <= 0
+    if kill_minions:
+        dead |= ~boss
+    changed = bool(damage) or boss_scale != 1.0
+    for e, h, d in zip(hits.enemies, health.tolist(), dead.tolist()):
+        if changed:
+            e.health = h
+        if d:
+            e.alive = False
+
+    bosses_killed = int((dead & boss).sum())
+    minions_killed = int(dead.sum()) - bosses_killed
+    game.player.money += boss_reward * bosses_killed + kill_reward * minions_killed
+    game.player.score += 50 * bosses_killed + 10 * minions_killed
+    return bosses_killed + minions_killed
+
+path_arrays = {}
+
+def path_arrays_for(map_preset):
+    arrays = path_arrays.get(map_preset.name)
+    if arrays is None:
+        pts = numpy.array(map_preset.path_points, dtype = numpy.float64)
+        a, ab = pts[:-1], pts[1:] - pts[:-1]
+        arrays = path_arrays[map_preset.name] = (pts, a, ab, (ab * ab).sum(axis = 1))
+    return arrays
+
+def area_wind(game, hits, cx, cz, now):
+    # Push every hit away from (cx, cz), falling off with distance, keep only pushes that
+    # stay near the path, then slow them
+    if not hits.enemies:
+        return
+    if numpy is None:
+        for enemy, d in zip(hits.enemies, hits.dist):
+            ndx, ndz = normalize2D(enemy.x - cx, enemy.z - cz)
+            actual_push = wind_push_force * max(0.2, (wind_radius - d) / wind_radius)
+            push_enemy_back(enemy, ndx * actual_push, ndz * actual_push)
+            enemy.apply_wind_effect(now, wind_slow_duration)
+        return
+
+    dx, dz, mag = hits.x - cx, hits.z - cz, hits.dist
+    moving = mag > 1e-6
+    safe = numpy.where(moving, mag, 1.0)
+    push = wind_push_force * numpy.maximum(0.2, (wind_radius - mag) / wind_radius)
+    new_x = hits.x + numpy.where(moving, dx / safe, 0.0) * push
+    new_z = hits.z + numpy.where(moving, dz / safe, 0.0) * push
+
+    # Distance from every pushed position to every path segment, (hits, segments)
+    pts, a, ab, ab_len_sq = path_arrays_for(game.map)
+    apx = new_x[:, None] - a[:, 0]
+    apz = new_z[:, None] - a[:, 1]
+    degenerate = ab_len_sq == 0
+    t = numpy.clip((apx * ab[:, 0] + apz * ab[:, 1]) / numpy.where(degenerate, 1.0, ab_len_sq), 0.0, 1.0)
+    t[:, degenerate] = 0.0
+    seg_dist = numpy.hypot(a[:, 0] + t * ab[:, 0] - new_x[:, None], a[:, 1] + t * ab[:, 1] - new_z[:, None])
+    accepted = seg_dist.min(axis = 1) <= game.map.path_width * 2
+
+    # First waypoint that is no farther than the one after it becomes the new path index
+    point_dist = numpy.hypot(pts[:, 0] - new_x[:, None], pts[:, 1] - new_z[:, None])
+    closer = point_dist[:, :-1] <= point_dist[:, 1:]
+    reindex = accepted & closer.any(axis = 1)
+    first = closer.argmax(axis = 1)
+
+    for enemy, ok, x, z, re, idx in zip(hits.enemies, accepted.tolist(), new_x.tolist(), new_z.tolist(),
+                                        reindex.tolist(), first.tolist()):
+        if ok:
+            enemy.x = x
+            enemy.z = z
+            if re:
+                enemy.path_idx = idx
+        enemy.apply_wind_effect(now, wind_slow_duration)
 
-        t = slot.tower
+def update_towers(game, dt):
+    for slot_idx in list(game.occupied_slots):
+        t = game.tower_slots[slot_idx].tower
 
         t.hp -= dt * TOWER_DECAY_RATE
         t.hp = clamp(t.hp, 0.0, t.max_hp)
         if t.hp <= 0.0:
-            slot.occupied = False
-            slot.tower = None
+            destroy_tower_at_slot(game, slot_idx)
             continue
 
         k = 1.0 - math.exp(-dt / HPBAR_LAG_SEC)
@@ -1347,6 +1865,7 @@ def update_projectiles(game, dt):
             p.alive = False
             
             if p.explosive:
+                game.particles.emit_explosion(p.x, p.y, p.z)
                 for e in game.enemies:
                     if e.alive and dist2D(p.x, p.z, e.x, e.z) <= p.explosion_radius:
                         e.health -= p.damage
@@ -1373,18 +1892,9 @@ def update_meteors(game, dt):
             if m.alive:
                 remaining.append(m)
                 continue
-            for e in game.enemies:
-                if e.alive:
-                    if e.is_boss:
-                        e.health *= 0.5
-                        if e.health <= 0:
-                            e.alive = False
-                            game.player.money += boss_reward
-                            game.player.score += 50
-                    else:
-                        e.alive = False
-                        game.player.money += kill_reward
-                        game.player.score += 10
+            game.particles.emit_meteor_impact(m.x, m.z)
+            hits = area_query(game.enemies, m.x, m.z, meteor_aoe_radius)
+            area_damage(game, hits, boss_scale = 0.5, kill_minions = True)
     game.abilities.meteors = remaining
 
 
@@ -1408,59 +1918,90 @@ def draw_text_2d(x, y, s):
     glMatrixMode(GL_PROJECTION)
     glPopMatrix()
 
-def draw_sky_walls():
-    sx, _, sz = G.map.ground_scale
-    x = sx * 0.5 + 50.0
-    z = sz * 0.5 + 50.0
-    y_bottom = -100.0
-
-    y_top = sky_wall_height
-    r, g, b = sky_color
+def draw_text_lines(lines):
+    glMatrixMode(GL_PROJECTION)
+    glPushMatrix()
+    glLoadIdentity()
+    gluOrtho2D(0, WIDTH, 0, HEIGHT)
+    glMatrixMode(GL_MODELVIEW)
+    glPushMatrix()
+    glLoadIdentity()
 
-    glColor3f(r, g, b)
+    for x, y, color, s in lines:
+        glColor3f(*color)
+        glRasterPos2f(x, y)
+        for ch in s:
+            glutBitmapCharacter(GLUT_BITMAP_HELVETICA_18, ord(ch))
 
-    glBegin(GL_QUADS); glVertex3f(-x,y_bottom,z)
+    glMatrixMode(GL_MODELVIEW)
+    glPopMatrix()
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
 
-    glVertex3f(x,y_bottom,z)
-    glVertex3f(x,y_top,z)
-    glVertex3f(-x,y_top,z)
+class TextLayer:
+    # Text blocks compiled into display lists, recompiled only when their key changes
+    def __init__(self):
+        self.lists = {}
 
-    glEnd()
-    glBegin(GL_QUADS)
+    def draw(self, name, key, build_lines):
+        entry = self.lists.get(name)
+        if entry and entry[0] == key:
+            glCallList(entry[1])
+            return
 
-    glVertex3f(-x,y_bottom,z)
-    glVertex3f(x,y_bottom,z)
-    glVertex3f(x,y_bottom,-z)
-    glVertex3f(-x,y_bottom,-z)
+        list_id = entry[1] if entry else glGenLists(1)
+        glNewList(list_id, GL_COMPILE_AND_EXECUTE)
+        draw_text_lines(build_lines())
+        glEndList()
+        self.lists[name] = (key, list_id)
 
-    glEnd()
-    glBegin(GL_QUADS)
+    def release(self):
+        for _, list_id in self.lists.values():
+            glDeleteLists(list_id, 1)
+        self.lists = {}
 
-    glVertex3f(x,y_bottom,-z)
-    glVertex3f(-x,y_bottom,-z)
-    glVertex3f(-x,y_top,-z)
-    glVertex3f(x,y_top,-z)
+def sky_wall_quads(map_preset):
+    sx, _, sz = map_preset.ground_scale
+    x = sx * 0.5 + 50.0
+    z = sz * 0.5 + 50.0
+    y_bottom = -100.0
+    y_top = sky_wall_height
+    return [
+        ((-x, y_bottom, z), (x, y_bottom, z), (x, y_top, z), (-x, y_top, z)),
+        ((-x, y_bottom, z), (x, y_bottom, z), (x, y_bottom, -z), (-x, y_bottom, -z)),
+        ((x, y_bottom, -z), (-x, y_bottom, -z), (-x, y_top, -z), (x, y_top, -z)),
+        ((x, y_bottom, -z), (x, y_bottom, z), (x, y_top, z), (x, y_top, -z)),
+        ((-x, y_bottom, z), (-x, y_bottom, -z), (-x, y_top, -z), (-x, y_top, z)),
+    ]
+
+def path_quads(map_preset):
+    pts = map_preset.path_points
+    width = map_preset.path_width
+    y = ground_y + 0.01
+    quads = []
+    for i in range(len(pts) - 1):
+        x0, z0 = pts[i]
+        x1, z1 = pts[i + 1]
+        nx, nz = normalize2D(-(z1-z0), (x1-x0))
+        wx = nx * width * 0.5
+        wz = nz * width * 0.5
+        quads.append(((x0 - wx, y, z0 - wz), (x0 + wx, y, z0 + wz), (x1 + wx, y, z1 + wz), (x1 - wx, y, z1 - wz)))
+    return quads
 
-    glEnd()
+def draw_quads(quads):
     glBegin(GL_QUADS)
-    
-    glVertex3f(x,y_bottom,-z)
-    glVertex3f(x,y_bottom,z)
-    glVertex3f(x,y_top,z)
-    glVertex3f(x,y_top,-z)
-    
+    for quad in quads:
+        for v in quad:
+            glVertex3f(v[0], v[1], v[2])
     glEnd()
-    glBegin(GL_QUADS)
-
-    glVertex3f(-x,y_bottom,z)
-    glVertex3f(-x,y_bottom,-z)
-    glVertex3f(-x,y_top,-z)
-    glVertex3f(-x,y_top,z)
 
-    glEnd()
+def draw_sky_walls(map_preset = None):
+    r, g, b = sky_color
+    glColor3f(r, g, b)
+    draw_quads(sky_wall_quads(map_preset or G.map))
 
-def draw_ground():
-    sx, sy, sz = G.map.ground_scale
+def draw_ground(map_preset = None):
+    sx, sy, sz = (map_preset or G.map).ground_scale
 
     glPushMatrix()
 
@@ -1471,33 +2012,12 @@ def draw_ground():
 
     glPopMatrix()
 
-def draw_path():
+def draw_path(map_preset = None):
     glColor3f(0.85, 0.80, 0.70)
-    pts = G.map.path_points
-    width = G.map.path_width
-
-    for i in range(len(pts) - 1):
-        x0 = pts[i][0]
-        z0 = pts[i][1]
-        x1 = pts[i+1][0]
-        z1 = pts[i+1][1]
-
-        nx, nz = normalize2D(-(z1-z0), (x1-x0))
-        wx = nx * width * 0.5
-        wz = nz * width * 0.5
-        y = ground_y + 0.01
-
-        glBegin(GL_QUADS)
+    draw_quads(path_quads(map_preset or G.map))
 
-        glVertex3f(x0 - wx, y, z0 - wz)
-        glVertex3f(x0 + wx, y, z0 + wz)
-        glVertex3f(x1 + wx, y, z1 + wz)
-        glVertex3f(x1 - wx, y, z1 - wz)
-
-        glEnd()
-
-def draw_base():
-    base_coords = G.map.path_points[-1]
+def draw_base(map_preset = None):
+    base_coords = (map_preset or G.map).path_points[-1]
     base_x = base_coords[0]
     base_z = base_coords[1]
 
@@ -1510,6 +2030,94 @@ def draw_base():
 
     glPopMatrix()
 
+class MapBake:
+    # CPU-side work for one map: spatial index, path arrays, early waves and static geometry
+    def __init__(self, map_preset):
+        self.map = map_preset
+        self.slot_index = slot_index_for(map_preset)
+        if numpy is not None:
+            path_arrays_for(map_preset)
+        for wave_num in range(1, map_preload_waves + 1):
+            compile_wave(wave_definition, wave_num)
+        self.sky_quads = sky_wall_quads(map_preset)
+        self.path_quads = path_quads(map_preset)
+
+def compile_static_map(bake):
+    list_id = glGenLists(1)
+    glNewList(list_id, GL_COMPILE)
+    r, g, b = sky_color
+    glColor3f(r, g, b)
+    draw_quads(bake.sky_quads)
+    draw_ground(bake.map)
+    glColor3f(0.85, 0.80, 0.70)
+    draw_quads(bake.path_quads)
+    draw_base(bake.map)
+    glEndList()
+    return list_id
+
+class MapPreloader:
+    # A worker thread bakes maps (selected one first); pump() runs on the GL thread and
+    # turns finished bakes into display lists without exceeding its time budget
+    def __init__(self):
+        self.bakes = {}
+        self.lists = {}
+        self.queue = collections.deque()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self, names):
+        with self.lock:
+            self.queue.extend(n for n in dict.fromkeys(names) if n not in self.bakes and n not in self.queue)
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target = self.run, name = 'map-preload', daemon = True)
+            self.thread.start()
+
+    def prioritize(self, name):
+        with self.lock:
+            if name in self.queue:
+                self.queue.remove(name)
+                self.queue.appendleft(name)
+
+    def run(self):
+        while True:
+            with self.lock:
+                if not self.queue:
+                    return
+                name = self.queue.popleft()
+            self.bakes[name] = MapBake(MAPS[name])
+
+    def pump(self, budget, first = None):
+        # Returns True while baked maps are still waiting for an upload
+        start = time.perf_counter()
+        names = [n for n in list(self.bakes) if n not in self.lists]
+        if first in names:
+            names.remove(first)
+            names.insert(0, first)
+        for i, name in enumerate(names):
+            if i and time.perf_counter() - start > budget:
+                return True
+            self.lists[name] = compile_static_map(self.bakes[name])
+        return False
+
+    def draw(self, map_preset):
+        list_id = self.lists.get(map_preset.name)
+        if list_id is None:
+            return False
+        glCallList(list_id)
+        return True
+
+    def release(self):
+        for list_id in self.lists.values():
+            glDeleteLists(list_id, 1)
+        self.lists = {}
+
+def draw_static_map(map_preset):
+    if not G.map_preloader.draw(map_preset):
+        draw_sky_walls()
+        draw_ground()
+        draw_path()
+        draw_base()
+
 def draw_tower_slot(slot):
     glPushMatrix()
 
@@ -1520,7 +2128,7 @@ def draw_tower_slot(slot):
 
     glPopMatrix()
 
-def draw_tower(t, quadric):
+def draw_tower(t, quadric, lod = 0):
     glPushMatrix()
 
     glTranslatef(t.x, t.y, t.z)
@@ -1541,14 +2149,14 @@ def draw_tower(t, quadric):
     glRotatef(-90, 1, 0, 0)
     glColor3f(*col_base)
 
-    gluCylinder(quadric, 0.25, 0.25, 1.0, 18, 1)
+    gluCylinder(quadric, 0.25, 0.25, 1.0, lod_detail(18, 1, lod)[0], 1)
     glPopMatrix()
 
     glPushMatrix()
     glTranslatef(0.0, 1.1, 0.0)
     glRotatef(-90, 1, 0, 0)
     glColor3f(*col_barrel)
-    gluCylinder(quadric, 0.1, 0.1, 0.6, 16, 1)
+    gluCylinder(quadric, 0.1, 0.1, 0.6, lod_detail(16, 1, lod)[0], 1)
     glPopMatrix()
 
     glPushMatrix()
@@ -1562,35 +2170,41 @@ def draw_tower(t, quadric):
     glTranslatef(0.0, 1.25 + bob, 0.0)
     glColor3f(*col_core)
     core_r = 0.20 + 0.03 * pulse
-    gluSphere(quadric, core_r, sphere_slices, sphere_stacks)
+    slices, stacks = lod_detail(sphere_slices, sphere_stacks, lod)
+    gluSphere(quadric, core_r, slices, stacks)
     glPopMatrix()
 
+    if lod >= 2:
+        glPopMatrix()
+        return
+
     ring_y = 1.25 + bob
     ring_r = 0.65
     ring_n = 12
     angle_step = 360.0 / ring_n
     spin = (now * 60.0) % 360.0 
 
-    glPushMatrix()
+    if lod == 0:
+        glPushMatrix()
 
-    glRotatef(-t.rotate_degree, 0, 1, 0)
+        glRotatef(-t.rotate_degree, 0, 1, 0)
 
-    glTranslatef(0.0, ring_y, 0.0)
-    glRotatef(spin, 0, 1, 0)
+        glTranslatef(0.0, ring_y, 0.0)
+        glRotatef(spin, 0, 1, 0)
 
-    for i in range(ring_n):
-        wobble = 0.01 * math.sin(now * 4.0 + i)
-        glPushMatrix()
+        for i in range(ring_n):
+            wobble = 0.01 * math.sin(now * 4.0 + i)
+            glPushMatrix()
 
-        glRotatef(angle_step * i, 0, 1, 0)
-        glTranslatef(0.0, wobble, ring_r)
-        glColor3f(0.65, 0.85, 1.00)
-        glScalef(0.14, 0.06, 0.28)
-        glutSolidCube(1.0)
+            glRotatef(angle_step * i, 0, 1, 0)
+            glTranslatef(0.0, wobble, ring_r)
+            glColor3f(0.65, 0.85, 1.00)
+            glScalef(0.14, 0.06, 0.28)
+            glutSolidCube(1.0)
 
-        glPopMatrix()
+            glPopMatrix()
 
-    glPopMatrix()
+        glPopMatrix()
 
     ratio = clamp(t.hp_vis / t.max_hp, 0.0, 1.0)
     bar_w = HPBAR_WIDTH
@@ -1629,14 +2243,15 @@ def draw_tower(t, quadric):
     glPopMatrix()
     glPopMatrix()
 
-def draw_enemy(e, quadric):
+def draw_enemy(e, quadric, lod = 0):
     glPushMatrix()
     
     if e.is_boss:
         glTranslatef(e.x, e.y, e.z) 
 
         glColor3f(0.3, 0.0, 0.4) 
-        gluSphere(quadric, e.radius, sphere_slices, sphere_stacks)
+        slices, stacks = lod_detail(sphere_slices, sphere_stacks, lod)
+        gluSphere(quadric, e.radius, slices, stacks)
 
         num_spikes = 8
         spike_length = e.radius * 1.5
@@ -1650,7 +2265,7 @@ def draw_enemy(e, quadric):
             glRotatef(angle_x, 1, 0, 0) 
             
             glColor3f(0.8, 0.2, 0.8)
-            gluCylinder(quadric, spike_base_radius, 0, spike_length, 8, 1) 
+            gluCylinder(quadric, spike_base_radius, 0, spike_length, lod_detail(8, 1, lod)[0], 1) 
 
             glPopMatrix()
             
@@ -1658,7 +2273,7 @@ def draw_enemy(e, quadric):
         glPushMatrix()
         glRotatef(-90, 1, 0, 0)
         glColor3f(0.9, 0.4, 0.9)
-        gluCylinder(quadric, spike_base_radius * 1.2, 0, spike_length * 1.2, 8, 1)
+        gluCylinder(quadric, spike_base_radius * 1.2, 0, spike_length * 1.2, lod_detail(8, 1, lod)[0], 1)
         glPopMatrix()
 
         # Core
@@ -1669,7 +2284,7 @@ def draw_enemy(e, quadric):
         glTranslatef(0, e.radius * 0.4, 0) 
         glColor3f(1.0, 0.1, 0.1)
         glScalef(pulse_scale, pulse_scale, pulse_scale)
-        gluSphere(quadric, e.radius * 0.3, 12, 10)
+        gluSphere(quadric, e.radius * 0.3, *lod_detail(12, 10, lod))
 
         glPopMatrix()
         
@@ -1685,16 +2300,17 @@ def draw_enemy(e, quadric):
         glTranslatef(e.x, ground_y + body_radius, e.z)
 
         glColor3f(0.2, 0.7, 0.9)
-        gluSphere(quadric, body_radius, 10, 8)
+        slices, stacks = lod_detail(10, 8, lod)
+        gluSphere(quadric, body_radius, slices, stacks)
         
         # Draw head
         glTranslatef(0, body_radius + head_radius * 0.8, 0)
-        gluSphere(quadric, head_radius, 10, 8)
+        gluSphere(quadric, head_radius, slices, stacks)
         glPopMatrix()
 
     glPopMatrix()
 
-def draw_projectile(p, quadric):
+def draw_projectile(p, quadric, lod = 0):
     glPushMatrix()
 
     glTranslatef(p.x, p.y, p.z)
@@ -1709,19 +2325,33 @@ def draw_projectile(p, quadric):
         r, g, b = normal_bullet_color
     glColor3f(r, g, b)
 
-    gluSphere(quadric, p.radius, 10, 10)
+    gluSphere(quadric, p.radius, *lod_detail(10, 10, lod))
 
     glPopMatrix()
 
-def draw_meteor(m, quadric):
+def draw_meteor(m, quadric, lod = 0):
     glPushMatrix()
 
     glTranslatef(m.x, m.y, m.z)
     glColor3f(0.9, 0.3, 0.3)
-    gluSphere(quadric, m.radius, 14, 10)
+    gluSphere(quadric, m.radius, *lod_detail(14, 10, lod))
 
     glPopMatrix()
 
+def draw_particles(batches):
+    if not batches:
+        return
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
+    for point_size, positions, colors in batches:
+        glPointSize(point_size)
+        glVertexPointer(3, GL_FLOAT, 0, positions)
+        glColorPointer(3, GL_FLOAT, 0, colors)
+        glDrawArrays(GL_POINTS, 0, len(positions))
+    glDisableClientState(GL_COLOR_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+    glPointSize(1.0)
+
 def draw_overlay():
     glMatrixMode(GL_PROJECTION)
 
@@ -1750,38 +2380,212 @@ def draw_overlay():
 
 def draw_main_menu():
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-    glColor3f(1.0, 1.0, 1.0)
-    draw_text_2d(WIDTH / 2 - 100, HEIGHT - 100, "3D TOWER DEFENSE")
-    draw_text_2d(WIDTH / 2 - 150, HEIGHT - 200, f"Selected Map: {G.get_selected_map_name()}")
-    draw_text_2d(WIDTH / 2 - 150, HEIGHT - 250, "[S] Start Game")
-    draw_text_2d(WIDTH / 2 - 150, HEIGHT - 300, "[M] Change Map")
-    draw_text_2d(WIDTH / 2 - 150, HEIGHT - 350, "[Q] Quit")
+    white = (1.0, 1.0, 1.0)
+    map_name = G.get_selected_map_name()
+    G.text_layer.draw('main_menu', map_name, lambda: [
+        (WIDTH / 2 - 100, HEIGHT - 100, white, "3D TOWER DEFENSE"),
+        (WIDTH / 2 - 150, HEIGHT - 200, white, f"Selected Map: {map_name}"),
+        (WIDTH / 2 - 150, HEIGHT - 250, white, "[S] Start Game"),
+        (WIDTH / 2 - 150, HEIGHT - 300, white, "[M] Change Map"),
+        (WIDTH / 2 - 150, HEIGHT - 350, white, "[Q] Quit"),
+    ])
 
 def draw_pause_menu():
     draw_overlay()
-    glColor3f(1.0, 1.0, 1.0)
-    draw_text_2d(WIDTH / 2 - 50, HEIGHT - 200, "PAUSED")
-    draw_text_2d(WIDTH / 2 - 100, HEIGHT - 250, "[P] Resume Game")
-    draw_text_2d(WIDTH / 2 - 100, HEIGHT - 300, "[R] Restart")
-    draw_text_2d(WIDTH / 2 - 100, HEIGHT - 350, "[T] Return to Main Menu")
-    draw_text_2d(WIDTH / 2 - 100, HEIGHT - 400, "[Q] Quit")
+    white = (1.0, 1.0, 1.0)
+    G.text_layer.draw('pause_menu', None, lambda: [
+        (WIDTH / 2 - 50, HEIGHT - 200, white, "PAUSED"),
+        (WIDTH / 2 - 100, HEIGHT - 250, white, "[P] Resume Game"),
+        (WIDTH / 2 - 100, HEIGHT - 300, white, "[R] Restart"),
+        (WIDTH / 2 - 100, HEIGHT - 350, white, "[T] Return to Main Menu"),
+        (WIDTH / 2 - 100, HEIGHT - 400, white, "[Q] Quit"),
+    ])
 
 def draw_game_over_screen():
     draw_overlay()
-    glColor3f(1.0, 0.2, 0.2)
-    draw_text_2d(WIDTH / 2 - 70, HEIGHT - 200, "GAME OVER")
-    glColor3f(1.0, 1.0, 1.0)
-    draw_text_2d(WIDTH / 2 - 100, HEIGHT - 250, f"Final Score: {G.player.score}")
-    draw_text_2d(WIDTH / 2 - 100, HEIGHT - 300, "[R] Restart")
-    draw_text_2d(WIDTH / 2 - 100, HEIGHT - 350, "[T] Return to Main Menu")
+    white = (1.0, 1.0, 1.0)
+    score = G.player.score
+    G.text_layer.draw('game_over', score, lambda: [
+        (WIDTH / 2 - 70, HEIGHT - 200, (1.0, 0.2, 0.2), "GAME OVER"),
+        (WIDTH / 2 - 100, HEIGHT - 250, white, f"Final Score: {score}"),
+        (WIDTH / 2 - 100, HEIGHT - 300, white, "[R] Restart"),
+        (WIDTH / 2 - 100, HEIGHT - 350, white, "[T] Return to Main Menu"),
+    ])
+
+def build_hud_lines(hud):
+    black = (0.0, 0.0, 0.0)
+    wind_status = "Ready" if hud.wind_ready_in <= 0.0 else f"{hud.wind_ready_in:.1f}s"
+    speed = "Max" if hud.speed == 0 else f"{hud.speed}x"
+    lines = [
+        (10, HEIGHT - 24, black, f"Health: {hud.health}   Money: {hud.money}   Score: {hud.score}   Wave: {hud.wave_num}   Map: {hud.map_name}"),
+        (10, HEIGHT - 48, black, f"[P] Pause | [1-0] Build | F: FireRate+ {abilitycost_fast} | E: Explosive {abilitycost_explosive}"),
+        (10, HEIGHT - 96, black, f"M: Meteor {abilitycost_meteor} | G: MegaKnight {abilitycost_mega_knight} | W: Wind {wind_ability_cost} ({wind_status}) | R: Repair {hud.repair_cost} | Arrows: Camera"),
+        (10, HEIGHT - 120, black, f"X: Speed {speed} | N: Skip to next wave"),
+    ]
+
+    if hud.mk_state is not None:
+        if hud.mk_state == 'FIGHTING':
+            info = f"MK Active: {hud.mk_timer:.1f}s remaining"
+        elif hud.mk_state == 'EXITING_WALK':
+            info = "Mega Knight is walking to the edge..."
+        elif hud.mk_state == 'EXITING_CHARGE':
+            info = "Mega Knight is preparing to leave!"
+        elif hud.mk_state == 'EXITING_JUMP':
+            info = "Mega Knight is leaving the arena!"
+        else:
+            info = ""
+        if info:
+            lines.append((10, HEIGHT - 72, black, info))
+    else:
+        lines.append((10, HEIGHT - 72, black, f"Mega Knight Cost: {abilitycost_mega_knight} | [G] to Summon"))
+    return lines
 
 
-G = GameState()
-def draw_game_world():
+tower_bounding_radius = 1.9
+
+def bounding_sphere(obj, obj_type):
+    if obj_type == 'tower':
+        return (obj.x, obj.y + 1.25, obj.z, tower_bounding_radius)
+    if obj_type == 'enemy':
+        return (obj.x, obj.y, obj.z, obj.radius * 2.5)
+    if obj_type == 'megaknight':
+        return (obj.x, obj.y + obj.radius, obj.z, obj.radius * 2.5)
+    return (obj.x, obj.y, obj.z, obj.radius)
+
+Pick = collections.namedtuple('Pick', 'kind target distance x y z')
+
+def pick(game, mx, my, width = None, height = None):
+    # CPU ray cast from the camera: nearest enemy, tower or slot under the cursor, else the
+    # ground point. Slots and towers come from the slot grid, enemies from a footprint test.
+    ray = game.camera.ray(mx, my, width or WIDTH, height or HEIGHT)
+    x0, z0, x1, z1 = ray_footprint(ray, ground_y, pick_height)
+    best = None
+
+    for i in game.slot_index.query_segment(x0, z0, x1, z1, max(tower_bounding_radius, pick_slot_radius)):
+        slot = game.tower_slots[i]
+        if slot.occupied:
+            cx, cy, cz, r = bounding_sphere(slot.tower, 'tower')
+            kind, target = 'tower', slot.tower
+        else:
+            cx, cy, cz, r = slot.x, ground_y + 0.05, slot.z, pick_slot_radius
+            kind, target = 'slot', i
+        t = ray_sphere(ray, cx, cy, cz, r)
+        if t is not None and (best is None or t < best[0]):
+            best = (t, kind, target)
+
+    for e in enemies_near_segment(game.enemies, x0, z0, x1, z1):
+        t = ray_sphere(ray, e.x, e.y, e.z, e.radius * pick_enemy_scale)
+        if t is not None and (best is None or t < best[0]):
+            best = (t, 'enemy', e)
+
+    if best is not None:
+        return Pick(best[1], best[2], best[0], *ray_point(ray, best[0]))
+    t = ray_plane_y(ray, ground_y)
+    if t is None:
+        return None
+    return Pick('ground', None, t, *ray_point(ray, t))
+
+def enemies_near_segment(enemies, x0, z0, x1, z1):
+    # Broad phase: alive enemies whose pick radius reaches the ray's ground footprint
+    if numpy is None:
+        return [e for e in enemies if e.alive and
+                point_to_segment_distance(e.x, e.z, x0, z0, x1, z1) <= e.radius * pick_enemy_scale]
+    n = len(enemies)
+    if n == 0:
+        return []
+    xz = numpy.fromiter((c for e in enemies for c in (e.x, e.z)), numpy.float64, 2 * n).reshape(n, 2)
+    reach = numpy.fromiter((e.radius if e.alive else -1.0 for e in enemies), numpy.float64, n) * pick_enemy_scale
+    abx, abz = x1 - x0, z1 - z0
+    ab_len_sq = abx * abx + abz * abz
+    if ab_len_sq == 0.0:
+        t = numpy.zeros(n)
+    else:
+        t = numpy.clip(((xz[:, 0] - x0) * abx + (xz[:, 1] - z0) * abz) / ab_len_sq, 0.0, 1.0)
+    dist = numpy.hypot(x0 + t * abx - xz[:, 0], z0 + t * abz - xz[:, 1])
+    return [enemies[i] for i in numpy.flatnonzero(dist <= reach).tolist()]
+
+# Everything draw_game_world reads from the simulation. A live scene references the
+# game objects directly, a snapshot holds immutable views that are safe to read while
+# the simulation thread keeps ticking.
+Scene = collections.namedtuple('Scene', 'slots towers enemies projectiles meteors mega_knight particles hud shake_timer shake_mag')
+HudView = collections.namedtuple('HudView', 'health money score wave_num map_name repair_cost wind_ready_in mk_state mk_timer speed')
+TowerView = collections.namedtuple('TowerView', 'x y z rotate_degree hp_vis max_hp')
+EnemyView = collections.namedtuple('EnemyView', 'x y z radius is_boss phase')
+ProjectileView = collections.namedtuple('ProjectileView', 'x y z radius explosive fast')
+MeteorView = collections.namedtuple('MeteorView', 'x y z radius')
+MegaKnightView = collections.namedtuple('MegaKnightView', 'x y z radius rotate_degree alive')
+
+def hud_view(game):
+    repair_cost = max(0.0, game.active_tower_count() * float(tower_cost) - 100.0)
+    wind_ready_in = max(0.0, game.abilities.wind_cooldown_end - game.sim_time)
+
+    mk = game.abilities.mega_knight
+    mk_alive = bool(mk and mk.alive)
+    # Timers are bucketed to what the HUD prints so the view doubles as the text cache key
+    return HudView(game.player.health, game.player.money, game.player.score, game.wave.wave_num,
+                   game.map.name, int(repair_cost), round(wind_ready_in, 1),
+                   mk.state if mk_alive else None, round(mk.timer, 1) if mk_alive else 0.0,
+                   game.fast_forward.speed)
+
+def live_scene(game):
+    mk = game.abilities.mega_knight
+    return Scene(game.tower_slots, game.towers(), game.enemies,
+                 game.projectiles, game.abilities.meteors, mk if mk and mk.alive else None,
+                 game.particles.batches(), hud_view(game), game.shake_timer, game.shake_mag)
+
+def snapshot_scene(game):
+    mk = game.abilities.mega_knight
+    mk_view = None
+    if mk and mk.alive:
+        mk_view = MegaKnightView(mk.x, mk.y, mk.z, mk.radius, mk.rotate_degree, True)
+    return Scene(
+        tuple(game.tower_slots),
+        tuple(TowerView(t.x, t.y, t.z, t.rotate_degree, t.hp_vis, t.max_hp)
+              for t in game.towers()),
+        tuple(EnemyView(e.x, e.y, e.z, e.radius, e.is_boss, e.phase) for e in game.enemies),
+        tuple(ProjectileView(p.x, p.y, p.z, p.radius, p.explosive, p.fast) for p in game.projectiles),
+        tuple(MeteorView(m.x, m.y, m.z, m.radius) for m in game.abilities.meteors),
+        mk_view, game.particles.batches(copy = True), hud_view(game), game.shake_timer, game.shake_mag)
+
+def collect_visible(scene, frustum, eye):
+    ex, ey, ez = eye
+    visible = []
+    culled = 0
+
+    def add_visible(obj, obj_type):
+        nonlocal culled
+        cx, cy, cz, r = bounding_sphere(obj, obj_type)
+        if frustum and not frustum.sphere_visible(cx, cy, cz, r + frustum_margin):
+            culled += 1
+            return
+        dist_sq = (obj.x - ex)**2 + (obj.y - ey)**2 + (obj.z - ez)**2
+        visible.append({'obj': obj, 'type' : obj_type, 'dist' : dist_sq})
+
+    for t in scene.towers:
+        add_visible(t, 'tower')
+    for e in scene.enemies:
+        add_visible(e, 'enemy')
+    for p in scene.projectiles:
+        add_visible(p, 'projectile')
+    for m in scene.meteors:
+        add_visible(m, 'meteor')
+    if scene.mega_knight:
+        add_visible(scene.mega_knight, 'megaknight')
+
+    visible.sort(key = lambda item: item['dist'], reverse = True)
+    return visible, culled
+
+def current_scene():
+    if G.sim_thread:
+        return G.sim_thread.front()
+    return live_scene(G)
+
+
+def draw_game_world(scene):
     glViewport(0, 0, WIDTH, HEIGHT)
     glMatrixMode(GL_PROJECTION)
     glLoadIdentity()
-    gluPerspective(60.0, WIDTH / float(HEIGHT), 0.1, 300.0)
+    gluPerspective(camera_fovy, WIDTH / float(HEIGHT), camera_near, camera_far)
     glMatrixMode(GL_MODELVIEW)
     glLoadIdentity()
     
@@ -1790,111 +2594,388 @@ def draw_game_world():
     ey = eye_pos[1]
     ez = eye_pos[2]
     gluLookAt(ex, ey, ez, G.camera.target_x, G.camera.target_y, G.camera.target_z, 0, 1, 0)
-    apply_screen_shake()
+    apply_screen_shake(scene)
 
-    draw_sky_walls()
-    draw_ground()
-    draw_path()
-    draw_base()
-    for slot in G.tower_slots:
-        draw_tower_slot(slot)
+    draw_static_map(G.map)
 
-    def dist_sq_to_cam(obj):
-        return (obj.x - ex)**2 + (obj.y - ey)**2 + (obj.z - ez)**2
+    frustum = G.camera.frustum(WIDTH / float(HEIGHT)) if frustum_culling else None
+    G.drawn_count = 0
+    G.culled_count = 0
 
-    dynamic_objects = []
+    for slot in scene.slots:
+        if frustum and not frustum.sphere_visible(slot.x, ground_y, slot.z, 0.7 + frustum_margin):
+            G.culled_count += 1
+            continue
+        G.drawn_count += 1
+        draw_tower_slot(slot)
 
-    for slot in G.tower_slots:
-        if slot.occupied:
-            dynamic_objects.append({'obj': slot.tower, 'type' : 'tower', 'dist' : dist_sq_to_cam(slot.tower)})
-    for e in G.enemies:
-        dynamic_objects.append({'obj': e, 'type' : 'enemy', 'dist' : dist_sq_to_cam(e)})
-    for p in G.projectiles:
-        dynamic_objects.append({'obj': p, 'type' : 'projectile', 'dist' : dist_sq_to_cam(p)})
-    for m in G.abilities.meteors:
-        dynamic_objects.append({'obj': m, 'type' : 'meteor', 'dist' : dist_sq_to_cam(m)})
-    if G.abilities.mega_knight and G.abilities.mega_knight.alive:
-        dynamic_objects.append({'obj': G.abilities.mega_knight, 'type' : 'megaknight', 'dist' : dist_sq_to_cam(G.abilities.mega_knight)})
-
-    dynamic_objects.sort(key = lambda item: item['dist'], reverse = True)
+    dynamic_objects, culled = collect_visible(scene, frustum, eye_pos)
+    G.culled_count += culled
+    G.drawn_count += len(dynamic_objects)
 
     for item in dynamic_objects:
         obj_type = item['type']
         obj = item['obj']
-        if obj_type == 'tower': draw_tower(obj, G.quadric)
-        elif obj_type == 'enemy': draw_enemy(obj, G.quadric)
-        elif obj_type == 'projectile': draw_projectile(obj, G.quadric)
-        elif obj_type == 'meteor': draw_meteor(obj, G.quadric)
-        elif obj_type == 'megaknight': obj.draw(G.quadric)
+        lod = lod_for_distance(sqrt(item['dist']))
+        if obj_type == 'tower': draw_tower(obj, G.quadric, lod)
+        elif obj_type == 'enemy': draw_enemy(obj, G.quadric, lod)
+        elif obj_type == 'projectile': draw_projectile(obj, G.quadric, lod)
+        elif obj_type == 'meteor': draw_meteor(obj, G.quadric, lod)
+        elif obj_type == 'megaknight': draw_mega_knight(obj, G.quadric, lod)
 
-    glColor3f(0.0, 0.0, 0.0)
-    draw_text_2d(10, HEIGHT - 24, f"Health: {G.player.health}   Money: {G.player.money}   Score: {G.player.score}   Wave: {G.wave.wave_num}   Map: {G.map.name}")
-
-    active_slots_count = sum(1 for s in G.tower_slots if s.occupied and s.tower and s.tower.active)
-    repair_cost = max(0.0, active_slots_count * float(tower_cost) - 100.0)
-    draw_text_2d(10, HEIGHT - 48, f"[P] Pause | [1-0] Build | F: FireRate+ {abilitycost_fast} | E: Explosive {abilitycost_explosive}")
-    now_overlay = time.perf_counter()
-    wind_ready_in = max(0.0, G.abilities.wind_cooldown_end - now_overlay)
-    wind_status = "Ready" if wind_ready_in <= 0.0 else f"{wind_ready_in:.1f}s"
-    draw_text_2d(10, HEIGHT - 96, f"M: Meteor {abilitycost_meteor} | G: MegaKnight {abilitycost_mega_knight} | W: Wind {wind_ability_cost} | R: Repair {int(repair_cost)} | Arrows: Camera")
+    draw_particles(scene.particles)
 
-    mk = G.abilities.mega_knight
-    if mk and mk.alive:
-        if mk.state == 'FIGHTING':
-            info = f"MK Active: {mk.timer:.1f}s remaining"
-        elif mk.state == 'EXITING_WALK':
-            info = "Mega Knight is walking to the edge..."
-        elif mk.state == 'EXITING_CHARGE':
-            info = "Mega Knight is preparing to leave!"
-        elif mk.state == 'EXITING_JUMP':
-            info = "Mega Knight is leaving the arena!"
-        else:
-            info = ""
-        if info:
-            draw_text_2d(10, HEIGHT - 72, info)
-    else:
-        draw_text_2d(10, HEIGHT - 72, f"Mega Knight Cost: {abilitycost_mega_knight} | [G] to Summon")
+    G.text_layer.draw('hud', scene.hud, lambda: build_hud_lines(scene.hud))
         
+class FrameScheduler:
+    def __init__(self, fps):
+        self.interval = 1.0 / fps
+        self.next_deadline = 0.0
+        self.last_present = 0.0
+        self.frame_times = collections.deque(maxlen = frame_stats_window)
+        self.skipped_ticks = 0
+
+    def schedule(self, now):
+        # Sleep until the next frame deadline; the wait shrinks as the tick gets slower
+        if G.game_state != 'PLAYING':
+            self.next_deadline = 0.0
+            self.last_present = 0.0
+            delay = idle_poll_interval
+        else:
+            if self.next_deadline == 0.0 or now - self.next_deadline > self.interval:
+                self.next_deadline = now
+            self.next_deadline += self.interval
+            delay = self.next_deadline - now
+        glutTimerFunc(max(0, int(delay * 1000.0)), frame_tick, 0)
+
+    def record_present(self, now):
+        if self.last_present > 0.0:
+            self.frame_times.append(now - self.last_present)
+        self.last_present = now
+
+    def stats(self):
+        n = len(self.frame_times)
+        if n == 0:
+            return {'fps': 0.0, 'mean_ms': 0.0, 'jitter_ms': 0.0, 'max_ms': 0.0}
+        mean = sum(self.frame_times) / n
+        var = sum((ft - mean) ** 2 for ft in self.frame_times) / n
+        return {'fps': 1.0 / mean if mean > 0.0 else 0.0, 'mean_ms': mean * 1000.0,
+                'jitter_ms': sqrt(var) * 1000.0, 'max_ms': max(self.frame_times) * 1000.0}
+
+    def report(self):
+        stats = self.stats()
+        return (f"frame pacing over the last {len(self.frame_times)} frames: {stats['fps']:.1f} fps, "
+                f"mean {stats['mean_ms']:.2f} ms, jitter {stats['jitter_ms']:.2f} ms, max {stats['max_ms']:.2f} ms; "
+                f"{self.skipped_ticks} menu/pause ticks without a redraw")
+
+class FastForward:
+    # Every speed runs the same fixed sim_step ticks, so 8x or a skipped wave ends in
+    # exactly the state normal play would reach; only the number of ticks per frame changes.
+    def __init__(self, step):
+        self.step = step
+        self.speed_idx = 0
+        self.accumulator = 0.0
+        self.tick_cost = 0.0
+        self.skip_until = None
+        self.skip_started = 0.0
+        self.last_steps = 0
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.skip_until = None
+
+    @property
+    def speed(self):
+        return speed_modes[self.speed_idx]
+
+    @property
+    def skipping(self):
+        return self.skip_until is not None
+
+    def cycle_speed(self):
+        self.speed_idx = (self.speed_idx + 1) % len(speed_modes)
+        self.accumulator = 0.0
+
+    def skip_wave(self, game):
+        # Resting means wave_num already names the upcoming wave
+        self.skip_until = game.wave.wave_num if game.wave.resting else game.wave.wave_num + 1
+        self.skip_started = game.sim_time
+
+    def skip_done(self, game):
+        wave = game.wave
+        return (game.game_state != 'PLAYING' or (wave.wave_num >= self.skip_until and not wave.resting)
+                or game.sim_time - self.skip_started >= skip_wave_limit)
+
+    def tick(self, game):
+        t0 = time.perf_counter()
+        update_game(game, self.step)
+        cost = time.perf_counter() - t0
+        self.tick_cost = cost if self.tick_cost == 0.0 else self.tick_cost * 0.9 + cost * 0.1
+
+    def advance(self, game, real_dt, budget):
+        # Returns how many fixed ticks ran this frame
+        steps = 0
+        if self.skipping or self.speed == 0:
+            deadline = time.perf_counter() + budget
+            while game.game_state == 'PLAYING' and (steps == 0 or time.perf_counter() < deadline):
+                self.tick(game)
+                steps += 1
+                if self.skipping and self.skip_done(game):
+                    self.skip_until = None
+                    break
+            self.accumulator = 0.0
+        else:
+            self.accumulator += real_dt * self.speed
+            wanted = int(self.accumulator / self.step + 1e-6)
+            limit = max_substeps
+            if self.tick_cost > 0.0:
+                limit = max(1, min(limit, int(budget / self.tick_cost)))
+            while steps < min(wanted, limit) and game.game_state == 'PLAYING':
+                self.tick(game)
+                steps += 1
+            # Past the budget the game runs slower than asked instead of building a backlog
+            self.accumulator = min(self.accumulator - steps * self.step, self.step)
+        self.last_steps = steps
+        return steps
+
+class SimulationThread:
+    def __init__(self, game, step):
+        self.game = game
+        self.step = step
+        self.buffers = [None, None]
+        self.front_idx = 0
+        self.running = False
+        self.thread = None
+        self.tick_times = collections.deque(maxlen = frame_stats_window)
+
+    def start(self):
+        # Bound how long the render thread can wait for the GIL behind a long tick
+        sys.setswitchinterval(sim_switch_interval)
+        with self.game.sim_lock:
+            if self.game.player is not None:
+                self.publish(snapshot_scene(self.game))
+        self.running = True
+        self.thread = threading.Thread(target = self.run, name = 'simulation', daemon = True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def publish(self, scene):
+        # Fill the back buffer, then flip; the reader only ever sees a finished snapshot
+        back = 1 - self.front_idx
+        self.buffers[back] = scene
+        self.front_idx = back
+
+    def front(self):
+        return self.buffers[self.front_idx]
+
+    def run(self):
+        next_tick = time.perf_counter()
+        while self.running:
+            with self.game.sim_lock:
+                if self.game.game_state == 'PLAYING':
+                    t0 = time.perf_counter()
+                    self.game.fast_forward.advance(self.game, self.step, self.step * fast_forward_budget)
+                    self.tick_times.append(time.perf_counter() - t0)
+                    if not self.game.fast_forward.skipping:
+                        self.publish(snapshot_scene(self.game))
+
+            now = time.perf_counter()
+            next_tick += self.step
+            if now - next_tick > self.step:
+                next_tick = now
+            time.sleep(max(0.0, next_tick - now))
+
+class AllocationProfiler:
+    # Wraps every update_*/draw_* function so each call records net allocated blocks,
+    # net traced bytes and the transient peak above its starting point; nested calls are
+    # inclusive. GC pauses come from gc.callbacks and are charged to the current frame.
+    def __init__(self, report_interval = alloc_report_interval, top = alloc_report_top):
+        self.report_interval = report_interval
+        self.top = top
+        self.sections = collections.defaultdict(lambda: [0, 0, 0, 0, 0])
+        self.local = threading.local()
+        self.originals = {}
+        self.frames = 0
+        self.gc_started = 0.0
+        self.gc_pauses = []
+        self.frame_gc = 0.0
+        self.gc_frames = 0
+        self.worst_frame_gc = 0.0
+
+    def install(self, prefixes = ('update_', 'draw_')):
+        tracemalloc.start()
+        gc.callbacks.append(self.on_gc)
+        module = globals()
+        for name, fn in list(module.items()):
+            if name.startswith(prefixes) and callable(fn) and not isinstance(fn, type) \
+                    and getattr(fn, '__module__', None) == __name__:
+                self.originals[name] = fn
+                module[name] = self.wrap(name, fn)
+
+    def uninstall(self):
+        globals().update(self.originals)
+        self.originals = {}
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+        tracemalloc.stop()
+
+    def wrap(self, name, fn):
+        stats = self.sections[name]
+        local = self.local
+
+        def profiled(*args, **kwargs):
+            stack = local.__dict__.setdefault('stack', [])
+            blocks0 = sys.getallocatedblocks()
+            current0, peak0 = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1][0] = max(stack[-1][0], peak0)
+            tracemalloc.reset_peak()
+            entry = [current0]
+            stack.append(entry)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stack.pop()
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, entry[0])
+                if stack:
+                    stack[-1][0] = max(stack[-1][0], peak)
+                stats[0] += 1
+                stats[1] += sys.getallocatedblocks() - blocks0
+                stats[2] += current - current0
+                stats[3] += peak - current0
+                stats[4] = max(stats[4], peak - current0)
+
+        profiled.__name__ = fn.__name__
+        profiled.__wrapped__ = fn
+        return profiled
+
+    def on_gc(self, phase, info):
+        if phase == 'start':
+            self.gc_started = time.perf_counter()
+        else:
+            pause = time.perf_counter() - self.gc_started
+            self.gc_pauses.append((info['generation'], pause, info['collected']))
+            self.frame_gc += pause
+
+    def end_frame(self):
+        self.frames += 1
+        if self.frame_gc > 0.0:
+            self.gc_frames += 1
+            self.worst_frame_gc = max(self.worst_frame_gc, self.frame_gc)
+            self.frame_gc = 0.0
+        if self.report_interval and self.frames >= self.report_interval:
+            print(self.report())
+            self.clear()
+
+    def clear(self):
+        for stats in self.sections.values():
+            stats[:] = [0, 0, 0, 0, 0]
+        self.frames = 0
+        self.gc_pauses = []
+        self.gc_frames = 0
+        self.worst_frame_gc = 0.0
+
+    def report(self):
+        frames = max(1, self.frames)
+        lines = [f"allocations over {self.frames} frames (per frame; peak is the transient high-water per call)",
+                 f"{'function':<28}{'calls':>8}{'blocks':>10}{'net KiB':>10}{'peak KiB':>10}{'max KiB':>10}"]
+        busiest = sorted((s for s in self.sections.items() if s[1][0]), key = lambda s: -s[1][3])[:self.top]
+        for name, (calls, blocks, net, peak, peak_max) in busiest:
+            lines.append(f"{name:<28}{calls / frames:>8.1f}{blocks / frames:>10.1f}{net / frames / 1024.0:>10.2f}"
+                         f"{peak / calls / 1024.0:>10.2f}{peak_max / 1024.0:>10.2f}")
+        for gen in range(3):
+            pauses = [p for g, p, _ in self.gc_pauses if g == gen]
+            if pauses:
+                lines.append(f"gc gen{gen}: {len(pauses)} collections, total {sum(pauses) * 1000.0:.2f} ms, "
+                             f"max {max(pauses) * 1000.0:.3f} ms")
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append(f"gc hit {self.gc_frames} frames, worst frame {self.worst_frame_gc * 1000.0:.3f} ms; "
+                     f"traced {current / 1048576.0:.1f} MiB (peak {peak / 1048576.0:.1f}); "
+                     f"frozen objects {gc.get_freeze_count()}")
+        return "\n".join(lines)
+
+G = GameState()
+
 def display():
     if G.game_state == 'MAIN_MENU':
         draw_main_menu()
     else:
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        draw_game_world()
+        draw_game_world(current_scene())
         if G.game_state == 'PAUSED':
             draw_pause_menu()
         elif G.game_state == 'GAME_OVER':
             draw_game_over_screen()
 
     glutSwapBuffers()
+    if G.game_state == 'PLAYING':
+        G.frame_scheduler.record_present(time.perf_counter())
+        if G.alloc_profiler:
+            G.alloc_profiler.end_frame()
 
-def idle():
+def frame_tick(value):
     now = time.perf_counter()
     if G.last_time == 0.0:
         G.last_time = now
     dt = now - G.last_time
     G.last_time = now
     if G.game_state == 'PLAYING':
-        update_game(G, dt)
-    glutPostRedisplay()
+        ff = G.fast_forward
+        if not G.sim_thread:
+            interval = G.frame_scheduler.interval
+            ff.advance(G, dt, interval if ff.skipping else interval * fast_forward_budget)
+        if not ff.skipping:
+            glutPostRedisplay()
+    else:
+        # Menus and pause are static; input handlers request their own redraws
+        G.frame_scheduler.skipped_ticks += 1
+        G.map_preloader.pump(map_upload_budget, G.get_selected_map_name())
+    G.frame_scheduler.schedule(time.perf_counter())
 
 def keyboard(key, x, y):
     k = key.decode('utf-8').lower()
-    now = time.perf_counter()
+    if G.command_sink and G.game_state == 'PLAYING':
+        # Networked play: gameplay keys become commands scheduled by the session
+        G.command_sink(k)
+        return
+    with G.sim_lock:
+        handle_key(k)
+        if G.sim_thread and G.game_state != 'MAIN_MENU':
+            G.sim_thread.publish(snapshot_scene(G))
+    glutPostRedisplay()
+
+def report_frame_stats():
+    if frame_stats_report and G.frame_scheduler.frame_times:
+        print(G.frame_scheduler.report())
+
+def handle_key(k):
+    now = G.sim_time
 
     if G.game_state == 'MAIN_MENU':
         if k == 's': G.reset() 
         elif k == 'm': G.select_next_map()
-        elif k == 'q': sys.exit(0)
+        elif k == 'q':
+            report_frame_stats()
+            sys.exit(0)
 
     elif G.game_state == 'PLAYING':
-        if k == 'p': G.game_state = 'PAUSED'
+        if k == 'p':
+            G.game_state = 'PAUSED'
+            report_frame_stats()
         elif k in '1234567890': build_tower_at_slot(G, 9 if k == '0' else (ord(k) - ord('1')))
         elif k == 'f': activate_fast_attack(G, now)
         elif k == 'e': activate_explosive(G, now)
         elif k == 'm': activate_meteor(G)
         elif k == 'g': G.activate_mega_knight()
         elif k == 'r': activate_repair_all(G)
+        elif k == 'x': G.fast_forward.cycle_speed()
+        elif k == 'n': G.fast_forward.skip_wave(G)
         elif k == 'w':
             affected = cast_wind_spell(G, now)
             if affected is None:
@@ -1909,7 +2990,9 @@ def keyboard(key, x, y):
             G.last_time = time.perf_counter()
         elif k == 'r': G.reset()
         elif k == 't': G.game_state = 'MAIN_MENU'
-        elif k == 'q': sys.exit(0)
+        elif k == 'q':
+            report_frame_stats()
+            sys.exit(0)
 
     elif G.game_state == 'GAME_OVER':
         if k == 'r': G.reset()
@@ -1931,10 +3014,24 @@ def mouse(button, state, x, y):
     if G.game_state != 'PLAYING':
         return 
     if button == GLUT_LEFT_BUTTON and state == GLUT_DOWN:
-        if G.abilities.mega_knight and G.abilities.mega_knight.alive and G.abilities.mega_knight.allow_manual:
-            direction_x = (x - WIDTH / 2) / WIDTH
-            direction_z = (y - HEIGHT / 2) / HEIGHT
-            G.abilities.mega_knight.start_jump(direction_x, direction_z)
+        with G.sim_lock:
+            hit = pick(G, x, y)
+            if hit is None:
+                return
+            mk = G.abilities.mega_knight
+            if mk and mk.alive and mk.allow_manual:
+                # Jump toward the point under the cursor
+                mk.start_jump(hit.x - mk.x, hit.z - mk.z)
+            elif hit.kind == 'slot':
+                if G.command_sink:
+                    # Networked play only has keys for the first ten slots
+                    if hit.target < 10:
+                        G.command_sink('1234567890'[hit.target])
+                else:
+                    build_tower_at_slot(G, hit.target)
+            if G.sim_thread:
+                G.sim_thread.publish(snapshot_scene(G))
+        glutPostRedisplay()
 
 def init_glut():
     glutInit()
@@ -1944,13 +3041,24 @@ def init_glut():
     glutCreateWindow(b"CSE423 3D Tower Defense")
     G.quadric = gluNewQuadric()
     glutDisplayFunc(display)
-    glutIdleFunc(idle)
+    glutTimerFunc(0, frame_tick, 0)
     glutKeyboardFunc(keyboard)
     glutSpecialFunc(special)
     glutMouseFunc(mouse)
 
 def main():
+    args = sys.argv[1:]
+    if gc_freeze_after_load or '--gc-freeze' in args:
+        G.gc_freeze = True
+    if alloc_profiling or '--alloc-profile' in args:
+        G.alloc_profiler = AllocationProfiler()
+        G.alloc_profiler.install()
     init_glut()
+    if map_preload:
+        G.map_preloader.start([G.get_selected_map_name()] + G.map_names)
+    if simulation_thread or '--sim-thread' in args:
+        G.sim_thread = SimulationThread(G, sim_step)
+        G.sim_thread.start()
     glutMainLoop()
 
 if __name__ == "__main__":
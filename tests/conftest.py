@@ -0,0 +1,29 @@
+import os, sys
+
+# The tests import project.py and headless.py from the repository root;
+# headless picks PYOPENGL_PLATFORM=egl (surfaceless without a display), so
+# it is imported before OpenGL.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import headless
+
+@pytest.fixture
+def context():
+    try:
+        context = headless.OffscreenContext()
+    except Exception as err:
+        pytest.skip(f"no offscreen GL context: {err}")
+    try:
+        yield context
+    finally:
+        context.destroy()
+
+@pytest.fixture(scope = 'session')
+def offscreen():
+    # for code creating its own context, e.g. headless.Renderer
+    try:
+        headless.OffscreenContext().destroy()
+    except Exception as err:
+        pytest.skip(f"no offscreen GL context: {err}")
@@ -0,0 +1,138 @@
+import copy, types, random
+
+import pytest
+
+import project as P
+
+# The batched area effects (area_query, area_damage, area_wind) against the
+# per-enemy loops they replaced in meteor impacts, Mega Knight landings and
+# wind, with and without numpy.
+
+@pytest.fixture(params = ['numpy', 'scalar'])
+def game(request, monkeypatch):
+    if request.param == 'numpy' and P.numpy is None:
+        pytest.skip("numpy not installed")
+    if request.param == 'scalar':
+        monkeypatch.setattr(P, 'numpy', None)
+    game = P.GameState()
+    game.selected_map_idx = game.map_names.index("Mohammadpur")
+    game.reset(seed = 8)
+    game.player.money = 0.0
+    rng = random.Random(8)
+    path = game.map.path_points
+    for i in range(600):
+        px, pz = rng.choice(path)
+        e = P.Enemy(px + rng.uniform(-4.0, 4.0), pz + rng.uniform(-4.0, 4.0), 1.5, rng.uniform(1.0, 400.0),
+                    is_boss = i % 37 == 0)
+        e.path_idx = rng.randrange(len(path))
+        e.alive = i % 11 != 0
+        game.enemies.append(e)
+    # one enemy exactly on the centre used below
+    game.enemies.append(P.Enemy(path[3][0], path[3][1], 1.5, 50.0))
+    monkeypatch.setattr(P, 'G', game)
+    return game
+
+def copy_of(game):
+    return types.SimpleNamespace(map = game.map, enemies = copy.deepcopy(game.enemies), player = copy.deepcopy(game.player))
+
+def state(game):
+    return ([(e.x, e.z, e.health, e.alive, e.path_idx, e.speed, e.wind_affected, e.wind_slow_end_time)
+             for e in game.enemies], game.player.money, game.player.score)
+
+def assert_same(game, reference):
+    enemies, money, score = state(game)
+    want_enemies, want_money, want_score = state(reference)
+    assert (money, score) == (want_money, want_score)
+    for got, want in zip(enemies, want_enemies):
+        assert got == pytest.approx(want)
+
+# The loops as they were
+def old_landing(game, x, z, radius, damage):
+    for e in game.enemies:
+        if e.alive and P.dist2D(x, z, e.x, e.z) <= radius:
+            e.health -= damage
+            if e.health <= 0 and e.alive:
+                e.alive = False
+                game.player.money += (P.boss_reward if e.is_boss else P.kill_reward)
+                game.player.score += (50 if e.is_boss else 10)
+
+def old_meteor(game):
+    for e in game.enemies:
+        if e.alive:
+            if e.is_boss:
+                e.health *= 0.5
+                if e.health <= 0:
+                    e.alive = False
+                    game.player.money += P.boss_reward
+                    game.player.score += 50
+            else:
+                e.alive = False
+                game.player.money += P.kill_reward
+                game.player.score += 10
+
+def old_push(game, enemy, push_x, push_z):
+    new_x = enemy.x + push_x
+    new_z = enemy.z + push_z
+    path = game.map.path_points
+    min_dist_to_path = min(P.point_to_segment_distance(new_x, new_z, path[i][0], path[i][1], path[i+1][0], path[i+1][1])
+                           for i in range(len(path) - 1))
+    if min_dist_to_path <= game.map.path_width * 2:
+        enemy.x = new_x
+        enemy.z = new_z
+        for i in range(len(path) - 1):
+            if P.dist2D(enemy.x, enemy.z, *path[i]) <= P.dist2D(enemy.x, enemy.z, *path[i+1]):
+                enemy.path_idx = max(0, i)
+                break
+
+def old_wind(game, cx, cz, now):
+    affected = []
+    for enemy in game.enemies:
+        if enemy.alive:
+            d = P.dist2D(cx, cz, enemy.x, enemy.z)
+            if d <= P.wind_radius:
+                affected.append((enemy, d))
+    for enemy, d in affected:
+        ndx, ndz = P.normalize2D(enemy.x - cx, enemy.z - cz)
+        actual_push = P.wind_push_force * max(0.2, (P.wind_radius - d) / P.wind_radius)
+        old_push(game, enemy, ndx * actual_push, ndz * actual_push)
+        enemy.apply_wind_effect(now, P.wind_slow_duration)
+    return len(affected)
+
+@pytest.mark.parametrize('radius', [0.0, 3.0, P.wind_radius, P.meteor_aoe_radius])
+def test_query(game, radius):
+    cx, cz = game.map.path_points[3]
+    hits = P.area_query(game.enemies, cx, cz, radius)
+    expected = [i for i, e in enumerate(game.enemies) if e.alive and P.dist2D(cx, cz, e.x, e.z) <= radius]
+    assert list(hits.index) == expected
+    assert hits.enemies == [game.enemies[i] for i in expected]
+    assert list(hits.dist) == pytest.approx([P.dist2D(cx, cz, game.enemies[i].x, game.enemies[i].z) for i in expected])
+    assert expected or radius == 0.0
+
+def test_landing(game):
+    reference = copy_of(game)
+    mk = P.MegaKnight()
+    for x, z in game.map.path_points:
+        mk.x, mk.z = x, z
+        mk.deal_landing_damage()
+        old_landing(reference, x, z, mk.aoe_radius, mk.landing_damage)
+    assert game.player.score > 0
+    assert_same(game, reference)
+
+def test_meteor(game):
+    reference = copy_of(game)
+    for _ in range(3):
+        hits = P.area_query(game.enemies, 0.0, 0.0, P.meteor_aoe_radius)
+        P.area_damage(game, hits, boss_scale = 0.5, kill_minions = True)
+        old_meteor(reference)
+    assert_same(game, reference)
+
+def test_wind(game):
+    reference = copy_of(game)
+    before = [(e.x, e.z) for e in game.enemies]
+    for i, (cx, cz) in enumerate(game.map.path_points):
+        hits = P.area_query(game.enemies, cx, cz, P.wind_radius)
+        P.area_wind(game, hits, cx, cz, float(i))
+        assert len(hits.enemies) == old_wind(reference, cx, cz, float(i))
+    moved = sum(1 for e, position in zip(game.enemies, before) if (e.x, e.z) != position)
+    assert 0 < moved < len(before)
+    assert_same(game, reference)
@@ -0,0 +1,32 @@
+import numpy
+import pytest
+
+import capture
+
+# Offline capture to Y4M: 4:2:0 chroma planes are ceil(h/2) x ceil(w/2).
+
+@pytest.mark.parametrize('height, width', [(120, 160), (121, 161), (1, 1)])
+def test_yuv420_planes(height, width):
+    frame = numpy.random.default_rng(1).integers(0, 256, (height, width, 3), dtype = numpy.uint8)
+    y, u, v = capture.rgb_to_yuv420(frame)
+    assert y.shape == (height, width)
+    assert u.shape == v.shape == ((height + 1) // 2, (width + 1) // 2)
+
+def test_odd_edge_is_replicated():
+    frame = numpy.zeros((3, 3, 3), dtype = numpy.uint8)
+    frame[2, :, 2] = 255  # blue last row
+    frame[:, 2, 0] = 255  # red last column
+    y, u, v = capture.rgb_to_yuv420(frame)
+    assert u[0, 0] == v[0, 0] == 128
+    assert u[1, 0] > 128 and v[0, 1] > 128
+
+def test_record_odd_size(offscreen, tmp_path):
+    path = str(tmp_path / 'odd.y4m')
+    stats = capture.record(path, seconds = 0.2, fps = 10, size = (161, 121))
+    data = open(path, 'rb').read()
+    header, body = data.split(b'\n', 1)
+    assert header.startswith(b'YUV4MPEG2 W161 H121 ')
+    frame_size = len(b'FRAME\n') + 161 * 121 + 2 * 81 * 61
+    assert stats['frames'] > 0
+    assert len(body) == stats['frames'] * frame_size
+    assert all(body[i * frame_size:].startswith(b'FRAME\n') for i in range(stats['frames']))
@@ -0,0 +1,51 @@
+import os, threading
+
+import pytest
+
+import headless
+
+from OpenGL import contextdata, platform
+
+# The per-thread cached current context of OpenGL.contextdata, which the
+# make-current wrappers (here OpenGL.EGL's eglMakeCurrent) keep up to date.
+
+pytestmark = pytest.mark.skipif(os.environ['PYOPENGL_PLATFORM'] != 'egl', reason = "switches EGL contexts")
+
+def make_current(context):
+    from OpenGL import EGL
+    EGL.eglMakeCurrent(context.display, context.surface, context.surface, context.context)
+
+def test_cache_follows_make_current(context):
+    first = contextdata.getCurrentContext()
+    assert first == platform.GetCurrentContext()
+    contextdata.setValue('test', 'first')
+    second = headless.OffscreenContext()
+    try:
+        assert contextdata.getCurrentContext() == platform.GetCurrentContext() != first
+        assert contextdata.getValue('test') is None
+        contextdata.setValue('test', 'second')
+        make_current(context)
+        assert contextdata.getCurrentContext() == platform.GetCurrentContext() == first
+        assert contextdata.getValue('test') == 'first'
+        make_current(second)
+        assert contextdata.getValue('test') == 'second'
+    finally:
+        from OpenGL import EGL
+        make_current(second)
+        contextdata.cleanupContext()
+        make_current(context)
+        contextdata.delValue('test')
+        # not second.destroy(), which would terminate the display both contexts share
+        EGL.eglDestroySurface(second.display, second.surface)
+        EGL.eglDestroyContext(second.display, second.context)
+
+def test_uncached_thread(context):
+    found = []
+    def other():
+        # nothing current in this thread
+        found.append((contextdata.getCurrentContext(), platform.GetCurrentContext()))
+    thread = threading.Thread(target = other)
+    thread.start()
+    thread.join()
+    assert found[0][0] == found[0][1]
+    assert contextdata.getCurrentContext() == platform.GetCurrentContext()
@@ -0,0 +1,121 @@
+import pytest
+
+import headless
+
+from OpenGL import GL, contextdata, error
+from OpenGL.raw.GL import _errors
+
+# Deferred/batched glGetError checking (error.setCheckingMode) and the
+# per-context KHR_debug channel (error.installDebugCallback).
+
+checker = getattr(_errors, '_error_checker', None)
+pytestmark = pytest.mark.skipif(not checker or not hasattr(checker, 'setMode'), reason = "Python error checker not in use")
+
+INVALID = 0xFFFF  # not a capability: GL_INVALID_ENUM
+
+@pytest.fixture
+def errors(context):
+    saved = checker._registeredChecker, checker._currentChecker, checker._channelLookup
+    GL.glGetError()
+    yield checker
+    error.setCheckingMode('immediate')
+    error.removeDebugCallback()
+    checker._registeredChecker, checker._currentChecker, checker._channelLookup = saved
+    GL.glGetError()
+
+def operations(err):
+    return [getattr(operation, '__name__', None) for operation, arguments in err.recentCalls]
+
+def test_interval(errors):
+    error.setCheckingMode('interval', 8)
+    GL.glEnable(INVALID)
+    for _ in range(6):
+        GL.glDisable(GL.GL_DEPTH_TEST)
+    with pytest.raises(GL.GLError) as info:
+        GL.glDisable(GL.GL_DEPTH_TEST)
+    assert info.value.err == GL.GL_INVALID_ENUM
+    assert operations(info.value) == ['glEnable'] + ['glDisable'] * 7
+    assert tuple(info.value.recentCalls[0][1]) == (INVALID,)
+    # checked and cleared
+    GL.glDisable(GL.GL_DEPTH_TEST)
+
+def test_history_is_a_ring_buffer(errors):
+    error.setCheckingMode('frame', history = 4)
+    GL.glEnable(INVALID)
+    for _ in range(10):
+        GL.glDisable(GL.GL_DEPTH_TEST)
+    with pytest.raises(GL.GLError) as info:
+        error.frameBoundary()
+    assert operations(info.value) == ['glDisable'] * 4
+
+def test_frame_boundary(errors):
+    error.setCheckingMode('frame')
+    GL.glEnable(INVALID)
+    GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+    with pytest.raises(GL.GLError) as info:
+        error.frameBoundary()
+    assert operations(info.value) == ['glEnable', 'glClear']
+    error.frameBoundary()
+
+@pytest.mark.parametrize('mode, count', [('interval', 3), ('boundary', None)])
+def test_check_deferred_to_glend(errors, mode, count):
+    error.setCheckingMode(mode, count)
+    # a check falling due between glBegin and glEnd would itself be an error
+    GL.glBegin(GL.GL_TRIANGLES)
+    for _ in range(9):
+        GL.glVertex3f(0.0, 0.0, 0.0)
+    GL.glEnd()
+    error.frameBoundary()
+    GL.glBegin(GL.GL_TRIANGLES)
+    GL.glVertex3f(0.0, 0.0, 0.0)
+    GL.glEnable(GL.GL_DEPTH_TEST)  # not allowed inside glBegin/glEnd
+    GL.glVertex3f(0.0, 0.0, 0.0)
+    GL.glVertex3f(0.0, 0.0, 0.0)
+    GL.glVertex3f(0.0, 0.0, 0.0)
+    with pytest.raises(GL.GLError) as info:
+        GL.glEnd()
+    assert info.value.err == GL.GL_INVALID_OPERATION
+    assert 'glEnable' in operations(info.value)
+    assert operations(info.value)[-1] == 'glEnd'
+
+def make_current(context):
+    from OpenGL import EGL
+    EGL.eglMakeCurrent(context.display, context.surface, context.surface, context.context)
+
+def test_channel_per_context(errors, context):
+    if headless.os.environ['PYOPENGL_PLATFORM'] != 'egl':
+        pytest.skip("switches EGL contexts")
+    first = error.installDebugCallback()
+    if first is None:
+        pytest.skip("no KHR_debug")
+    assert errors.currentChannel() is first
+    with pytest.raises(GL.GLError) as info:
+        GL.glEnable(INVALID)
+    assert info.value.description  # the driver's message
+    assert first.counts
+    second_context = headless.OffscreenContext()
+    try:
+        # no channel here: glGetError polling
+        assert errors.currentChannel() is None
+        with pytest.raises(GL.GLError) as info:
+            GL.glEnable(INVALID)
+        assert info.value.err == GL.GL_INVALID_ENUM and not info.value.description
+        second = error.installDebugCallback()
+        assert errors.currentChannel() is second is not first
+        before = dict(first.counts)
+        with pytest.raises(GL.GLError):
+            GL.glEnable(INVALID)
+        assert second.counts and first.counts == before
+        make_current(context)
+        assert errors.currentChannel() is first
+        with pytest.raises(GL.GLError) as info:
+            GL.glEnable(INVALID)
+        assert info.value.description
+        make_current(second_context)
+        error.removeDebugCallback()
+        contextdata.cleanupContext()
+    finally:
+        from OpenGL import EGL
+        make_current(context)
+        EGL.eglDestroySurface(second_context.display, second_context.surface)
+        EGL.eglDestroyContext(second_context.display, second_context.context)
@@ -0,0 +1,59 @@
+import pytest
+
+import lockstep
+import project as P
+
+# project.FastForward: faster speeds and skipping a wave only change how many
+# fixed ticks run per frame, so they reach the state hash of normal play.
+
+def new_game():
+    game = P.GameState()
+    game.reset(seed = 12)
+    for i in range(0, len(game.tower_slots), 2):
+        P.build_tower_at_slot(game, i)
+    return game
+
+def play(game, ticks):
+    for _ in range(ticks):
+        P.update_game(game, P.sim_step)
+    return lockstep.state_hash(game, ticks)
+
+@pytest.mark.parametrize('speed', [2, 4, 8])
+def test_speed_matches_normal_play(speed):
+    ticks = 1200
+    game = new_game()
+    ff = game.fast_forward
+    while ff.speed != speed:
+        ff.cycle_speed()
+    done = 0
+    while done < ticks:
+        steps = ff.advance(game, P.sim_step, budget = 1.0)
+        assert steps == speed
+        done += steps
+    assert done == ticks
+    assert lockstep.state_hash(game, ticks) == play(new_game(), ticks)
+
+def test_frame_budget_limits_substeps():
+    game = new_game()
+    ff = game.fast_forward
+    while ff.speed != 8:
+        ff.cycle_speed()
+    ff.tick_cost = 0.01
+    assert ff.advance(game, P.sim_step, budget = 0.035) == 3
+    # the unmet ticks are dropped instead of piling up
+    assert ff.accumulator <= ff.step
+
+@pytest.mark.parametrize('waves', [1, 3])
+def test_skip_wave_matches_normal_play(waves, monkeypatch):
+    # towers decay, keep leaks from ending the game before the last wave
+    monkeypatch.setattr(P, 'leak_dmg', 0)
+    game = new_game()
+    ff = game.fast_forward
+    ticks = 0
+    for _ in range(waves):
+        ff.skip_wave(game)
+        while ff.skipping:
+            ticks += ff.advance(game, P.sim_step, budget = 1.0)
+    assert game.wave.wave_num == waves + 1 and not game.wave.resting
+    assert game.game_state == 'PLAYING'
+    assert lockstep.state_hash(game, ticks) == play(new_game(), ticks)
@@ -0,0 +1,37 @@
+import pytest
+
+import project as P
+
+# Frame pacing statistics of project.FrameScheduler and their report on pause.
+
+def test_stats():
+    scheduler = P.FrameScheduler(60.0)
+    assert scheduler.stats()['fps'] == 0.0
+    for now in (1.0, 1.016, 1.034, 1.050):
+        scheduler.record_present(now)
+    stats = scheduler.stats()
+    intervals = [0.016, 0.018, 0.016]
+    mean = sum(intervals) / 3
+    jitter = (sum((i - mean) ** 2 for i in intervals) / 3) ** 0.5
+    assert stats['mean_ms'] == pytest.approx(mean * 1000.0)
+    assert stats['fps'] == pytest.approx(1.0 / mean)
+    assert stats['jitter_ms'] == pytest.approx(jitter * 1000.0)
+    assert stats['max_ms'] == pytest.approx(18.0)
+
+def test_report_on_pause(monkeypatch, capsys):
+    game = P.GameState()
+    game.reset()
+    monkeypatch.setattr(P, 'G', game)
+    game.frame_scheduler.skipped_ticks = 7
+    P.handle_key('p')
+    assert game.game_state == 'PAUSED'
+    # nothing presented yet, nothing to report
+    assert capsys.readouterr().out == ''
+    P.handle_key('p')
+    for now in (1.0, 1.02, 1.04):
+        game.frame_scheduler.record_present(now)
+    P.handle_key('p')
+    out = capsys.readouterr().out
+    assert 'over the last 2 frames: 50.0 fps' in out
+    assert 'jitter 0.00 ms' in out
+    assert '7 menu/pause ticks' in out
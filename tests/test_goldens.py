@@ -0,0 +1,23 @@
+import pytest
+
+import headless
+
+# Each headless.golden_scenes entry rendered offscreen matches its committed
+# golden frame (python headless.py golden --update rewrites them).
+
+@pytest.fixture(scope = 'module')
+def renderer(offscreen):
+    renderer = headless.Renderer()
+    yield renderer
+    renderer.close()
+
+@pytest.mark.parametrize('name', sorted(headless.golden_scenes))
+def test_golden(renderer, name):
+    frame = renderer.capture(headless.build_game(**headless.golden_scenes[name]))
+    ok, bad = headless.compare_to_golden(frame, name)
+    assert bad is not None, f"goldens/{name}.ppm is missing"
+    assert ok, f"{bad * 100:.3f}% of pixels differ from goldens/{name}.ppm, see goldens/{name}.actual.ppm"
+
+def test_missing_golden_fails(renderer):
+    frame = renderer.capture(headless.build_game(n_enemies = 0, ticks = 0))
+    assert headless.compare_to_golden(frame, 'no_such_scene') == (False, None)
@@ -0,0 +1,69 @@
+import types
+
+import numpy
+import pytest
+
+import headless
+
+from OpenGL import GL
+from OpenGL.GL import immediate
+
+# glBegin/glEnd drawing through OpenGL.GL vs the OpenGL.GL.immediate
+# recorder, which must produce the same frames.
+
+recorded = types.SimpleNamespace(**{name: getattr(immediate, name) for name in immediate.__all__})
+
+cubes = 100
+grid = 16
+
+def draw_cubes(gl):
+    for i in range(cubes):
+        GL.glPushMatrix()
+        GL.glTranslatef((i % 10) * 0.2 - 1.0, (i // 10) * 0.2 - 1.0, 0.0)
+        h = 0.06
+        gl.glColor3f(i / cubes, 0.5, 1.0 - i / cubes)
+        gl.glBegin(GL.GL_QUADS)
+        for normal, corners in headless._cube_faces:
+            gl.glNormal3f(*normal)
+            for x, y, z in corners:
+                gl.glVertex3f(x * h, y * h, z * h)
+        gl.glEnd()
+        GL.glPopMatrix()
+
+def draw_grid(gl):
+    step = 2.0 / grid
+    for i in range(grid):
+        for j in range(grid):
+            x, y = -1.0 + i * step, -1.0 + j * step
+            gl.glColor3f(i / grid, j / grid, 0.5)
+            gl.glBegin(GL.GL_QUADS)
+            gl.glVertex2f(x, y)
+            gl.glVertex2f(x + step, y)
+            gl.glVertex2f(x + step, y + step)
+            gl.glVertex2f(x, y + step)
+            gl.glEnd()
+
+def draw_grid_merged(gl):
+    with immediate.batched():
+        draw_grid(gl)
+
+def frame(context, draw, gl):
+    GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+    draw(gl)
+    GL.glFinish()
+    return context.read_frame()
+
+# single quads are below the recorder's replayBelow and replayed as
+# immediate-mode calls rather than drawn from arrays
+@pytest.mark.parametrize('draw, recorded_draw, arrays', [
+    (draw_cubes, draw_cubes, cubes),
+    (draw_grid, draw_grid, 0),
+    (draw_grid, draw_grid_merged, 1),
+], ids = ['cubes', 'quads', 'quads batched'])
+def test_identical_frames(context, draw, recorded_draw, arrays):
+    GL.glEnable(GL.GL_DEPTH_TEST)
+    reference = frame(context, draw, GL)
+    assert reference.any()
+    immediate.recorder.reset()
+    assert numpy.array_equal(reference, frame(context, recorded_draw, recorded))
+    assert immediate.recorder.draws == arrays
@@ -0,0 +1,37 @@
+import pytest
+
+import OpenGL.GL
+from OpenGL.GL import _lazy, _lazyindex
+
+# The lazy OpenGL.GL namespace (PYOPENGL_LAZY_GL) against the one the eager
+# star-imports build.
+
+pytestmark = pytest.mark.skipif(OpenGL.GL._lazyIndex is None, reason = "PYOPENGL_LAZY_GL=0")
+
+def eager_namespace():
+    namespace = {}
+    for name in _lazy.EAGER + _lazy.LAZY:
+        exec(f"from OpenGL.GL.{name} import *", namespace)
+    for name in _lazy.LATER:
+        exec(f"from {name} import *", namespace)
+    return {key: value for key, value in namespace.items() if not key.startswith('_')}
+
+def test_index_is_current():
+    provides, shadowed = _lazy.buildIndex()
+    assert tuple(_lazyindex.MODULES) == _lazy.LAZY
+    assert tuple(_lazyindex.SHADOWED) == tuple(shadowed)
+    assert [names.split() for names in _lazyindex.NAMES] == [provides[name] for name in _lazy.LAZY]
+
+def test_names_match_eager_imports():
+    eager = eager_namespace()
+    mismatched = [
+        name for name, value in sorted(eager.items())
+        if not _lazy._equivalent(value, getattr(OpenGL.GL, name))
+    ]
+    assert not mismatched
+    assert set(eager) <= set(dir(OpenGL.GL))
+
+def test_star_import_exports_lazy_names():
+    namespace = {}
+    exec("from OpenGL.GL import *", namespace)
+    assert set(eager_namespace()) <= set(namespace)
@@ -0,0 +1,58 @@
+import ctypes, sys
+
+import pytest
+
+from OpenGL.platform import ctypesloader
+
+# The persistent library resolution cache of the posix loader.
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'), reason = "posix loader only")
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    filename = str(tmp_path / 'libraries.json')
+    monkeypatch.setattr(ctypesloader, 'cacheFile', lambda setting = None: filename)
+    monkeypatch.setattr(ctypesloader, '_cache', None)
+    monkeypatch.setattr(ctypesloader, 'resolutions', [])
+    return filename
+
+def load(name):
+    ctypesloader._loadLibraryPosix(ctypes.CDLL, name, ctypes.RTLD_GLOBAL)
+    return ctypesloader.resolutions[-1][2]
+
+def reload(monkeypatch):
+    # a later process: reads the file again
+    monkeypatch.setattr(ctypesloader, '_cache', None)
+
+def test_found_library_is_cached(cache, monkeypatch):
+    assert load('m') == 'search'
+    reload(monkeypatch)
+    assert load('m') == 'cache'
+
+def test_failure_is_cached_briefly(cache, monkeypatch):
+    name = 'PyOpenGLNoSuchLibrary'
+    assert load(name) == 'failed'
+    reload(monkeypatch)
+    assert load(name) == 'cached failure'
+    entry = ctypesloader._entries()[ctypesloader._cacheKey(name)]
+    entry['time'] -= ctypesloader.FAILURE_LIFETIME + 1
+    ctypesloader._saveEntries()
+    reload(monkeypatch)
+    assert load(name) == 'failed'
+
+def test_failure_without_time_is_searched_again(cache, monkeypatch):
+    name = 'PyOpenGLNoSuchLibrary'
+    load(name)
+    del ctypesloader._entries()[ctypesloader._cacheKey(name)]['time']
+    assert load(name) == 'failed'
+
+def test_clear_then_report(cache, monkeypatch, capsys):
+    from OpenGL.platform import libraries
+    name = 'PyOpenGLNoSuchLibrary'
+    load(name)
+    assert ctypesloader._cacheKey(name) in open(cache).read()
+    assert libraries.main(['--clear']) == 0
+    out = capsys.readouterr().out
+    assert 'removed %s' % cache in out
+    assert 'cache: %s' % cache in out
+    assert ctypesloader._cacheKey(name) not in ctypesloader._entries()
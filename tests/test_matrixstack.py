@@ -0,0 +1,109 @@
+import numpy
+import pytest
+
+from OpenGL import GL, GLU
+from OpenGL.GL import shaders
+from OpenGL.GL.matrixstack import MatrixStack
+
+# OpenGL.GL.matrixstack against the fixed-function matrices GL computes
+# itself (glGetFloatv(GL_MODELVIEW_MATRIX)/GL_PROJECTION_MATRIX).
+
+rng = numpy.random.default_rng(7)
+objects = 64
+translations = rng.uniform(-5.0, 5.0, (objects, 3))
+angles = rng.uniform(0.0, 360.0, objects)
+axes = rng.uniform(-1.0, 1.0, (objects, 3))
+scales = rng.uniform(0.2, 2.0, (objects, 3))
+
+vertex_shader = """
+#version 120
+uniform mat4 model_view;
+void main() { gl_Position = gl_ProjectionMatrix * model_view * gl_Vertex; }
+"""
+fragment_shader = """
+#version 120
+void main() { gl_FragColor = vec4(1.0); }
+"""
+
+def gl_matrix(name):
+    return numpy.asarray(GL.glGetFloatv(name), dtype = numpy.float32).reshape(16)
+
+class FixedFunction:
+    gluPerspective = staticmethod(GLU.gluPerspective)
+    glFrustum = staticmethod(GL.glFrustum)
+    glOrtho = staticmethod(GL.glOrtho)
+
+def test_look_at(context):
+    stack = MatrixStack()
+    view = (0.0, 4.0, 12.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+    GL.glMatrixMode(GL.GL_MODELVIEW)
+    GL.glLoadIdentity()
+    GLU.gluLookAt(*view)
+    stack.gluLookAt(*view)
+    assert numpy.allclose(gl_matrix(GL.GL_MODELVIEW_MATRIX), stack.matrix(), atol = 1e-6)
+
+@pytest.mark.parametrize('setup', [
+    lambda gl: gl.gluPerspective(45.0, 1.5, 0.1, 100.0),
+    lambda gl: gl.glFrustum(-1.0, 2.0, -0.5, 1.0, 0.5, 20.0),
+    lambda gl: gl.glOrtho(-3.0, 4.0, -2.0, 5.0, -1.0, 10.0),
+], ids = ['gluPerspective', 'glFrustum', 'glOrtho'])
+def test_projection(context, setup):
+    stack = MatrixStack()
+    GL.glMatrixMode(GL.GL_PROJECTION)
+    GL.glLoadIdentity()
+    stack.glMatrixMode(GL.GL_PROJECTION)
+    setup(stack)
+    setup(FixedFunction)
+    assert numpy.allclose(gl_matrix(GL.GL_PROJECTION_MATRIX), stack.matrix(), rtol = 1e-5, atol = 1e-6)
+
+def test_object_matrices(context):
+    stack = MatrixStack()
+    GL.glMatrixMode(GL.GL_MODELVIEW)
+    GL.glLoadIdentity()
+    GL.glTranslatef(0.0, -1.0, -8.0)
+    stack.glTranslatef(0.0, -1.0, -8.0)
+    composed = stack.compose(translations, angles, axes, scales)
+    for i in range(objects):
+        GL.glPushMatrix()
+        GL.glTranslatef(*translations[i])
+        GL.glRotatef(angles[i], *axes[i])
+        GL.glScalef(*scales[i])
+        expected = gl_matrix(GL.GL_MODELVIEW_MATRIX)
+        GL.glPopMatrix()
+        stack.glPushMatrix()
+        stack.glTranslatef(*translations[i])
+        stack.glRotatef(angles[i], *axes[i])
+        stack.glScalef(*scales[i])
+        assert numpy.allclose(expected, stack.matrix(), rtol = 1e-5, atol = 1e-5), i
+        assert numpy.allclose(expected, composed[i], rtol = 1e-5, atol = 1e-5), i
+        stack.glPopMatrix()
+
+def test_publish(context):
+    programs = [
+        shaders.compileProgram(
+            shaders.compileShader(vertex_shader, GL.GL_VERTEX_SHADER),
+            shaders.compileShader(fragment_shader, GL.GL_FRAGMENT_SHADER),
+        )
+        for _ in range(2)
+    ]
+    locations = [GL.glGetUniformLocation(program, "model_view") for program in programs]
+    stack = MatrixStack()
+    stack.glTranslatef(1.0, 2.0, 3.0)
+    GL.glUseProgram(programs[0])
+    assert stack.publish(locations[0])
+    assert not stack.publish(locations[0])
+    # another program's uniform of the same location still needs the upload
+    GL.glUseProgram(programs[1])
+    assert stack.publish(locations[1])
+    assert not stack.publish(locations[1], program = programs[1])
+    # the resolved mode is part of the key: the projection has not been published yet
+    stack.glMatrixMode(GL.GL_PROJECTION)
+    assert stack.publish(locations[1])
+    stack.glMatrixMode(GL.GL_MODELVIEW)
+    assert not stack.publish(locations[1])
+    stack.glRotatef(30.0, 0.0, 1.0, 0.0)
+    assert stack.publish(locations[1])
+    uploaded = numpy.zeros(16, dtype = numpy.float32)
+    GL.glGetUniformfv(programs[1], locations[1], uploaded)
+    assert numpy.allclose(uploaded, stack.matrix())
+    GL.glUseProgram(0)
@@ -0,0 +1,58 @@
+import pytest
+
+import project as P
+
+# project.pick: CPU ray casts from a fixed camera onto slots, towers, enemies
+# and the ground, at the pixels the slots project to.
+
+width, height = 800, 600
+
+def project_point(camera, x, y, z):
+    # World point to GLUT window pixel, through the matrices gluPerspective/gluLookAt load
+    clip = P.mat4_mul(P.perspective_matrix(P.camera_fovy, width / float(height), P.camera_near, P.camera_far),
+                      camera.view_matrix())
+    cx, cy, _, cw = (sum(row[i] * v for i, v in enumerate((x, y, z, 1.0))) for row in clip)
+    return round((cx / cw + 1.0) * 0.5 * width - 0.5), round((1.0 - cy / cw) * 0.5 * height - 0.5)
+
+@pytest.fixture
+def game():
+    game = P.GameState()
+    game.selected_map_idx = game.map_names.index("Cityscape")
+    game.reset(seed = 2)
+    game.camera.rotate = 20.0
+    game.camera.pitch = 55.0
+    return game
+
+def test_pick_every_slot(game):
+    for i, slot in enumerate(game.tower_slots):
+        mx, my = project_point(game.camera, slot.x, P.ground_y, slot.z)
+        hit = P.pick(game, mx, my, width, height)
+        assert (hit.kind, hit.target) == ('slot', i)
+        assert P.dist2D(hit.x, hit.z, slot.x, slot.z) <= P.pick_slot_radius
+
+def test_pick_tower(game):
+    assert P.build_tower_at_slot(game, 3)
+    slot = game.tower_slots[3]
+    hit = P.pick(game, *project_point(game.camera, slot.x, 1.25, slot.z), width = width, height = height)
+    assert (hit.kind, hit.target) == ('tower', slot.tower)
+
+def test_pick_enemy_in_front_of_ground(game):
+    x, z = game.map.path_points[5]
+    enemy = P.Enemy(x, z, 1.0, 100.0)
+    game.enemies.append(enemy)
+    mx, my = project_point(game.camera, enemy.x, enemy.y, enemy.z)
+    assert P.pick(game, mx, my, width, height).target is enemy
+    enemy.alive = False
+    assert P.pick(game, mx, my, width, height).kind == 'ground'
+
+def test_pick_ground(game):
+    x, z = 20.0, -15.0
+    hit = P.pick(game, *project_point(game.camera, x, P.ground_y, z), width = width, height = height)
+    assert hit.kind == 'ground'
+    # within the footprint of one pixel at that distance
+    assert hit.x == pytest.approx(x, abs = 0.2) and hit.z == pytest.approx(z, abs = 0.2)
+    assert hit.y == pytest.approx(P.ground_y)
+
+def test_pick_sky(game):
+    game.camera.pitch = 5.0
+    assert P.pick(game, width // 2, 0, width, height) is None
@@ -0,0 +1,107 @@
+import importlib.util, os, shutil, sys, types
+
+import pytest
+
+from OpenGL.raw import _registry
+
+# Modules served from an OpenGL.raw._registry file against the generated
+# .py files they were parsed from.
+
+@pytest.fixture(scope = 'module')
+def registry(tmp_path_factory):
+    filename = str(tmp_path_factory.mktemp('registry') / 'raw.registry')
+    _registry.build(filename)
+    return _registry.Registry(filename)
+
+def from_source(name):
+    spec = importlib.util.spec_from_file_location(name, _registry._sourceFile(name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def from_registry(registry, name):
+    module = types.ModuleType(name)
+    registry.exec_module(module)
+    return module
+
+def public(module):
+    return {key: value for key, value in vars(module).items() if not key.startswith('__')}
+
+def test_current(registry):
+    assert registry.current()
+    assert 'OpenGL.raw.GL.VERSION.GL_1_1' in registry.index
+
+def test_modules_match_sources(registry):
+    compared = 0
+    for name in sorted(registry.index):
+        if not name.startswith(('OpenGL.raw.GL.VERSION.', 'OpenGL.raw.GL.ARB.', 'OpenGL.raw.EGL.')):
+            continue
+        try:
+            expected = public(from_source(name))
+        except AttributeError:
+            continue  # references a type missing from _types, either way
+        actual = public(from_registry(registry, name))
+        assert set(expected) == set(actual), name
+        for key, value in expected.items():
+            other = actual[key]
+            if hasattr(value, 'argNames'):
+                for attribute in ('__name__', '__module__', 'argNames', 'argTypes', 'resultType', 'extension', 'DLL'):
+                    left, right = getattr(value, attribute, None), getattr(other, attribute, None)
+                    if isinstance(left, list):
+                        left, right = tuple(left), tuple(right)
+                    assert left == right, (name, key, attribute)
+            elif isinstance(value, int):
+                assert value == other and getattr(value, 'name', None) == getattr(other, 'name', None), (name, key)
+        compared += 1
+    assert compared > 100
+
+def test_changed_source_is_imported_normally(tmp_path):
+    filename = str(tmp_path / 'raw.registry')
+    _registry.build(filename)
+    registry = _registry.Registry(filename)
+    name = 'OpenGL.raw.GL.VERSION.GL_1_1'
+    assert registry.find_spec(name) is not None
+    offset, length, mtime, size = registry.index[name]
+    registry.index[name] = (offset, length, mtime - 1, size)
+    assert registry.find_spec(name) is None
+    assert os.path.exists(filename)
+
+def test_missing_source_is_served(tmp_path):
+    # a stripped installation, here one built from a copy of the sources
+    root = tmp_path / 'raw'
+    shutil.copytree(_registry.ROOT, root, ignore = shutil.ignore_patterns('__pycache__'))
+    filename = str(tmp_path / 'raw.registry')
+    _registry.build(filename, root = str(root))
+    shutil.rmtree(root / 'GL' / 'SGIX')
+    registry = _registry.Registry(filename)
+    assert registry.current(str(root))
+    assert registry.find_spec('OpenGL.raw.GL.SGIX.async_') is not None
+
+def test_install_never_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, 'meta_path', [])
+    filename = str(tmp_path / 'raw.registry')
+    assert _registry.install(filename) is None
+    assert not os.path.exists(filename)
+    # built by another version: ignored, not rebuilt
+    monkeypatch.setattr(_registry, '__version__', '0.0.0')
+    _registry.build(filename)
+    monkeypatch.undo()
+    monkeypatch.setattr(sys, 'meta_path', [])
+    with open(filename, 'rb') as handle:
+        content = handle.read()
+    assert _registry.install(filename) is None
+    with open(filename, 'rb') as handle:
+        assert handle.read() == content
+    assert sys.meta_path == []
+
+def test_install(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, 'meta_path', [])
+    filename = str(tmp_path / 'raw.registry')
+    _registry.build(filename)
+    registry = _registry.install(filename)
+    assert sys.meta_path == [registry]
+    assert _registry.install(filename) is registry
+
+def test_disabled():
+    assert _registry.registryFile('0') is None
+    assert _registry.registryFile('/some/file') == '/some/file'
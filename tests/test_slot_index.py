@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+import project as P
+
+# project.SlotIndex grid queries against a linear scan over the slots, and the
+# occupied slot list GameState maintains against the slots themselves.
+
+def scan(positions, x, z, radius):
+    return [i for i, (sx, sz) in enumerate(positions) if P.dist2D(sx, sz, x, z) <= radius]
+
+def scan_segment(positions, x0, z0, x1, z1, radius):
+    return [i for i, (sx, sz) in enumerate(positions) if P.point_to_segment_distance(sx, sz, x0, z0, x1, z1) <= radius]
+
+def random_positions(rng, n, extent):
+    return [(rng.uniform(-extent, extent), rng.uniform(-extent, extent)) for _ in range(n)]
+
+@pytest.mark.parametrize('name', sorted(P.MAPS))
+def test_map_queries(name):
+    positions = P.MAPS[name].tower_slots
+    index = P.SlotIndex(positions)
+    rng = random.Random(name)
+    for _ in range(200):
+        x, z = rng.uniform(-40.0, 40.0), rng.uniform(-40.0, 40.0)
+        radius = rng.choice((0.5, P.boss_tower_aoe_radius, 10.0, 30.0))
+        assert index.query(x, z, radius) == scan(positions, x, z, radius)
+
+def test_random_queries():
+    rng = random.Random(5)
+    # slots exactly on cell borders and a radius touching a slot exactly
+    positions = random_positions(rng, 400, 60.0) + [(8.0, -4.0), (0.0, 0.0), (-12.0, 16.0)]
+    index = P.SlotIndex(positions, cell = 4.0)
+    assert index.query(3.0, 4.0, 5.0) == scan(positions, 3.0, 4.0, 5.0)
+    for _ in range(300):
+        x, z = rng.uniform(-70.0, 70.0), rng.uniform(-70.0, 70.0)
+        radius = rng.uniform(0.0, 20.0)
+        assert index.query(x, z, radius) == scan(positions, x, z, radius)
+        x1, z1 = x + rng.uniform(-30.0, 30.0), z + rng.uniform(-30.0, 30.0)
+        assert index.query_segment(x, z, x1, z1, radius) == scan_segment(positions, x, z, x1, z1, radius)
+    assert index.query_segment(3.0, 3.0, 3.0, 3.0, 6.0) == scan(positions, 3.0, 3.0, 6.0)
+
+def test_neighbours():
+    positions = random_positions(random.Random(7), 150, 40.0)
+    index = P.SlotIndex(positions, neighbour_radius = 9.0)
+    for i, (x, z) in enumerate(positions):
+        near = [j for j in scan(positions, x, z, 9.0) if j != i]
+        near.sort(key = lambda j: P.dist2D(x, z, *positions[j]))
+        assert index.neighbours[i] == near
+
+def test_occupied_slots():
+    game = P.GameState()
+    game.selected_map_idx = game.map_names.index("Cityscape")
+    game.reset(seed = 3)
+    rng = random.Random(3)
+    for _ in range(200):
+        i = rng.randrange(len(game.tower_slots))
+        if game.tower_slots[i].occupied:
+            P.destroy_tower_at_slot(game, i)
+        else:
+            assert P.build_tower_at_slot(game, i)
+        occupied = [j for j, s in enumerate(game.tower_slots) if s.occupied]
+        assert game.occupied_slots == occupied
+        assert game.active_tower_count() == len(occupied)
+        assert game.towers() == [game.tower_slots[j].tower for j in occupied]
+
+def test_boss_aoe_matches_scan(monkeypatch):
+    monkeypatch.setattr(P, 'boss_tower_dps', 10.0)
+    game = P.GameState()
+    game.reset(seed = 4)
+    for i in range(0, len(game.tower_slots), 2):
+        P.build_tower_at_slot(game, i)
+    rng = random.Random(4)
+    for slot in game.tower_slots[::3]:
+        x, z = slot.x + rng.uniform(-5.0, 5.0), slot.z + rng.uniform(-5.0, 5.0)
+        game.enemies.append(P.Enemy(x, z, 1.0, 100.0, is_boss = True))
+    expected = {}
+    for i in game.occupied_slots:
+        slot = game.tower_slots[i]
+        hits = sum(1 for b in game.enemies if P.dist2D(b.x, b.z, slot.x, slot.z) <= P.boss_tower_aoe_radius)
+        expected[i] = slot.tower.hp - hits * P.boss_tower_dps * 0.5
+    P.apply_boss_aoe_to_towers(game, 0.5)
+    assert {i: game.tower_slots[i].tower.hp for i in game.occupied_slots} == pytest.approx(expected)
+    assert any(hp < P.Tower(0.0, 0.0).hp for hp in expected.values())
@@ -0,0 +1,112 @@
+import numpy
+import pytest
+
+from OpenGL import GL
+from OpenGL.GL import statecache
+
+# OpenGL.GL.statecache: which calls it drops or passes on, and that the
+# state GL reports afterwards is what the caller asked for.
+
+@pytest.fixture
+def cache(context):
+    # a fresh context: nothing shadowed yet
+    statecache.invalidate()
+    statecache.cache.reset()
+    yield statecache.cache
+    statecache.invalidate()
+    statecache.cache.reset()
+
+def color():
+    return tuple(numpy.round(GL.glGetFloatv(GL.GL_CURRENT_COLOR).reshape(4), 3))
+
+def texture_binding():
+    return int(GL.glGetIntegerv(GL.GL_TEXTURE_BINDING_2D))
+
+def test_redundant_calls_skipped(cache):
+    statecache.glEnable(GL.GL_DEPTH_TEST)
+    statecache.glEnable(GL.GL_DEPTH_TEST)
+    statecache.glColor3f(1.0, 0.0, 0.0)
+    statecache.glColor4f(1.0, 0.0, 0.0, 1.0)
+    statecache.glColor3ub(255, 0, 0)
+    statecache.glMatrixMode(GL.GL_PROJECTION)
+    statecache.glMatrixMode(GL.GL_PROJECTION)
+    assert cache.issued == {'glEnable': 1, 'glColor3f': 1, 'glMatrixMode': 1}
+    assert cache.skipped == {'glEnable': 1, 'glColor4f': 1, 'glColor3ub': 1, 'glMatrixMode': 1}
+    assert GL.glIsEnabled(GL.GL_DEPTH_TEST)
+    assert color() == (1.0, 0.0, 0.0, 1.0)
+    assert int(GL.glGetIntegerv(GL.GL_MATRIX_MODE)) == GL.GL_PROJECTION
+    statecache.glMatrixMode(GL.GL_MODELVIEW)
+
+def test_pop_attrib(cache):
+    # colour and capability in separate blocks: Mesa 22's llvmpipe does not
+    # restore the current colour when glEnable/glDisable follow it unflushed
+    statecache.glColor3f(1.0, 0.0, 0.0)
+    GL.glPushAttrib(GL.GL_ALL_ATTRIB_BITS)
+    statecache.glColor3f(0.0, 1.0, 0.0)
+    statecache.glPopAttrib()
+    assert color() == (1.0, 0.0, 0.0, 1.0)
+    statecache.glEnable(GL.GL_DEPTH_TEST)
+    GL.glPushAttrib(GL.GL_ALL_ATTRIB_BITS)
+    statecache.glDisable(GL.GL_DEPTH_TEST)
+    statecache.glPopAttrib()
+    assert GL.glIsEnabled(GL.GL_DEPTH_TEST)
+    # the restored state is unknown to the cache, so these reach GL
+    cache.reset()
+    statecache.glColor3f(0.0, 1.0, 0.0)
+    statecache.glDisable(GL.GL_DEPTH_TEST)
+    assert cache.issued == {'glDisable': 1, 'glColor3f': 1}
+    assert not GL.glIsEnabled(GL.GL_DEPTH_TEST)
+    assert color() == (0.0, 1.0, 0.0, 1.0)
+
+def test_display_list_compilation(cache):
+    statecache.glColor3f(1.0, 0.0, 0.0)
+    display_list = GL.glGenLists(1)
+    statecache.glNewList(display_list, GL.GL_COMPILE)
+    cache.reset()
+    # compiled, not executed: every call goes into the list
+    statecache.glColor3f(1.0, 0.0, 0.0)
+    statecache.glColor3f(0.0, 0.0, 1.0)
+    statecache.glColor3f(0.0, 0.0, 1.0)
+    statecache.glEndList()
+    assert cache.issued == {'glColor3f': 3} and not cache.skipped
+    assert color() == (1.0, 0.0, 0.0, 1.0)
+    # the cache forgot everything at glEndList
+    statecache.glColor3f(1.0, 0.0, 0.0)
+    assert cache.issued == {'glColor3f': 4}
+    statecache.glCallList(display_list)
+    assert color() == (0.0, 0.0, 1.0, 1.0)
+    statecache.glColor3f(1.0, 0.0, 0.0)
+    assert cache.issued == {'glColor3f': 5}
+    assert color() == (1.0, 0.0, 0.0, 1.0)
+    GL.glDeleteLists(display_list, 1)
+
+def test_delete_textures(cache):
+    texture = int(GL.glGenTextures(1))
+    statecache.glBindTexture(GL.GL_TEXTURE_2D, texture)
+    statecache.glDeleteTextures([texture])
+    assert texture_binding() == 0
+    # the name may well be handed out again
+    again = int(GL.glGenTextures(1))
+    cache.reset()
+    statecache.glBindTexture(GL.GL_TEXTURE_2D, again)
+    assert cache.issued == {'glBindTexture': 1}
+    assert texture_binding() == again
+    statecache.glDeleteTextures([again])
+
+def test_bind_texture_per_unit(cache):
+    texture = int(GL.glGenTextures(1))
+    statecache.glActiveTexture(GL.GL_TEXTURE0)
+    statecache.glBindTexture(GL.GL_TEXTURE_2D, texture)
+    statecache.glActiveTexture(GL.GL_TEXTURE1)
+    statecache.glBindTexture(GL.GL_TEXTURE_2D, texture)
+    assert cache.issued['glBindTexture'] == 2
+    assert texture_binding() == texture
+    statecache.glBindTexture(GL.GL_TEXTURE_2D, 0)
+    statecache.glActiveTexture(GL.GL_TEXTURE0)
+    statecache.glBindTexture(GL.GL_TEXTURE_2D, texture)
+    assert cache.skipped['glBindTexture'] == 1
+    assert texture_binding() == texture
+    GL.glActiveTexture(GL.GL_TEXTURE1)
+    assert texture_binding() == 0
+    GL.glActiveTexture(GL.GL_TEXTURE0)
+    statecache.glDeleteTextures([texture])
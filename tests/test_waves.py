@@ -0,0 +1,76 @@
+import pytest
+
+import project as P
+
+# Compiled wave timelines (project.WaveSchedule) against the per-wave formula
+# WaveManager used before waves became data, and the compiled-wave cache.
+
+def formula_timeline(wave_num):
+    # (time, count, speed, health, boss) per spawn tick, as the old WaveManager
+    # counted them down: wave 1 starts at 2s every 1.25s, later waves every
+    # max(0.7, 1.4 - 0.07 * wave) starting one interval in; the mid boss joins
+    # once no more than wave_num grunts remain, the end boss follows the last
+    # grunt on even waves.
+    count = 8 + 2 * wave_num
+    if wave_num == 1:
+        start, interval = 2.0, 1.25
+    else:
+        interval = max(0.7, 1.4 - 0.07 * wave_num)
+        start = interval
+    speed, health = 1.2 + 0.08 * wave_num, 85 + 18 * wave_num
+    boss_hp = P.boss_base_hp + (wave_num - 1) * P.boss_hp_wave_scale
+    timeline = []
+    mid_boss = False
+    for i in range(count):
+        t = start + i * interval
+        timeline.append((t, 1, speed, health, False))
+        if not mid_boss and count - (i + 1) <= wave_num:
+            mid_boss = True
+            timeline.append((t, 1, P.boss_speed, boss_hp, True))
+    if wave_num % 2 == 0:
+        timeline.append((timeline[-1][0], 1, P.boss_speed, boss_hp, True))
+    return timeline
+
+@pytest.mark.parametrize('wave_num', range(1, 16))
+def test_default_waves_match_formula(wave_num):
+    schedule = P.WaveSchedule(P.DEFAULT_WAVES, wave_num)
+    compiled = list(zip(schedule.times, schedule.counts, schedule.speeds, schedule.healths, schedule.bosses))
+    expected = formula_timeline(wave_num)
+    assert len(compiled) == len(expected)
+    for got, want in zip(compiled, expected):
+        assert got[0] == pytest.approx(want[0])
+        assert got[1:] == pytest.approx(want[1:])
+    assert schedule.total == len(expected)
+
+def test_per_spawn_merges_ticks():
+    definition = {"groups": [{"archetype": "grunt", "count": [250, 0], "interval": [0.5, 0.0], "per_spawn": [100, 0]}]}
+    schedule = P.WaveSchedule(definition, 1)
+    assert schedule.counts == [100, 100, 50]
+    assert schedule.times == pytest.approx([0.5, 1.0, 1.5])
+    assert schedule.total == 250
+
+def test_manager_spawns_timeline():
+    game = P.GameState()
+    game.reset(seed = 1)
+    spawned = []
+    while game.wave.wave_num == 1:
+        before = len(game.enemies)
+        game.wave.update(P.sim_step, game)
+        spawned.extend((game.wave.wave_time, e.is_boss) for e in game.enemies[before:])
+        for e in game.enemies:
+            e.alive = False
+    expected = formula_timeline(1)
+    assert [boss for _, boss in spawned] == [boss for *_, boss in expected]
+    for (t, _), want in zip(spawned, expected):
+        assert want[0] <= t < want[0] + P.sim_step + 1e-9
+
+def test_cache_keyed_on_content():
+    P.compiled_waves.clear()
+    definition = {"groups": [{"archetype": "grunt", "count": [3, 0], "interval": [1.0, 0.0]}]}
+    first = P.compile_wave(definition, 1)
+    assert P.compile_wave(dict(definition), 1) is first
+    definition["groups"][0]["count"] = [4, 0]
+    assert P.compile_wave(definition, 1).total == 4
+    for wave_num in range(P.compiled_wave_limit + 5):
+        P.compile_wave(definition, wave_num)
+    assert len(P.compiled_waves) == P.compiled_wave_limit
@@ -0,0 +1,124 @@
+import ctypes
+
+import pytest
+
+from OpenGL import error, wrapper
+from OpenGL._null import NULL
+
+# The call paths OpenGL.wrappergen generates (WRAPPER_CODEGEN) against the
+# generic nested closures of Wrapper.finaliseCall, for wrappers around a
+# Python stand-in for a ctypes function.
+
+def operation(calls, failure = None):
+    def glFake(target, value, extra):
+        calls.append((target, value, extra))
+        if failure is not None:
+            raise failure
+        return 42
+    glFake.argNames = ('target', 'value', 'extra')
+    glFake.argtypes = (ctypes.c_uint, ctypes.c_int, ctypes.c_void_p)
+    return glFake
+
+def double(value, function, args):
+    if value < 0:
+        raise ValueError("negative")
+    return value * 2
+
+def failing_c(pyArgs, index, function):
+    raise TypeError("no C value")
+
+shapes = {
+    # copies, a converted argument and an optional trailing one
+    'python': lambda w: w.setPyConverter('value', double).setPyConverter('extra', wrapper.none_or_pass),
+    # plus C converters and resolvers
+    'c': lambda w: w.setPyConverter('value', double).setPyConverter('extra', wrapper.none_or_pass)
+                    .setCConverter('target', lambda pyArgs, index, function: pyArgs[0] + 1)
+                    .setCResolver('value', int),
+    # a C converter that fails
+    'c failure': lambda w: w.setPyConverter('value', double).setCConverter('extra', failing_c),
+}
+
+def build(monkeypatch, shape, codegen, failure = None):
+    calls = []
+    w = shapes[shape](wrapper.wrapper(operation(calls, failure)))
+    monkeypatch.setattr(wrapper, 'WRAPPER_CODEGEN', codegen)
+    call = w.finalise()
+    monkeypatch.undo()
+    return w, call, calls
+
+def outcome(call, calls, *args):
+    try:
+        return ('result', call(*args), calls[-1] if calls else None)
+    except Exception as err:
+        return (type(err), err, calls[-1] if calls else None)
+
+def both(monkeypatch, shape, *args, failure = None):
+    results = []
+    for codegen in (True, False):
+        w, call, calls = build(monkeypatch, shape, codegen, failure)
+        results.append((w, outcome(call, calls, *args)))
+    return results
+
+def test_generated_path_used(monkeypatch):
+    w, call, calls = build(monkeypatch, 'python', True)
+    assert call.__code__.co_filename.startswith('<wrappergen')
+    w, call, calls = build(monkeypatch, 'python', False)
+    assert not call.__code__.co_filename.startswith('<wrappergen')
+
+@pytest.mark.parametrize('shape', ['python', 'c'])
+def test_results(monkeypatch, shape):
+    (_, generated), (_, generic) = both(monkeypatch, shape, 3, 4, 'extra')
+    assert generated == generic
+    assert generated[0] == 'result' and generated[1] == 42
+
+@pytest.mark.parametrize('shape', ['python', 'c'])
+def test_missing_optional_argument_is_null(monkeypatch, shape):
+    (_, generated), (_, generic) = both(monkeypatch, shape, 3, 4)
+    assert generated == generic
+    assert generated[2][2] is NULL
+
+@pytest.mark.parametrize('shape', ['python', 'c'])
+def test_argument_count(monkeypatch, shape):
+    (_, generated), (_, generic) = both(monkeypatch, shape, 3)
+    assert generated[0] is generic[0] is ValueError
+    assert generated[1].args == generic[1].args
+    assert 'glFake requires 2 arguments (target, value, extra), received 1: (3,)' in generated[1].args[0]
+
+def test_python_converter_failure(monkeypatch):
+    (_, generated), (_, generic) = both(monkeypatch, 'python', 3, -4)
+    assert generated[0] is generic[0] is ValueError
+    assert generated[1].args == generic[1].args == ("negative", double)
+    assert generated[2] is generic[2] is None
+
+def test_c_converter_failure(monkeypatch):
+    (w_generated, generated), (w_generic, generic) = both(monkeypatch, 'c failure', 3, 4, 5)
+    assert generated[0] is generic[0] is TypeError
+    # message, "Failure in cConverter ...", pyArgs, index, wrapper
+    assert generated[1].args[:4] == generic[1].args[:4]
+    assert generated[1].args[:2] == ("no C value", "Failure in cConverter %r" % (failing_c,))
+    assert tuple(generated[1].args[2]) == (3, 8, 5) and generated[1].args[3] == 2
+    assert generated[1].args[4] is w_generated and generic[1].args[4] is w_generic
+
+@pytest.mark.parametrize('shape', ['python', 'c'])
+def test_gl_error_arguments(monkeypatch, shape):
+    results = []
+    for codegen in (True, False):
+        w, call, calls = build(monkeypatch, shape, codegen, failure = error.GLError(1282))
+        with pytest.raises(error.GLError) as info:
+            call(3, 4, 'extra')
+        results.append(info.value)
+    generated, generic = results
+    assert tuple(generated.pyArgs) == tuple(generic.pyArgs) == (3, 8, 'extra')
+    assert tuple(generated.cArgs) == tuple(generic.cArgs)
+    assert tuple(generated.cArgs)[:2] == ((4, 8) if shape == 'c' else (3, 8))
+
+def test_ctypes_argument_error(monkeypatch):
+    results = []
+    for codegen in (True, False):
+        w, call, calls = build(monkeypatch, 'c', codegen, failure = ctypes.ArgumentError("bad"))
+        with pytest.raises(ctypes.ArgumentError) as info:
+            call(3, 4, 'extra')
+        results.append(info.value.args)
+    generated, generic = results
+    assert generated[0] == generic[0] == "bad"
+    assert tuple(generated[1]) == tuple(generic[1]) == (4, 8, 'extra')